@@ -1,6 +1,8 @@
 from functools import wraps
 from flask import request, jsonify
 from app.auth.auth_handler import decodeJWT
+from app.auth.current_user import get_current_user
+from app.auth.token_state import token_state_cache
 
 def token_required(f):
     @wraps(f)
@@ -23,13 +25,23 @@ def token_required(f):
         # Here we attach it to the request object for easy access in routes
         request.current_user_id = payload['user_id']
         request.current_user_role = payload['role']
+        request.token_claims = payload
 
-        if request.path != '/auth/change-password':
-            from app.server.models.user import User
+        if 'tv' in payload:
+            # Versioned token: validate against the cached token version, no user query.
+            state = token_state_cache.get(int(payload['user_id']))
+            if state is None or state.token_version != payload['tv']:
+                return jsonify({'message': 'Token has been revoked!'}), 401
+            # The mcp claim is only a hint for clients; an admin reset after
+            # issue must still gate this token.
+            must_change_password = state.must_change_password
+        else:
+            # Tokens issued before claims were versioned still need the lookup.
+            user = get_current_user()
+            must_change_password = bool(user and getattr(user, 'must_change_password', False))
 
-            user = User.query.get(int(payload['user_id']))
-            if user and getattr(user, 'must_change_password', False):
-                return jsonify({'error': 'Password change required'}), 403
+        if must_change_password and request.path != '/auth/change-password':
+            return jsonify({'error': 'Password change required'}), 403
 
         return f(*args, **kwargs)
 
@@ -1,23 +1,145 @@
+import hashlib
+import threading
 import time
+import uuid
 import jwt
 import os
+from collections import OrderedDict
 from typing import Dict
 
+from app.auth.keyring import ASYMMETRIC_ALGORITHMS, keyring
+from app.auth.revocation import revocation_list
+
 JWT_SECRET = os.getenv("JWT_SECRET", "default_secret")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+ACCESS_TOKEN_TTL_SECONDS = int(os.getenv("ACCESS_TOKEN_TTL_SECONDS", "900"))  # 15 minutes
+REFRESH_TOKEN_TTL_SECONDS = int(os.getenv("REFRESH_TOKEN_TTL_SECONDS", str(14 * 86400)))  # 14 days
+
+def _encode(payload: dict) -> str:
+    if JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS:
+        key = keyring.signing_key()
+        return jwt.encode(payload, key.private_key, algorithm=key.algorithm, headers={"kid": key.kid})
+    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+
+def _decode(token: str) -> dict:
+    if JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS:
+        key = keyring.verification_key(jwt.get_unverified_header(token).get("kid"))
+        if key is None:
+            raise jwt.InvalidTokenError("Unknown signing key")
+        return jwt.decode(token, key.public_key, algorithms=[key.algorithm])
+    return jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+
+
+def public_jwks() -> dict:
+    """JWKS for verifying our tokens offline; empty while tokens are HMAC-signed."""
+    if JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS:
+        return keyring.jwks()
+    return {"keys": []}
+
 
-def signJWT(user_id: str, role: str) -> Dict[str, str]:
-    payload = {
+def _token_claims(user_id: str, role: str, token_type: str, ttl: int, token_version: int) -> dict:
+    now = int(time.time())
+    return {
         "user_id": user_id,
         "role": role,
-        "expiry": time.time() + 86400  # 24 hours
+        "tv": int(token_version),  # users.token_version at issue time
+        "typ": token_type,
+        "jti": uuid.uuid4().hex,
+        "iat": now,
+        "exp": now + ttl,
+        "expiry": now + ttl,  # kept for clients that read the original claim
     }
-    token = jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+
+def signJWT(user_id: str, role: str, must_change_password: bool = False, token_version: int = 0) -> Dict[str, str]:
+    payload = _token_claims(user_id, role, "access", ACCESS_TOKEN_TTL_SECONDS, token_version)
+    payload["mcp"] = bool(must_change_password)  # must_change_password at issue time
+    token = _encode(payload)
     return {"access_token": token}
 
-def decodeJWT(token: str) -> dict:
+
+def signRefreshJWT(user_id: str, role: str, token_version: int = 0) -> Dict[str, str]:
+    payload = _token_claims(user_id, role, "refresh", REFRESH_TOKEN_TTL_SECONDS, token_version)
+    token = _encode(payload)
+    return {"refresh_token": token}
+
+class _VerifiedTokenCache:
+    """LRU of already-verified token claims, keyed by the token's SHA-256 digest.
+
+    Entries are dropped once their ``expiry`` passes; invalid tokens are never cached.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes, now: float):
+        with self._lock:
+            claims = self._entries.get(key)
+            if claims is None:
+                self.misses += 1
+                return None
+            if claims["expiry"] < now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return claims
+
+    def put(self, key: bytes, claims: dict) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = claims
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+
+_token_cache = _VerifiedTokenCache(int(os.getenv("JWT_CACHE_SIZE", "4096")))
+
+
+def decodeJWT(token: str, token_type: str = "access", check_revoked: bool = True) -> dict:
+    """Verified claims of ``token``, or None if it is invalid, expired, revoked or of another type.
+
+    Tokens issued before the ``typ`` claim existed count as access tokens.
+    """
+    now = time.time()
     try:
-        decoded_token = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        return decoded_token if decoded_token["expiry"] >= time.time() else None
-    except:
-        return None
\ No newline at end of file
+        key = hashlib.sha256(token.encode("utf-8")).digest()
+    except AttributeError:
+        return None
+
+    decoded_token = _token_cache.get(key, now)
+    if decoded_token is None:
+        try:
+            decoded_token = _decode(token)
+            if decoded_token["expiry"] < now:
+                return None
+        except:
+            return None
+        _token_cache.put(key, decoded_token)
+
+    if decoded_token.get("typ", "access") != token_type:
+        return None
+    if check_revoked and revocation_list.is_revoked(decoded_token.get("jti")):
+        return None
+    # Callers may mutate what they get back.
+    return dict(decoded_token)
+
+
+def jwt_cache_stats() -> dict:
+    return _token_cache.stats()
\ No newline at end of file
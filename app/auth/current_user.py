@@ -0,0 +1,35 @@
+import os
+
+from flask import current_app, g, request
+
+from app.server.database import db
+
+DEBUG_USER_LOADS = os.getenv("DEBUG_USER_LOADS", "").lower() in ("1", "true", "yes")
+
+
+def get_current_user():
+    """Return the authenticated User for this request, loading it at most once.
+
+    Must be called behind ``token_required``. Returns ``None`` when the token's
+    user no longer exists.
+    """
+    if 'current_user' not in g:
+        user = None
+        user_id = getattr(request, 'current_user_id', None)
+        if user_id is not None:
+            from app.server.models.user import User
+
+            user = db.session.get(User, int(user_id))
+            g.user_loads = g.get('user_loads', 0) + 1
+        g.current_user = user
+    return g.current_user
+
+
+def init_current_user(app):
+    """Report per-request user loads in an X-User-Loads header (debug mode or DEBUG_USER_LOADS)."""
+
+    @app.after_request
+    def add_user_loads_header(response):
+        if DEBUG_USER_LOADS or current_app.debug:
+            response.headers['X-User-Loads'] = str(g.get('user_loads', 0))
+        return response
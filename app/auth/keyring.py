@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import json
+import os
+import secrets
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+ASYMMETRIC_ALGORITHMS = ("EdDSA", "RS256")
+JWT_KEYS_DIR = os.getenv("JWT_KEYS_DIR", "instance/jwt_keys")
+# How often a worker re-reads the key directory to pick up a rotation.
+KEYRING_RELOAD_SECONDS = float(os.getenv("JWT_KEYRING_RELOAD_SECONDS", "30"))
+CURRENT_KEY_FILE = "current"
+
+
+@dataclass(frozen=True, slots=True)
+class SigningKey:
+    kid: str
+    algorithm: str
+    private_key: Any
+    public_key: Any
+
+
+def _algorithm_for(private_key: Any) -> str:
+    from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+    if isinstance(private_key, ed25519.Ed25519PrivateKey):
+        return "EdDSA"
+    if isinstance(private_key, rsa.RSAPrivateKey):
+        return "RS256"
+    raise ValueError(f"Unsupported JWT signing key type: {type(private_key).__name__}")
+
+
+def generate_private_key(algorithm: str) -> Any:
+    from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    if algorithm == "RS256":
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    raise ValueError(f"Unsupported JWT algorithm for key generation: {algorithm}")
+
+
+def write_private_key(directory: str | os.PathLike[str], private_key: Any, kid: str | None = None) -> str:
+    """Store ``private_key`` as ``<kid>.pem`` (mode 0600) and return the kid."""
+    from cryptography.hazmat.primitives import serialization
+
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    kid = kid or f"{time.strftime('%Y%m%d')}-{secrets.token_hex(4)}"
+    pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+    fd = os.open(path / f"{kid}.pem", os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as handle:
+        handle.write(pem)
+    return kid
+
+
+def set_current_kid(directory: str | os.PathLike[str], kid: str) -> None:
+    path = Path(directory)
+    if not (path / f"{kid}.pem").exists():
+        raise FileNotFoundError(f"No key named {kid} in {path}")
+    # Write then rename so readers never see a partial file.
+    tmp = path / f".{CURRENT_KEY_FILE}.tmp"
+    tmp.write_text(kid + "\n", encoding="utf-8")
+    os.replace(tmp, path / CURRENT_KEY_FILE)
+
+
+class Keyring:
+    """Asymmetric JWT keys from ``JWT_KEYS_DIR``.
+
+    Every ``<kid>.pem`` private key can verify tokens; the one named in the
+    ``current`` file (or the newest, if it is missing) signs new ones. Keys are
+    re-read every ``reload_interval`` seconds, and on an unknown ``kid``, so a
+    rotation reaches running workers without a restart.
+    """
+
+    def __init__(self, directory: str | os.PathLike[str] = JWT_KEYS_DIR, reload_interval: float = KEYRING_RELOAD_SECONDS) -> None:
+        self.directory = Path(directory)
+        self.reload_interval = reload_interval
+        self._keys: dict[str, SigningKey] = {}
+        self._current: SigningKey | None = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def signing_key(self) -> SigningKey:
+        self._maybe_reload()
+        if self._current is None:
+            raise RuntimeError(
+                f"No JWT signing keys in {self.directory}. Create one with `python scripts/jwt_keys.py rotate`."
+            )
+        return self._current
+
+    def verification_key(self, kid: str | None) -> SigningKey | None:
+        self._maybe_reload()
+        key = self._keys.get(kid) if kid else None
+        if key is None and kid and time.monotonic() - self._loaded_at > 1.0:
+            # Possibly rotated since the last load; retry at most once a second.
+            self.reload()
+            key = self._keys.get(kid)
+        return key
+
+    def jwks(self) -> dict[str, list[dict[str, Any]]]:
+        from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+
+        self._maybe_reload()
+        keys = []
+        for key in self._keys.values():
+            exporter = OKPAlgorithm if key.algorithm == "EdDSA" else RSAAlgorithm
+            jwk = json.loads(exporter.to_jwk(key.public_key))
+            jwk.update({"kid": key.kid, "alg": key.algorithm, "use": "sig"})
+            keys.append(jwk)
+        return {"keys": keys}
+
+    def reload(self) -> None:
+        from cryptography.hazmat.primitives import serialization
+
+        keys: dict[str, SigningKey] = {}
+        newest: tuple[float, str] | None = None
+        if self.directory.is_dir():
+            for path in self.directory.glob("*.pem"):
+                private_key = serialization.load_pem_private_key(path.read_bytes(), password=None)
+                kid = path.stem
+                keys[kid] = SigningKey(kid, _algorithm_for(private_key), private_key, private_key.public_key())
+                stamp = (path.stat().st_mtime, kid)
+                if newest is None or stamp > newest:
+                    newest = stamp
+
+        current_kid = None
+        current_file = self.directory / CURRENT_KEY_FILE
+        if current_file.exists():
+            current_kid = current_file.read_text(encoding="utf-8").strip()
+        if current_kid not in keys:
+            current_kid = newest[1] if newest else None
+
+        with self._lock:
+            self._keys = keys
+            self._current = keys.get(current_kid) if current_kid else None
+            self._loaded_at = time.monotonic()
+
+    def _maybe_reload(self) -> None:
+        if not self._loaded_at or time.monotonic() - self._loaded_at > self.reload_interval:
+            self.reload()
+
+
+keyring = Keyring()
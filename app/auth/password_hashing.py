@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Sequence
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+logger = logging.getLogger(__name__)
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "0") or 0) or (os.cpu_count() or 1)
+# Below this many passwords the pool's IPC overhead is not worth it.
+POOL_MIN_BATCH = int(os.getenv("PASSWORD_HASH_POOL_MIN_BATCH", "8"))
+
+LOGIN_HASH_WORKERS = int(os.getenv("LOGIN_HASH_WORKERS", "0") or 0) or (os.cpu_count() or 1)
+LOGIN_HASH_QUEUE_LIMIT = int(os.getenv("LOGIN_HASH_QUEUE_LIMIT", "16"))
+LOGIN_HASH_TIMEOUT_SECONDS = float(os.getenv("LOGIN_HASH_TIMEOUT_SECONDS", "2"))
+LOGIN_RETRY_AFTER_SECONDS = int(os.getenv("LOGIN_RETRY_AFTER_SECONDS", "2"))
+LATENCY_WINDOW = 1024
+
+_pool: ProcessPoolExecutor | None = None
+_pool_pid: int | None = None
+_pool_lock = threading.Lock()
+
+
+@dataclass(frozen=True, slots=True)
+class HashBatchResult:
+    hashes: list[str]
+    workers: int
+    elapsed_ms: float
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool, _pool_pid
+    pid = os.getpid()
+    with _pool_lock:
+        # A pool inherited through fork belongs to the parent process.
+        if _pool is None or _pool_pid != pid:
+            # Spawned workers start clean instead of forking a process that runs
+            # database and registry threads (gevent workers included).
+            _pool = ProcessPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _pool_pid = pid
+        return _pool
+
+
+def _reset_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def hash_passwords(passwords: Sequence[str]) -> HashBatchResult:
+    """Hash ``passwords`` with ``generate_password_hash``, keeping input order.
+
+    Large batches are spread over a process pool of ``PASSWORD_HASH_WORKERS``
+    processes; small ones, or a broken pool, are hashed in this process.
+    """
+    started = time.perf_counter()
+    workers = 1
+    hashes: list[str] | None = None
+
+    if PASSWORD_HASH_WORKERS > 1 and len(passwords) >= POOL_MIN_BATCH:
+        workers = min(PASSWORD_HASH_WORKERS, len(passwords))
+        chunksize = max(1, len(passwords) // (workers * 4))
+        try:
+            hashes = list(_get_pool().map(generate_password_hash, passwords, chunksize=chunksize))
+        except BrokenProcessPool:
+            logger.exception("Password hashing pool broke; hashing in-process")
+            _reset_pool()
+            workers = 1
+
+    if hashes is None:
+        hashes = [generate_password_hash(password) for password in passwords]
+
+    return HashBatchResult(
+        hashes=hashes,
+        workers=workers,
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 3),
+    )
+
+
+atexit.register(_reset_pool)
+
+
+class VerifierOverloaded(Exception):
+    """Password verification was refused or gave up waiting; retry after ``retry_after`` seconds."""
+
+    def __init__(self, reason: str, retry_after: int = LOGIN_RETRY_AFTER_SECONDS) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class LatencyWindow:
+    """Most recent ``size`` latency samples, in milliseconds."""
+
+    def __init__(self, size: int = LATENCY_WINDOW) -> None:
+        self._samples: deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self._samples.append(elapsed_ms)
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return {"count": 0, "p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+
+        def percentile(fraction: float) -> float:
+            return round(samples[min(len(samples) - 1, int(len(samples) * fraction))], 3)
+
+        return {
+            "count": len(samples),
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(samples[-1], 3),
+        }
+
+
+class PasswordVerifier:
+    """Runs ``check_password_hash`` on a small thread pool with admission control.
+
+    The key derivation releases the GIL, so a few threads keep the CPU busy
+    while request threads only wait. At most ``workers + queue_limit``
+    verifications are admitted at once; anything beyond that, or anything
+    that waits longer than ``timeout`` seconds, raises ``VerifierOverloaded``
+    so the caller can answer 503 immediately instead of tying up a worker.
+    """
+
+    def __init__(
+        self,
+        workers: int = LOGIN_HASH_WORKERS,
+        queue_limit: int = LOGIN_HASH_QUEUE_LIMIT,
+        timeout: float = LOGIN_HASH_TIMEOUT_SECONDS,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.queue_limit = max(0, queue_limit)
+        self.timeout = timeout
+        self.hash_latency = LatencyWindow()
+        self.wait_latency = LatencyWindow()
+        self.login_latency = LatencyWindow()
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_limit)
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_pid: int | None = None
+        self._lock = threading.Lock()
+        self._counters = {"admitted": 0, "rejected_full": 0, "timed_out": 0}
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        if not self._slots.acquire(blocking=False):
+            self._count("rejected_full")
+            raise VerifierOverloaded("queue_full")
+        self._count("admitted")
+
+        submitted = time.perf_counter()
+        try:
+            future = self._get_executor().submit(self._check, password_hash, password, submitted)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Drops it if it has not started yet; a running hash finishes and frees its slot.
+            future.cancel()
+            self._count("timed_out")
+            raise VerifierOverloaded("timeout") from None
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            "pid": os.getpid(),
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "timeout_seconds": self.timeout,
+            **counters,
+            "queue_wait": self.wait_latency.summary(),
+            "hash": self.hash_latency.summary(),
+            "login": self.login_latency.summary(),
+        }
+
+    def _check(self, password_hash: str, password: str, submitted: float) -> bool:
+        started = time.perf_counter()
+        self.wait_latency.record((started - submitted) * 1000)
+        try:
+            return check_password_hash(password_hash, password)
+        except ValueError:
+            return False
+        finally:
+            self.hash_latency.record((time.perf_counter() - started) * 1000)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        pid = os.getpid()
+        with self._lock:
+            if self._executor is None or self._executor_pid != pid:
+                self._executor = _native_thread_executor(self.workers)
+                self._executor_pid = pid
+            return self._executor
+
+
+def _native_thread_executor(workers: int):
+    """Thread pool whose hashes run on real OS threads.
+
+    Under gevent workers (gunicorn.conf.py) ``threading`` is monkey-patched, so
+    a plain ``ThreadPoolExecutor`` would hash on greenlets and stall the hub;
+    gevent's executor runs on native threads and lets callers wait cooperatively.
+    """
+    if _gevent_patched():
+        from gevent.threadpool import ThreadPoolExecutor as GeventThreadPoolExecutor
+
+        return GeventThreadPoolExecutor(max_workers=workers)
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="login-hash")
+
+
+def _gevent_patched() -> bool:
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched("threading")
+
+
+login_verifier = PasswordVerifier()
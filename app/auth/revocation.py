@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_FILTER_CAPACITY = int(os.getenv("REVOCATION_FILTER_CAPACITY", "100000"))
+REVOCATION_FILTER_ERROR_RATE = float(os.getenv("REVOCATION_FILTER_ERROR_RATE", "0.001"))
+REVOCATION_SYNC_SECONDS = float(os.getenv("REVOCATION_SYNC_SECONDS", "5"))
+# Rows below the newest id seen that every sync reads again, for inserts that
+# took a lower id but committed after a higher one.
+REVOCATION_SYNC_OVERLAP_ROWS = int(os.getenv("REVOCATION_SYNC_OVERLAP_ROWS", "1000"))
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing of one BLAKE2b digest."""
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        capacity = max(1, capacity)
+        self.bit_count = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.bit_count / capacity * math.log(2)))
+        self._bits = bytearray((self.bit_count + 7) // 8)
+        self.items = 0
+
+    def _positions(self, value: str):
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for index in range(self.hash_count):
+            yield (first + index * second) % self.bit_count
+
+    def add(self, value: str) -> None:
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.items += 1
+
+    def __contains__(self, value: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class RevocationList:
+    """In-memory view of ``revoked_tokens`` for O(1) checks on every request.
+
+    Revoked ``jti`` values go into a Bloom filter. A miss means the token
+    is definitely live. A hit is confirmed against the database (the exact
+    fallback), which only happens for revoked tokens and the rare false positive.
+    The filter is rebuilt from the table at startup and then synced
+    incrementally by a background thread, so revocations made by other
+    workers arrive within ``sync_interval`` seconds.
+
+    Ids come from a sequence but commit in any order, so a row can appear
+    below an id an earlier sync already saw. Each sync therefore re-reads the
+    last ``sync_overlap`` ids and skips the rows it remembers.
+    """
+
+    def __init__(
+        self,
+        capacity: int = REVOCATION_FILTER_CAPACITY,
+        error_rate: float = REVOCATION_FILTER_ERROR_RATE,
+        sync_interval: float = REVOCATION_SYNC_SECONDS,
+        sync_overlap: int = REVOCATION_SYNC_OVERLAP_ROWS,
+    ) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.sync_overlap = sync_overlap
+        self._filter = BloomFilter(capacity, error_rate)
+        self._last_row_id = 0
+        # Row ids already in the filter within the overlap window.
+        self._recent_row_ids: set[int] = set()
+        self._lock = threading.Lock()
+        self._app = None
+        self._engine = None
+        self._exact_check: Callable[[str], bool] | None = None
+        self._worker: threading.Thread | None = None
+        self._worker_pid: int | None = None
+        self._stop = threading.Event()
+        self.counters = {"checks": 0, "filter_hits": 0, "confirmed": 0, "false_positives": 0}
+
+    def init_app(self, app) -> None:
+        """Bind to the Flask database: rebuild the filter and keep it in sync."""
+        self._app = app
+        self._exact_check = _database_exact_check
+        with app.app_context():
+            self.rebuild()
+        self._ensure_worker()
+
+    def init_engine(self, engine) -> None:
+        """Bind to a plain SQLAlchemy engine (the FastAPI service) instead of Flask."""
+        self._engine = engine
+        self._exact_check = self._engine_exact_check
+        self.rebuild()
+        self._ensure_worker()
+
+    def is_revoked(self, jti: str | None) -> bool:
+        if not jti:
+            return False
+        self._ensure_worker()
+        self.counters["checks"] += 1
+        if jti not in self._filter:
+            return False
+
+        self.counters["filter_hits"] += 1
+        if self._exact_check is None:
+            # No database bound in this process: trust the filter.
+            return True
+        revoked = self._exact_check(jti)
+        self.counters["confirmed" if revoked else "false_positives"] += 1
+        return revoked
+
+    def add(self, jti: str) -> None:
+        """Mark ``jti`` revoked locally right away (the row is written by the caller)."""
+        with self._lock:
+            self._filter.add(jti)
+
+    def rebuild(self) -> None:
+        """Drop expired rows and reload every live revocation."""
+        from app.server.models.user import RevokedToken
+
+        now = time.time()
+        with self._session() as session:
+            session.query(RevokedToken).filter(RevokedToken.expires_at < now).delete(synchronize_session=False)
+            session.commit()
+            rows = session.query(RevokedToken.id, RevokedToken.jti).all()
+
+        live = len(rows)
+        bloom = BloomFilter(max(self.capacity, live * 2), self.error_rate)
+        last_row_id = 0
+        for row_id, jti in rows:
+            bloom.add(jti)
+            last_row_id = max(last_row_id, row_id)
+        floor = last_row_id - self.sync_overlap
+
+        with self._lock:
+            self._filter = bloom
+            self._last_row_id = last_row_id
+            self._recent_row_ids = {row_id for row_id, _ in rows if row_id > floor}
+
+    def sync(self) -> int:
+        """Pull revocations committed since the last sync and return how many were new."""
+        from app.server.models.user import RevokedToken
+
+        floor = max(0, self._last_row_id - self.sync_overlap)
+        with self._session() as session:
+            rows = (
+                session.query(RevokedToken.id, RevokedToken.jti)
+                .filter(RevokedToken.id > floor)
+                .order_by(RevokedToken.id.asc())
+                .all()
+            )
+        added = 0
+        with self._lock:
+            for row_id, jti in rows:
+                if row_id in self._recent_row_ids:
+                    continue
+                self._filter.add(jti)
+                self._recent_row_ids.add(row_id)
+                self._last_row_id = max(self._last_row_id, row_id)
+                added += 1
+            floor = self._last_row_id - self.sync_overlap
+            self._recent_row_ids = {row_id for row_id in self._recent_row_ids if row_id > floor}
+            needs_rebuild = self._filter.items > self._filter_capacity()
+        if needs_rebuild:
+            self.rebuild()
+        return added
+
+    def stats(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "filter_items": self._filter.items,
+            "filter_bits": self._filter.bit_count,
+            "filter_hashes": self._filter.hash_count,
+            **self.counters,
+        }
+
+    def _filter_capacity(self) -> int:
+        # Past this many items the false-positive rate climbs above error_rate.
+        return int(self._filter.bit_count * (math.log(2) ** 2) / -math.log(self.error_rate))
+
+    @contextmanager
+    def _session(self):
+        if self._engine is not None:
+            from sqlalchemy.orm import Session
+
+            with Session(self._engine) as session:
+                yield session
+            return
+
+        from flask import has_app_context
+
+        from app.server.database import db
+
+        if has_app_context():
+            yield db.session
+        else:
+            with self._app.app_context():
+                yield db.session
+
+    def _engine_exact_check(self, jti: str) -> bool:
+        from app.server.models.user import RevokedToken
+
+        with self._session() as session:
+            return session.query(RevokedToken.id).filter(RevokedToken.jti == jti).first() is not None
+
+    def _ensure_worker(self) -> None:
+        pid = os.getpid()
+        if (self._app is None and self._engine is None) or (self._worker_pid == pid and self._worker is not None and self._worker.is_alive()):
+            return
+        with self._lock:
+            if self._worker_pid == pid and self._worker is not None and self._worker.is_alive():
+                return
+            self._worker_pid = pid
+            self._worker = threading.Thread(target=self._run, name="token-revocation-sync", daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.sync_interval):
+            try:
+                self.sync()
+            except Exception:
+                logger.exception("Token revocation sync failed")
+
+
+def revoke_token(claims: dict) -> None:
+    """Record a decoded token as revoked. The caller commits the session."""
+    from app.server.database import db
+    from app.server.models.user import RevokedToken
+
+    jti = claims.get("jti")
+    if not jti:
+        return
+    db.session.add(
+        RevokedToken(
+            jti=jti,
+            user_id=int(claims["user_id"]),
+            token_type=claims.get("typ", "access"),
+            expires_at=float(claims.get("expiry") or time.time()),
+        )
+    )
+    revocation_list.add(jti)
+
+
+def _database_exact_check(jti: str) -> bool:
+    from flask import has_app_context
+
+    from app.server.database import db
+    from app.server.models.user import RevokedToken
+
+    if not has_app_context():
+        return True
+    return db.session.query(RevokedToken.id).filter(RevokedToken.jti == jti).first() is not None
+
+
+revocation_list = RevocationList()
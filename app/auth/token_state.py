@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+
+TOKEN_STATE_TTL_SECONDS = float(os.getenv("TOKEN_STATE_TTL_SECONDS", "30"))
+TOKEN_STATE_MAX_ENTRIES = int(os.getenv("TOKEN_STATE_MAX_ENTRIES", "10000"))
+
+
+@dataclass(frozen=True, slots=True)
+class TokenState:
+    token_version: int
+    must_change_password: bool
+    class_id: int | None
+    expires_at: float
+
+
+class TokenStateCache:
+    """Per-process cache of each user's current token version.
+
+    ``token_required`` compares the ``tv`` claim against this instead of
+    loading the user on every request. Password changes in this process
+    invalidate the entry immediately; other workers pick the new version up
+    once their entry expires after ``ttl`` seconds. The user's ``class_id``
+    rides along so matchmaking can scope a pick without its own query.
+    """
+
+    def __init__(self, ttl: float = TOKEN_STATE_TTL_SECONDS, max_entries: int = TOKEN_STATE_MAX_ENTRIES) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._states: dict[int, TokenState] = {}
+
+    def get(self, user_id: int) -> TokenState | None:
+        """Current state for ``user_id``, loading it on a miss. ``None`` if the user is gone."""
+        now = time.monotonic()
+        state = self._states.get(user_id)
+        if state is not None and state.expires_at > now:
+            return state
+
+        from app.server.database import db
+        from app.server.models.user import User
+
+        row = (
+            db.session.query(User.token_version, User.must_change_password, User.class_id)
+            .filter(User.id == user_id)
+            .first()
+        )
+        if row is None:
+            self.invalidate(user_id)
+            return None
+
+        state = TokenState(
+            token_version=int(row.token_version or 0),
+            must_change_password=bool(row.must_change_password),
+            class_id=row.class_id,
+            expires_at=now + self.ttl,
+        )
+        with self._lock:
+            if len(self._states) >= self.max_entries:
+                self._states = {key: value for key, value in self._states.items() if value.expires_at > now}
+                if len(self._states) >= self.max_entries:
+                    self._states.clear()
+            self._states[user_id] = state
+        return state
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._states.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+
+token_state_cache = TokenStateCache()
+
+
+def revoke_user_tokens(user) -> None:
+    """Bump the user's token version so tokens issued before now stop working.
+
+    Call before committing the password change; the caller owns the commit.
+    """
+    user.token_version = int(user.token_version or 0) + 1
+    token_state_cache.invalidate(int(user.id))
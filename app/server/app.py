@@ -7,6 +7,12 @@ from app.server.routes.teacher import teacher_bp
 from app.server.routes.parent import parent_bp
 from app.server.routes.docs import docs_bp
 from app.server.routes.admin_users_flask import admin_users_bp
+from app.server.services.server_registry import server_registry
+from app.server.services.udp_heartbeat import start_udp_heartbeat_listener
+from app.server.services.public_id_backfill import public_id_backfill
+from app.auth.current_user import init_current_user
+from app.server.sql_metrics import init_sql_metrics
+from app.auth.revocation import revocation_list
 import os
 from dotenv import load_dotenv
 
@@ -36,7 +42,25 @@ def create_app():
     
     # Initialize Database
     init_db(app)
+
+    # Legacy rows without a public_id are filled in the background, not at boot
+    public_id_backfill.init_app(app)
+
+    # Game server heartbeats are held in memory and flushed to the database in batches
+    server_registry.init_app(app)
+
+    # Optional compact UDP heartbeats (UDP_HEARTBEAT_PORT / UDP_HEARTBEAT_SECRET)
+    app.extensions['udp_heartbeat'] = start_udp_heartbeat_listener(server_registry)
     
+    # Revoked token ids, checked in memory on every request
+    revocation_list.init_app(app)
+
+    # Per-request user context (X-User-Loads header when debugging)
+    init_current_user(app)
+
+    # Per-request statement counts, Server-Timing and N+1 warnings (SQL_METRICS_ENABLED)
+    init_sql_metrics(app)
+
     # Register Blueprints
     app.register_blueprint(user_bp)
     app.register_blueprint(app_bp)
@@ -0,0 +1,201 @@
+"""One place that decides how this service connects to Postgres.
+
+Both the Flask app (through ``SQLALCHEMY_ENGINE_OPTIONS``) and the FastAPI
+service (through ``get_engine``) build their engines from ``engine_options``,
+so ``DB_POOL_*`` sizes every process deliberately. Pools are instrumented to
+report checkout wait times and saturation, and engines are disposed in forked
+children so a preloaded Gunicorn master never shares sockets with workers.
+Under gevent workers, ``make_psycopg2_green`` lets queries yield to the hub.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from functools import lru_cache
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") not in ("0", "false", "False")
+# Recent checkout waits kept for percentiles.
+POOL_WAIT_WINDOW = int(os.getenv("DB_POOL_WAIT_WINDOW", "1024"))
+
+
+def normalize_database_url(url: str) -> str:
+    # SQLAlchemy requires 'postgresql://'
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql://", 1)
+    return url
+
+
+def engine_options(url: str) -> dict:
+    """``create_engine`` keyword arguments for ``url``."""
+    if url.startswith("sqlite"):
+        # SQLite picks its own pool class; sizing options do not apply.
+        return {}
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+class PoolStats:
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.waited = 0  # checkouts that found no idle connection
+        self.peak_checked_out = 0
+        self.max_wait_ms = 0.0
+        self.total_wait_ms = 0.0
+        self._recent_ms: deque[float] = deque(maxlen=POOL_WAIT_WINDOW)
+        self._lock = threading.Lock()
+
+    def record(self, wait_ms: float, had_idle: bool, checked_out: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            if not had_idle:
+                self.waited += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            self._recent_ms.append(wait_ms)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            recent = sorted(self._recent_ms)
+            counters = {
+                "checkouts": self.checkouts,
+                "waited": self.waited,
+                "timeouts": self.timeouts,
+                "peak_checked_out": self.peak_checked_out,
+                "avg_wait_ms": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait_ms, 3),
+            }
+        if recent:
+            counters["p50_wait_ms"] = round(recent[len(recent) // 2], 3)
+            counters["p95_wait_ms"] = round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 3)
+        return counters
+
+
+class InstrumentedQueuePool(QueuePool):
+    """``QueuePool`` that times every checkout."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        had_idle = self.checkedin() > 0
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record((time.perf_counter() - started) * 1000.0, had_idle, self.checkedout())
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        # Keep counting across dispose() so metrics survive forks and reconnects.
+        pool.stats = self.stats
+        return pool
+
+
+def pool_stats(engine: Engine) -> dict:
+    """Size, current use and checkout wait metrics for ``engine``'s pool."""
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__, "pid": os.getpid()}
+    if isinstance(pool, QueuePool):
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        checked_out = pool.checkedout()
+        stats.update(
+            {
+                "size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "checked_out": checked_out,
+                "idle": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "saturation": round(checked_out / capacity, 3) if capacity > 0 else None,
+            }
+        )
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(pool.stats.snapshot())
+    return stats
+
+
+_tracked_engines: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+
+
+def track_engine(engine: Engine) -> Engine:
+    """Dispose ``engine``'s pool in forked children (Gunicorn ``--preload``)."""
+    _tracked_engines.add(engine)
+    return engine
+
+
+def _dispose_after_fork() -> None:
+    for engine in list(_tracked_engines):
+        # close=False: the parent still owns those sockets.
+        engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_after_fork)
+
+
+def _gevent_wait_callback(conn, timeout=None) -> None:
+    """psycopg2 wait callback that waits for the socket on the gevent hub."""
+    from gevent.socket import wait_read, wait_write
+    from psycopg2 import OperationalError, extensions
+
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            return
+        if state == extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise OperationalError(f"Bad result from poll: {state!r}")
+
+
+def make_psycopg2_green() -> bool:
+    """Make psycopg2 cooperative under gevent; call in each worker before it connects.
+
+    Without this every query blocks the worker's whole hub: each open stream and
+    the registry, revocation and backfill loops, which are greenlets there too.
+    """
+    try:
+        from psycopg2 import extensions
+    except ImportError:
+        return False
+    extensions.set_wait_callback(_gevent_wait_callback)
+    return True
+
+
+@lru_cache(maxsize=1)
+def get_engine() -> Engine:
+    """Engine for code that runs outside Flask (the FastAPI service)."""
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise RuntimeError("DATABASE_URL is not configured")
+    database_url = normalize_database_url(database_url)
+    return track_engine(create_engine(database_url, **engine_options(database_url)))
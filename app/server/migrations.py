@@ -0,0 +1,452 @@
+"""Ordered schema migrations, recorded in the ``schema_version`` table.
+
+A boot reads the newest applied version once; DDL and backfills run only when
+that is behind ``LATEST_VERSION``. To change the schema, append a function to
+``MIGRATIONS`` — never edit or reorder one that has shipped. Migrations spell
+out their own DDL instead of calling ``create_all`` on the models, so they
+keep doing exactly what they did when they shipped.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    UniqueConstraint,
+    inspect,
+    text,
+)
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app.server.database import db
+
+logger = logging.getLogger(__name__)
+
+# Session-level advisory lock so only one booting worker migrates at a time.
+MIGRATION_LOCK_KEY = 0x6753_4D47
+
+
+@dataclass(frozen=True, slots=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[], None]
+
+
+# Schema as of migration 1, frozen. It deliberately does not follow the models:
+# later schema changes are new migrations, so never edit these tables.
+_baseline_metadata = MetaData()
+
+
+def _public_id() -> Column:
+    return Column("public_id", String(36), unique=True, index=True, nullable=False)
+
+
+def _timestamps() -> list[Column]:
+    return [Column("created_at", DateTime), Column("updated_at", DateTime)]
+
+
+Table(
+    "users", _baseline_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("first_name", String(80), nullable=False),
+    Column("last_name", String(80), nullable=False),
+    Column("username", String(80), unique=True, nullable=False, index=True),
+    Column("email", String(120), unique=True, nullable=False, index=True),
+    Column("password_hash", String(255), nullable=False),
+    Column("must_change_password", Boolean, nullable=False),
+    Column("token_version", Integer, nullable=False),
+    Column("role", String(20), nullable=False),
+    Column("parent_id", Integer, ForeignKey("users.id"), nullable=True),
+    Column("class_id", Integer, ForeignKey("classes.id"), nullable=True),
+    *_timestamps(),
+    _public_id(),
+)
+Table(
+    "classes", _baseline_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("teacher_id", Integer, ForeignKey("users.id"), nullable=False),
+    *_timestamps(),
+    _public_id(),
+)
+Table(
+    "missions", _baseline_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("title", String(100), nullable=False),
+    Column("level_req", Integer),
+    _public_id(),
+)
+Table(
+    "mission_progress", _baseline_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("mission_id", Integer, ForeignKey("missions.id"), nullable=False),
+    Column("status", String(20)),
+    Column("score", Integer),
+    *_timestamps(),
+    _public_id(),
+)
+Table(
+    "quizzes", _baseline_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("teacher_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("class_id", Integer, ForeignKey("classes.id"), nullable=True),
+    Column("title", String(100), nullable=False),
+    Column("timer_seconds", Integer),
+    Column("start_date", DateTime),
+    *_timestamps(),
+    _public_id(),
+)
+Table(
+    "quiz_questions", _baseline_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("quiz_id", Integer, ForeignKey("quizzes.id"), nullable=False),
+    Column("type", String(50)),
+    Column("text", Text, nullable=False),
+    Column("options", JSON, nullable=True),
+    Column("correct_answer", String(255), nullable=True),
+    Column("points", Integer),
+    Column("order", Integer),
+    *_timestamps(),
+    _public_id(),
+)
+Table(
+    "quiz_results", _baseline_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("quiz_id", Integer, ForeignKey("quizzes.id"), nullable=False),
+    Column("student_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("score", Integer, nullable=False),
+    *_timestamps(),
+    _public_id(),
+)
+Table(
+    "messages", _baseline_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("sender_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("receiver_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("content", Text, nullable=False),
+    Column("quiz_result_id", Integer, ForeignKey("quiz_results.id"), nullable=True),
+    *_timestamps(),
+    _public_id(),
+)
+Table(
+    "game_servers", _baseline_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(100)),
+    Column("ip", String(50), nullable=False),
+    Column("port", Integer, nullable=False),
+    Column("last_heartbeat", Float),
+    Column("player_count", Integer),
+    Column("required_players", Integer, nullable=False),
+    Column("persistent", Boolean, nullable=False),
+    Column("owner_teacher_id", Integer, ForeignKey("users.id"), nullable=True),
+    Column("class_id", Integer, ForeignKey("classes.id"), nullable=True),
+    Column("first_heartbeat", Float, nullable=True),
+    Column("heartbeat_count", Integer, nullable=False),
+    _public_id(),
+    UniqueConstraint("ip", "port", name="_server_ip_port_uc"),
+)
+Table(
+    "game_server_uptime", _baseline_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("ip", String(50), nullable=False),
+    Column("port", Integer, nullable=False),
+    Column("name", String(100)),
+    Column("first_seen", Float, nullable=True),
+    Column("last_seen", Float, nullable=True),
+    Column("sessions", Integer, nullable=False),
+    Column("heartbeat_count", BigInteger, nullable=False),
+    Column("total_uptime_seconds", Float, nullable=False),
+    UniqueConstraint("ip", "port", name="_server_uptime_ip_port_uc"),
+)
+Table(
+    "revoked_tokens", _baseline_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("jti", String(64), unique=True, nullable=False, index=True),
+    Column("user_id", Integer, nullable=False, index=True),
+    Column("token_type", String(16), nullable=False),
+    Column("expires_at", Float, nullable=False, index=True),
+    Column("revoked_at", DateTime),
+)
+Table(
+    "playtime_logs", _baseline_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("date", Date),
+    Column("duration_minutes", Integer),
+    _public_id(),
+)
+Table(
+    "announcements", _baseline_metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("class_id", Integer, nullable=False),
+    Column("teacher_id", Integer, nullable=False),
+    Column("title", String(255), nullable=False),
+    Column("message", Text, nullable=False),
+    Column("created_at", DateTime),
+)
+
+# Tables that gained public_id after they first shipped.
+_BASELINE_PUBLIC_ID_TABLES = (
+    "users",
+    "classes",
+    "missions",
+    "mission_progress",
+    "quizzes",
+    "quiz_results",
+    "messages",
+    "game_servers",
+    "playtime_logs",
+)
+
+
+def _execute(*statements: str) -> None:
+    for statement in statements:
+        db.session.execute(text(statement))
+    db.session.commit()
+
+
+def _baseline_user_columns(columns: set[str], postgres: bool) -> None:
+    if "first_name" not in columns:
+        _execute("ALTER TABLE users ADD COLUMN first_name VARCHAR(80) DEFAULT ''")
+    if "last_name" not in columns:
+        _execute("ALTER TABLE users ADD COLUMN last_name VARCHAR(80) DEFAULT ''")
+    if "must_change_password" not in columns:
+        _execute("ALTER TABLE users ADD COLUMN must_change_password BOOLEAN DEFAULT FALSE")
+    if "token_version" not in columns:
+        _execute("ALTER TABLE users ADD COLUMN token_version INTEGER DEFAULT 0")
+    if "temporary_password" in columns:
+        _execute("UPDATE users SET temporary_password = NULL WHERE temporary_password IS NOT NULL")
+    _execute(
+        "UPDATE users SET first_name = '' WHERE first_name IS NULL",
+        "UPDATE users SET last_name = '' WHERE last_name IS NULL",
+        "UPDATE users SET must_change_password = FALSE WHERE must_change_password IS NULL",
+        "UPDATE users SET token_version = 0 WHERE token_version IS NULL",
+    )
+    if postgres:
+        _execute(*(
+            f"ALTER TABLE users ALTER COLUMN {column} SET NOT NULL"
+            for column in ("first_name", "last_name", "must_change_password", "token_version")
+        ))
+
+
+def _baseline_game_server_columns(columns: set[str], postgres: bool) -> None:
+    added = [
+        (column, ddl)
+        for column, ddl in (
+            ("persistent", "BOOLEAN DEFAULT FALSE"),
+            ("owner_teacher_id", "INTEGER"),
+            ("class_id", "INTEGER"),
+            ("required_players", "INTEGER DEFAULT 2"),
+            ("first_heartbeat", "DOUBLE PRECISION"),
+            ("heartbeat_count", "INTEGER DEFAULT 0"),
+        )
+        if column not in columns
+    ]
+    if not added:
+        return
+    _execute(*(f"ALTER TABLE game_servers ADD COLUMN {column} {ddl}" for column, ddl in added))
+    _execute(
+        "UPDATE game_servers SET persistent = FALSE WHERE persistent IS NULL",
+        "UPDATE game_servers SET required_players = 2 WHERE required_players IS NULL OR required_players < 1",
+        "UPDATE game_servers SET heartbeat_count = 0 WHERE heartbeat_count IS NULL",
+    )
+    if postgres:
+        _execute(*(
+            f"ALTER TABLE game_servers ALTER COLUMN {column} SET NOT NULL"
+            for column in ("persistent", "required_players", "heartbeat_count")
+        ))
+
+
+def _baseline():
+    """Create the baseline tables and bring pre-migration databases up to them."""
+    engine = db.engine
+    postgres = engine.dialect.name == "postgresql"
+    # Legacy databases already have some of these tables: add what they lack.
+    _baseline_metadata.create_all(engine, checkfirst=True)
+    inspector = inspect(engine)
+    columns = {table: {col["name"] for col in inspector.get_columns(table)} for table in inspector.get_table_names()}
+
+    _baseline_user_columns(columns["users"], postgres)
+    _baseline_game_server_columns(columns["game_servers"], postgres)
+    if "class_id" not in columns["quizzes"]:
+        _execute("ALTER TABLE quizzes ADD COLUMN class_id INTEGER")
+    if "quiz_result_id" not in columns["messages"]:
+        _execute("ALTER TABLE messages ADD COLUMN quiz_result_id INTEGER")
+    for table in _BASELINE_PUBLIC_ID_TABLES:
+        if "public_id" not in columns[table]:
+            # Rows are filled later by app.server.services.public_id_backfill.
+            _execute(
+                f"ALTER TABLE {table} ADD COLUMN public_id VARCHAR(36)",
+                f"CREATE UNIQUE INDEX IF NOT EXISTS uq_{table}_public_id ON {table}(public_id)",
+            )
+
+
+# (name, table, columns, unique) for the predicates the routes filter on.
+# Keep in sync with the db.Index entries in app/server/models/user.py.
+HOT_QUERY_INDEXES = (
+    ("ix_mission_progress_user_mission", "mission_progress", ("user_id", "mission_id"), True),
+    ("ix_quiz_results_student_quiz", "quiz_results", ("student_id", "quiz_id"), True),
+    ("ix_messages_receiver_created", "messages", ("receiver_id", "created_at"), False),
+    ("ix_playtime_logs_user_date", "playtime_logs", ("user_id", "date"), False),
+    ("ix_users_parent_role", "users", ("parent_id", "role"), False),
+    ("ix_users_class_role", "users", ("class_id", "role"), False),
+    ("ix_quizzes_class_start", "quizzes", ("class_id", "start_date"), False),
+)
+
+
+DUPLICATE_REPORT_LIMIT = 10
+
+
+def _duplicate_groups(conn, table: str, columns: tuple[str, ...]) -> list[tuple]:
+    column_list = ", ".join(columns)
+    return [
+        tuple(row)
+        for row in conn.execute(text(
+            f"SELECT {column_list}, COUNT(*) FROM {table} GROUP BY {column_list} "
+            f"HAVING COUNT(*) > 1 ORDER BY COUNT(*) DESC LIMIT {DUPLICATE_REPORT_LIMIT}"
+        ))
+    ]
+
+
+def _create_index(name: str, table: str, columns: tuple[str, ...], unique: bool) -> None:
+    postgres = db.engine.dialect.name == "postgresql"
+    # CONCURRENTLY keeps the table writable while the index builds on Postgres.
+    concurrently = " CONCURRENTLY" if postgres else ""
+    sql = f"CREATE {'UNIQUE ' if unique else ''}INDEX{concurrently} IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            conn.execute(text(sql))
+        except IntegrityError:
+            if not unique:
+                raise
+            # A failed concurrent build leaves an invalid index behind; drop it so a
+            # rerun after cleaning up the duplicates can build it again.
+            conn.execute(text(f"DROP INDEX{concurrently} IF EXISTS {name}"))
+            groups = _duplicate_groups(conn, table, columns)
+            listed = "; ".join(
+                ", ".join(f"{column}={value!r}" for column, value in zip(columns, group)) + f" ({group[-1]} rows)"
+                for group in groups
+            )
+            raise RuntimeError(
+                f"Cannot create unique index {name}: {table} has duplicate ({', '.join(columns)}) rows. "
+                f"Remove them and restart. First {len(groups)} groups: {listed}"
+            ) from None
+
+
+def _hot_query_indexes():
+    for name, table, columns, unique in HOT_QUERY_INDEXES:
+        _create_index(name, table, columns, unique)
+
+
+def _maintenance_tasks():
+    # One row per finished one-off data task, so boots can skip it with a key lookup.
+    _execute(
+        "CREATE TABLE IF NOT EXISTS maintenance_tasks ("
+        "name VARCHAR(100) PRIMARY KEY, "
+        "completed_at DOUBLE PRECISION NOT NULL)"
+    )
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "baseline: create tables and legacy column fixes", _baseline),
+    Migration(2, "composite indexes for hot query predicates", _hot_query_indexes),
+    Migration(3, "maintenance_tasks completion flags", _maintenance_tasks),
+]
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def current_version() -> int:
+    """Newest applied version, or 0 if ``schema_version`` does not exist yet."""
+    try:
+        version = db.session.execute(
+            text("SELECT version FROM schema_version ORDER BY version DESC LIMIT 1")
+        ).scalar()
+    except SQLAlchemyError:
+        db.session.rollback()
+        return 0
+    db.session.commit()
+    return version or 0
+
+
+def _create_version_table():
+    db.session.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "version INTEGER PRIMARY KEY, "
+        "description VARCHAR(200) NOT NULL, "
+        "applied_at DOUBLE PRECISION NOT NULL, "
+        "duration_ms DOUBLE PRECISION NOT NULL)"
+    ))
+    db.session.commit()
+
+
+def run_migrations() -> list[int]:
+    """Apply pending migrations in order and return the versions applied."""
+    if current_version() >= LATEST_VERSION:
+        return []
+
+    lock_conn = None
+    if db.engine.dialect.name == "postgresql":
+        lock_conn = db.engine.connect()
+        # Poll rather than block: a waiter idle between attempts holds no snapshot,
+        # so it cannot stall a CREATE INDEX CONCURRENTLY run by the lock holder.
+        while True:
+            acquired = lock_conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY}
+            ).scalar()
+            lock_conn.commit()
+            if acquired:
+                break
+            time.sleep(0.5)
+
+    applied = []
+    try:
+        _create_version_table()
+        # Another worker may have finished while we waited for the lock.
+        version = current_version()
+        for migration in MIGRATIONS:
+            if migration.version <= version:
+                continue
+            started = time.perf_counter()
+            logger.info("Applying schema migration %d: %s", migration.version, migration.description)
+            migration.apply()
+            duration_ms = (time.perf_counter() - started) * 1000.0
+            db.session.execute(
+                text(
+                    "INSERT INTO schema_version (version, description, applied_at, duration_ms) "
+                    "VALUES (:version, :description, :applied_at, :duration_ms)"
+                ),
+                {
+                    "version": migration.version,
+                    "description": migration.description,
+                    "applied_at": time.time(),
+                    "duration_ms": duration_ms,
+                },
+            )
+            db.session.commit()
+            applied.append(migration.version)
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        if lock_conn is not None:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            lock_conn.commit()
+            lock_conn.close()
+    return applied
@@ -41,6 +41,8 @@ class PlayerState(BaseModel):
     inventory: dict[ItemType, int] = Field(default_factory=dict)
     health_status: HealthStatus = HealthStatus.HEALTHY
     mission_completed: bool = False
+    # None means the player is at the current round's event location.
+    location: LocationEvent | None = None
 
 
 class GameState(BaseModel):
@@ -15,6 +15,8 @@ class User(db.Model, TimestampMixin, PublicIdMixin):
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
     password_hash = db.Column(db.String(255), nullable=False)
     must_change_password = db.Column(db.Boolean, nullable=False, default=False)
+    # Bumped on password changes; tokens carrying an older version are rejected.
+    token_version = db.Column(db.Integer, nullable=False, default=0)
     role = db.Column(db.String(20), nullable=False) # Admin, Teacher, Parent, Student
     
     # Relationship: Parent -> Student (One Parent can have many Students/Children)
@@ -24,6 +26,11 @@ class User(db.Model, TimestampMixin, PublicIdMixin):
     # Relationship: Student -> Class (Many Students in one Class)
     class_id = db.Column(db.Integer, db.ForeignKey('classes.id'), nullable=True)
 
+    __table_args__ = (
+        db.Index('ix_users_parent_role', 'parent_id', 'role'),
+        db.Index('ix_users_class_role', 'class_id', 'role'),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -72,6 +79,9 @@ class MissionProgress(db.Model, TimestampMixin, PublicIdMixin):
     status = db.Column(db.String(20), default="started") # started, completed, failed
     score = db.Column(db.Integer, default=0)
 
+    # One progress row per student and mission
+    __table_args__ = (db.Index('ix_mission_progress_user_mission', 'user_id', 'mission_id', unique=True),)
+
 class Quiz(db.Model, TimestampMixin, PublicIdMixin):
     __tablename__ = 'quizzes'
     
@@ -83,6 +93,8 @@ class Quiz(db.Model, TimestampMixin, PublicIdMixin):
     start_date = db.Column(db.DateTime, default=datetime.utcnow)
     questions = db.relationship('QuizQuestion', backref='quiz', cascade='all, delete-orphan', lazy=True)
 
+    __table_args__ = (db.Index('ix_quizzes_class_start', 'class_id', 'start_date'),)
+
 class QuizQuestion(db.Model, TimestampMixin, PublicIdMixin):
     __tablename__ = 'quiz_questions'
     
@@ -103,6 +115,9 @@ class QuizResult(db.Model, TimestampMixin, PublicIdMixin):
     student_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     score = db.Column(db.Integer, nullable=False)
 
+    # A student submits each quiz once
+    __table_args__ = (db.Index('ix_quiz_results_student_quiz', 'student_id', 'quiz_id', unique=True),)
+
 class Message(db.Model, TimestampMixin, PublicIdMixin):
     __tablename__ = 'messages'
 
@@ -116,6 +131,8 @@ class Message(db.Model, TimestampMixin, PublicIdMixin):
     receiver = db.relationship('User', foreign_keys=[receiver_id], backref='received_messages')
     quiz_result = db.relationship('QuizResult', backref='feedback_messages')
 
+    __table_args__ = (db.Index('ix_messages_receiver_created', 'receiver_id', 'created_at'),)
+
 class GameServer(db.Model, PublicIdMixin):
     __tablename__ = 'game_servers'
     
@@ -129,10 +146,41 @@ class GameServer(db.Model, PublicIdMixin):
     persistent = db.Column(db.Boolean, nullable=False, default=False)
     owner_teacher_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     class_id = db.Column(db.Integer, db.ForeignKey('classes.id'), nullable=True)
+    first_heartbeat = db.Column(db.Float, nullable=True)
+    heartbeat_count = db.Column(db.Integer, nullable=False, default=0)
 
     # Composite unique constraint to identify servers by IP:Port
     __table_args__ = (db.UniqueConstraint('ip', 'port', name='_server_ip_port_uc'),)
 
+class GameServerUptime(db.Model):
+    """Lifetime totals for ephemeral servers whose game_servers rows were reaped."""
+    __tablename__ = 'game_server_uptime'
+
+    id = db.Column(db.Integer, primary_key=True)
+    ip = db.Column(db.String(50), nullable=False)
+    port = db.Column(db.Integer, nullable=False)
+    name = db.Column(db.String(100))
+    first_seen = db.Column(db.Float, nullable=True)
+    last_seen = db.Column(db.Float, nullable=True)
+    sessions = db.Column(db.Integer, nullable=False, default=0)
+    heartbeat_count = db.Column(db.BigInteger, nullable=False, default=0)
+    # Sum of (last - first heartbeat) over every archived row for this address
+    total_uptime_seconds = db.Column(db.Float, nullable=False, default=0.0)
+
+    __table_args__ = (db.UniqueConstraint('ip', 'port', name='_server_uptime_ip_port_uc'),)
+
+class RevokedToken(db.Model):
+    """Access/refresh token ids revoked before expiry (logout, refresh rotation)."""
+    __tablename__ = 'revoked_tokens'
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(64), unique=True, nullable=False, index=True)
+    user_id = db.Column(db.Integer, nullable=False, index=True)
+    token_type = db.Column(db.String(16), nullable=False, default='access')
+    # Rows can be dropped once the token would have expired anyway.
+    expires_at = db.Column(db.Float, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 # --- Logs ---
 
 class PlaytimeLog(db.Model, PublicIdMixin):
@@ -142,3 +190,5 @@ class PlaytimeLog(db.Model, PublicIdMixin):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     date = db.Column(db.Date, default=datetime.utcnow().date)
     duration_minutes = db.Column(db.Integer, default=0)
+
+    __table_args__ = (db.Index('ix_playtime_logs_user_date', 'user_id', 'date'),)
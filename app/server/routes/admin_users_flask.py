@@ -1,18 +1,26 @@
 from __future__ import annotations
 
+import os
 import time
 import re
 import secrets
 from datetime import datetime, timedelta
 
 from flask import Blueprint, jsonify, request
-from sqlalchemy import case, func
+from sqlalchemy import case, func, tuple_
 from sqlalchemy.exc import IntegrityError
 from werkzeug.security import generate_password_hash
 
 from app.auth.auth_bearer import token_required
+from app.auth.auth_handler import jwt_cache_stats
+from app.auth.password_hashing import hash_passwords, login_verifier
+from app.auth.token_state import revoke_user_tokens, token_state_cache
 from app.server.database import db
+from app.server.engine import pool_stats
 from app.server.models.user import Class, GameServer, MissionProgress, PlaytimeLog, QuizResult, User
+from app.server.services.public_id_backfill import public_id_backfill
+from app.server.services.server_registry import server_registry
+from app.server.services.server_telemetry import TELEMETRY_METRICS, TELEMETRY_SAMPLES
 
 
 admin_users_bp = Blueprint("admin_users", __name__)
@@ -209,6 +217,7 @@ def create_class():
         if student is None or student.role != "Student":
             continue
         student.class_id = classroom.id
+        token_state_cache.invalidate(student.id)
         assigned_students.append(student.id)
 
     db.session.commit()
@@ -232,6 +241,7 @@ def delete_class(class_id: int):
     students = User.query.filter_by(class_id=classroom.id, role="Student").all()
     for student in students:
         student.class_id = None
+        token_state_cache.invalidate(student.id)
 
     db.session.delete(classroom)
     db.session.commit()
@@ -285,6 +295,7 @@ def update_class(class_id: int):
         for student in current_students:
             if student.id not in normalized_student_ids:
                 student.class_id = None
+                token_state_cache.invalidate(student.id)
 
         if normalized_student_ids:
             selected_students = User.query.filter(
@@ -298,6 +309,7 @@ def update_class(class_id: int):
 
             for student in selected_students:
                 student.class_id = classroom.id
+                token_state_cache.invalidate(student.id)
                 assigned_students.append(student.id)
 
     db.session.commit()
@@ -379,77 +391,124 @@ def bulk_create_users():
     if not isinstance(users, list) or not users:
         return jsonify({"error": "No users provided"}), 400
 
+    started = time.perf_counter()
     created = []
     credentials = []
     errors = []
     reserved_usernames: set[str] = set()
     seen_emails: set[str] = set()
+    pending = []
+
+    # Pass 1: validate every row and pick usernames and temporary passwords.
+    candidate_emails = {
+        str(_normalize_import_row(u).get("email", "")).strip().lower()
+        for u in users
+        if isinstance(u, dict)
+    }
+    candidate_emails.discard("")
+    existing_emails = {
+        email for (email,) in db.session.query(User.email).filter(User.email.in_(candidate_emails)).all()
+    } if candidate_emails else set()
 
     for idx, u in enumerate(users):
+        if not isinstance(u, dict):
+            errors.append({"index": idx, "error": "row must be an object"})
+            continue
+
+        u = _normalize_import_row(u)
+        first_name = str(u.get("first_name", "")).strip()
+        last_name = str(u.get("last_name", "")).strip()
+        email = str(u.get("email", "")).strip().lower()
+        raw_role = str(u.get("role", "")).strip()
+        role = ROLE_BY_LOWER.get(raw_role.lower(), raw_role)
+
+        if not first_name or not last_name or not email or not raw_role:
+            errors.append({"index": idx, "error": "missing required first_name, last_name, email, or role", "email": email})
+            continue
+
+        if not _valid_email(email):
+            errors.append({"index": idx, "error": "invalid email address", "email": email})
+            continue
+
+        if email in seen_emails:
+            errors.append({"index": idx, "error": "duplicate email in uploaded CSV", "email": email})
+            continue
+        seen_emails.add(email)
+
+        if role not in CSV_ALLOWED_ROLES:
+            errors.append({"index": idx, "error": f"CSV upload only supports {', '.join(sorted(CSV_ALLOWED_ROLES))} roles", "email": email})
+            continue
+
+        if email in existing_emails:
+            errors.append({"index": idx, "error": "user with this email already exists", "email": email})
+            continue
+
+        pending.append(
+            {
+                "index": idx,
+                "first_name": first_name,
+                "last_name": last_name,
+                "email": email,
+                "role": role,
+                "username": _unique_bulk_username(first_name, last_name, reserved_usernames),
+                "password": _temporary_password(),
+            }
+        )
+    validated_at = time.perf_counter()
+
+    # Pass 2: the CPU-heavy key derivation, fanned out to the hashing pool.
+    hashed = hash_passwords([row["password"] for row in pending])
+    hashed_at = time.perf_counter()
+
+    # Pass 3: insert, one savepoint per row so a bad row does not sink the batch.
+    for row, password_hash in zip(pending, hashed.hashes):
+        user = User(
+            first_name=row["first_name"],
+            last_name=row["last_name"],
+            username=row["username"],
+            email=row["email"],
+            password_hash=password_hash,
+            must_change_password=True,
+            role=row["role"],
+        )
         try:
-            if not isinstance(u, dict):
-                errors.append({"index": idx, "error": "row must be an object"})
-                continue
-
-            u = _normalize_import_row(u)
-            first_name = str(u.get("first_name", "")).strip()
-            last_name = str(u.get("last_name", "")).strip()
-            email = str(u.get("email", "")).strip().lower()
-            raw_role = str(u.get("role", "")).strip()
-            role = ROLE_BY_LOWER.get(raw_role.lower(), raw_role)
-
-            if not first_name or not last_name or not email or not raw_role:
-                errors.append({"index": idx, "error": "missing required first_name, last_name, email, or role", "email": email})
-                continue
-
-            if not _valid_email(email):
-                errors.append({"index": idx, "error": "invalid email address", "email": email})
-                continue
-
-            if email in seen_emails:
-                errors.append({"index": idx, "error": "duplicate email in uploaded CSV", "email": email})
-                continue
-            seen_emails.add(email)
-
-            if role not in CSV_ALLOWED_ROLES:
-                errors.append({"index": idx, "error": f"CSV upload only supports {', '.join(sorted(CSV_ALLOWED_ROLES))} roles", "email": email})
-                continue
-
-            if User.query.filter_by(email=email).first():
-                errors.append({"index": idx, "error": "user with this email already exists", "email": email})
-                continue
-
-            username = _unique_bulk_username(first_name, last_name, reserved_usernames)
-            password = _temporary_password()
-
-            user = User(
-                first_name=first_name,
-                last_name=last_name,
-                username=username,
-                email=email,
-                password_hash=generate_password_hash(password),
-                must_change_password=True,
-                role=role,
-            )
-            db.session.add(user)
-            db.session.commit()
-            created.append(_serialize_user(user))
-            credentials.append(
-                {
-                    "first_name": first_name,
-                    "last_name": last_name,
-                    "username": username,
-                    "temp_password": password,
-                }
-            )
+            with db.session.begin_nested():
+                db.session.add(user)
         except IntegrityError as ie:
-            db.session.rollback()
-            errors.append({"index": idx, "error": f"Database integrity error: {str(ie)}", "email": u.get("email", "N/A")})
+            errors.append({"index": row["index"], "error": f"Database integrity error: {str(ie)}", "email": row["email"]})
+            continue
         except Exception as exc:
-            db.session.rollback() # Rollback any partial changes for this user
-            errors.append({"index": idx, "error": str(exc), "email": u.get("email", "N/A")})
+            errors.append({"index": row["index"], "error": str(exc), "email": row["email"]})
+            continue
+        # Serialize while the flushed state is loaded; after commit each row would be refetched.
+        created.append(_serialize_user(user))
+        credentials.append(
+            {
+                "first_name": row["first_name"],
+                "last_name": row["last_name"],
+                "username": row["username"],
+                "temp_password": row["password"],
+            }
+        )
 
-    return jsonify({"created": created, "credentials": credentials, "errors": errors}), 201
+    db.session.commit()
+    finished = time.perf_counter()
+
+    total_seconds = finished - started
+    stats = {
+        "rows": len(users),
+        "created": len(created),
+        "failed": len(errors),
+        "hash_workers": hashed.workers,
+        "validate_ms": round((validated_at - started) * 1000, 3),
+        "hash_ms": round((hashed_at - validated_at) * 1000, 3),
+        "insert_ms": round((finished - hashed_at) * 1000, 3),
+        "total_ms": round(total_seconds * 1000, 3),
+        "users_per_second": round(len(created) / total_seconds, 1) if total_seconds > 0 else None,
+    }
+    errors.sort(key=lambda error: error["index"])
+    print("[admin/users:bulk-create] stats=", stats)
+    return jsonify({"created": created, "credentials": credentials, "errors": errors, "stats": stats}), 201
 
 
 @admin_users_bp.route("/api/admin/users", methods=["GET"])
@@ -513,6 +572,7 @@ def update_user(user_id: int):
     if password:
         user.password_hash = generate_password_hash(password)
         user.must_change_password = False
+        revoke_user_tokens(user)
 
     db.session.commit()
     return jsonify(_serialize_user(user)), 200
@@ -580,6 +640,7 @@ def assign_student_class_and_teacher():
 
     classroom.teacher_id = teacher.id
     student.class_id = classroom.id
+    token_state_cache.invalidate(student.id)
 
     db.session.commit()
 
@@ -592,6 +653,81 @@ def assign_student_class_and_teacher():
     ), 200
 
 
+@admin_users_bp.route("/api/admin/servers/registry-stats", methods=["GET"])
+@token_required
+def server_registry_stats():
+    if request.current_user_role != "Admin":
+        return jsonify({"error": "Unauthorized"}), 403
+
+    # Figures are for the worker process that served this request.
+    return jsonify(server_registry.stats()), 200
+
+
+@admin_users_bp.route("/api/admin/db/pool-stats", methods=["GET"])
+@token_required
+def db_pool_stats():
+    if request.current_user_role != "Admin":
+        return jsonify({"error": "Unauthorized"}), 403
+
+    # Pool of the worker process that served this request.
+    return jsonify(pool_stats(db.engine)), 200
+
+
+@admin_users_bp.route("/api/admin/maintenance/public-id-backfill", methods=["GET"])
+@token_required
+def public_id_backfill_progress():
+    if request.current_user_role != "Admin":
+        return jsonify({"error": "Unauthorized"}), 403
+
+    return jsonify(public_id_backfill.stats()), 200
+
+
+@admin_users_bp.route("/api/admin/auth/login-metrics", methods=["GET"])
+@token_required
+def login_metrics():
+    if request.current_user_role != "Admin":
+        return jsonify({"error": "Unauthorized"}), 403
+
+    # Figures are for the worker process that served this request.
+    return jsonify({**login_verifier.stats(), "token_cache": jwt_cache_stats()}), 200
+
+
+@admin_users_bp.route("/api/admin/servers/telemetry", methods=["GET"])
+@token_required
+def server_telemetry():
+    if request.current_user_role != "Admin":
+        return jsonify({"error": "Unauthorized"}), 403
+
+    ip = request.args.get("ip") or None
+    port = request.args.get("port", type=int)
+    limit = request.args.get("limit", type=int)
+
+    # Samples live in memory, so this only covers heartbeats received by this worker.
+    # heartbeats_total is the flushed count from every worker, to show how much of
+    # each server's traffic the samples represent.
+    servers = server_registry.telemetry(ip=ip, port=port, limit=limit)
+    totals = {}
+    if servers:
+        rows = (
+            db.session.query(GameServer.ip, GameServer.port, GameServer.heartbeat_count)
+            .filter(tuple_(GameServer.ip, GameServer.port).in_([(s["ip"], s["port"]) for s in servers]))
+            .all()
+        )
+        totals = {(row.ip, row.port): row.heartbeat_count for row in rows}
+    for server in servers:
+        server["heartbeats_total"] = totals.get((server["ip"], server["port"]))
+
+    return jsonify(
+        {
+            "pid": os.getpid(),
+            "scope": "worker",
+            "metrics": list(TELEMETRY_METRICS),
+            "capacity": TELEMETRY_SAMPLES,
+            "servers": servers,
+        }
+    ), 200
+
+
 @admin_users_bp.route("/api/admin/dashboard/analytics", methods=["GET"])
 @token_required
 def dashboard_analytics():
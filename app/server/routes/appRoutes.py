@@ -1,13 +1,16 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
+from sqlalchemy.exc import IntegrityError
 from app.server.database import db
-from app.server.models.user import GameServer, MissionProgress, Mission
+from app.server.models.user import MissionProgress, Mission
+from app.server.services.server_registry import server_registry
+from app.server.services.server_telemetry import parse_metrics
 from app.auth.auth_bearer import token_required
-from sqlalchemy import or_
-import time
-from datetime import datetime
+from app.auth.token_state import token_state_cache
 
 app_bp = Blueprint('app_routes', __name__)
 
+STREAM_KEEPALIVE_SECONDS = 15
+
 # --- Game Server Registry ---
 
 @app_bp.route('/server/register', methods=['POST'])
@@ -15,6 +18,8 @@ def register_server():
     """
     Called by Godot Server to register itself.
     No JWT auth required for servers typically, or use a shared API key.
+    Heartbeats are absorbed by the in-memory registry and written to the
+    database in periodic batches.
     """
     data = request.json
     client_ip = request.remote_addr
@@ -24,6 +29,11 @@ def register_server():
     count = data.get("count", 0)
     required_players = data.get("required_players", 2)
 
+    try:
+        port = int(port)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'port must be an integer'}), 400
+
     try:
         count = max(0, int(count))
     except (TypeError, ValueError):
@@ -37,80 +47,83 @@ def register_server():
     if advertised_ip == "":
         advertised_ip = client_ip
 
-    # Check if server exists
-    server = GameServer.query.filter_by(ip=advertised_ip, port=port).first()
-    
-    if server:
-        server.last_heartbeat = time.time()
-        server.player_count = count
-        server.required_players = required_players
-        server.name = name # Update name if changed
-    else:
-        server = GameServer(
-            ip=advertised_ip,
-            port=port, 
-            name=name, 
-            player_count=count,
-            required_players=required_players,
-            last_heartbeat=time.time()
-        )
-        db.session.add(server)
-    
-    db.session.commit()
+    server_registry.record_heartbeat(
+        ip=advertised_ip,
+        port=port,
+        name=name,
+        player_count=count,
+        required_players=required_players,
+        metrics=parse_metrics(data.get("metrics")),
+    )
     return "OK", 200
 
 @app_bp.route('/server/list', methods=['GET'])
 def list_servers():
     """
     Returns list of active game servers (heartbeat within last 15s)
-    plus persistent teacher-created lobbies.
+    plus persistent teacher-created lobbies, served from the in-memory registry.
+    The list is a short-lived cached snapshot; send If-None-Match with the
+    last ETag to get a 304 when nothing changed.
     """
-    now = time.time()
-    cutoff = now - 15 # 15 seconds timeout
-    
-    # Query DB for active heartbeat servers OR persistent lobbies.
-    active_servers = GameServer.query.filter(
-        or_(GameServer.last_heartbeat > cutoff, GameServer.persistent.is_(True))
-    ).all()
-    
-    server_list = []
-    for s in active_servers:
-        is_teacher_lobby = bool(s.persistent and s.owner_teacher_id is not None)
-        is_recently_active = bool(s.last_heartbeat and s.last_heartbeat > cutoff)
-        is_online = is_recently_active or is_teacher_lobby
-
-        # Teacher lobbies are always listed online; if no active heartbeat yet,
-        # treat current players as 0 and keep room in "Not yet started" state.
-        current_players = int(s.player_count or 0) if is_recently_active else 0
-        required_players = max(1, int(s.required_players or 2))
-        if is_teacher_lobby and required_players < 2:
-            required_players = 2
-
-        # Started means the room is actively running and has reached a playable threshold.
-        is_started = is_recently_active and current_players >= required_players
-
-        if is_started:
-            status = 'Started'
-        elif is_online:
-            status = 'Not yet started'
-        else:
-            status = 'Offline'
-
-        server_list.append({
-            "ip": s.ip,
-            "port": s.port,
-            "name": s.name,
-            "count": current_players,
-            "persistent": bool(s.persistent),
-            "online": is_online,
-            "joinable": is_online,
-            "current_players": current_players,
-            "required_players": required_players,
-            "started": is_started,
-            "status": status
-        })
-        
-    return jsonify(server_list), 200
+    snapshot = server_registry.list_snapshot()
+    response = Response(snapshot.body, mimetype='application/json')
+    response.set_etag(snapshot.etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+@app_bp.route('/server/match', methods=['GET'])
+@token_required
+def match_server():
+    """
+    Pick the best server for the current user: their class's teacher lobbies
+    and public servers, preferring rooms closest to starting. Answered from
+    the in-memory registry. The class comes from the token state cache that
+    token_required already loaded, so a pick does not query the database.
+    """
+    state = token_state_cache.get(int(request.current_user_id))
+    if state is None:
+        return jsonify({'error': 'User not found'}), 404
+
+    server = server_registry.best_server(class_id=state.class_id)
+    if server is None:
+        return jsonify({'error': 'No joinable server available'}), 404
+    return jsonify(server), 200
+
+@app_bp.route('/server/stream', methods=['GET'])
+def stream_servers():
+    """
+    Server-Sent Events feed of the server list. Sends a `snapshot` event with
+    the full list, then `server_added`, `server_updated` and `server_expired`
+    events as heartbeats arrive or time out. Reconnects resume from
+    Last-Event-ID when the backlog still covers it.
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    # Ids are "<epoch>:<seq>"; an id from another worker gets a fresh snapshot.
+    resume_cursor = server_registry.parse_feed_cursor(last_event_id)
+
+    def generate():
+        cursor = resume_cursor
+        if cursor is None:
+            cursor, frame = server_registry.feed_snapshot()
+            yield frame
+
+        while True:
+            frames = server_registry.feed_since(cursor, timeout=STREAM_KEEPALIVE_SECONDS)
+            if frames is None:
+                cursor, frame = server_registry.feed_snapshot()
+                yield frame
+                continue
+            if not frames:
+                yield ': keepalive\n\n'
+                continue
+            cursor = frames[-1][0]
+            yield ''.join(frame for _, frame in frames)
+
+    return Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
 
 # --- Gameplay Progress ---
 
@@ -146,6 +159,14 @@ def update_mission():
             status=status
         )
         db.session.add(progress)
-        
-    db.session.commit()
+
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent request created the row first (unique user_id, mission_id).
+        db.session.rollback()
+        progress = MissionProgress.query.filter_by(user_id=user_id, mission_id=mission_id).first()
+        progress.score = max(progress.score, score)
+        progress.status = status
+        db.session.commit()
     return jsonify({'message': 'Progress saved'}), 200
@@ -81,11 +81,60 @@ def _openapi_spec(base_url: str):
                         },
                     },
                     'responses': {
-                        '200': {'description': 'Returns access token'},
+                        '200': {'description': 'Returns access and refresh tokens'},
                         '401': {'description': 'Invalid credentials'},
+                        '503': {'description': 'Too many concurrent sign-ins; retry after Retry-After seconds'},
                     },
                 }
             },
+            '/auth/refresh': {
+                'post': {
+                    'tags': ['Auth'],
+                    'summary': 'Exchange a refresh token for a new token pair',
+                    'requestBody': {
+                        'required': True,
+                        'content': {
+                            'application/json': {
+                                'schema': {
+                                    'type': 'object',
+                                    'required': ['refresh_token'],
+                                    'properties': {'refresh_token': {'type': 'string'}},
+                                }
+                            }
+                        },
+                    },
+                    'responses': {
+                        '200': {'description': 'Returns new access and refresh tokens'},
+                        '401': {'description': 'Invalid, expired or revoked refresh token'},
+                    },
+                }
+            },
+            '/auth/logout': {
+                'post': {
+                    'tags': ['Auth'],
+                    'summary': 'Revoke the current access token and optional refresh token',
+                    'security': [{'BearerAuth': []}],
+                    'requestBody': {
+                        'required': False,
+                        'content': {
+                            'application/json': {
+                                'schema': {
+                                    'type': 'object',
+                                    'properties': {'refresh_token': {'type': 'string'}},
+                                }
+                            }
+                        },
+                    },
+                    'responses': {'200': {'description': 'Logged out'}, '401': {'description': 'Missing or invalid token'}},
+                }
+            },
+            '/.well-known/jwks.json': {
+                'get': {
+                    'tags': ['Auth'],
+                    'summary': 'Public JWT verification keys (empty when tokens are HMAC-signed)',
+                    'responses': {'200': {'description': 'JWK set'}},
+                }
+            },
             '/parent/link_child': {
                 'post': {
                     'tags': ['Parent'],
@@ -164,6 +213,18 @@ def _openapi_spec(base_url: str):
                     'responses': {'200': {'description': 'List of active servers'}},
                 }
             },
+            '/server/match': {
+                'get': {
+                    'tags': ['Server Registry'],
+                    'summary': 'Pick the best joinable server for the current user',
+                    'security': [{'BearerAuth': []}],
+                    'responses': {
+                        '200': {'description': 'Selected server'},
+                        '401': {'description': 'Missing or invalid token'},
+                        '404': {'description': 'No joinable server available'},
+                    },
+                }
+            },
             '/mission/update': {
                 'post': {
                     'tags': ['Gameplay'],
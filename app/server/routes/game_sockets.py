@@ -15,6 +15,7 @@ from app.server.models.game_models import (
     PlayerState,
     VisibleRole,
 )
+from app.server.services.event_rules import get_event_ruleset
 from app.server.services.game_logic import GameEngine
 
 
@@ -23,6 +24,10 @@ class SocketEnvelope(BaseModel):
     data: dict[str, Any] = Field(default_factory=dict)
 
 
+class MoveRequest(BaseModel):
+    location: LocationEvent | None = None
+
+
 class TradeRequest(BaseModel):
     with_player_id: str = Field(min_length=1)
     items_offered_a: dict[str, int] = Field(default_factory=dict)
@@ -38,9 +43,12 @@ class LobbyRuntime(BaseModel):
 
 
 class LobbySocketHub:
+    LEADERBOARD_SIZE: int = 5
+
     def __init__(self) -> None:
         self._connections: dict[str, dict[str, WebSocket]] = {}
         self._lobbies: dict[str, LobbyRuntime] = {}
+        self._ruleset = get_event_ruleset()
 
     async def connect_to_lobby(self, lobby_id: str, player_token: str, websocket: WebSocket) -> str:
         auth_payload = self._parse_player_token(player_token)
@@ -55,7 +63,10 @@ class LobbySocketHub:
         lobby_runtime = self._lobbies.get(lobby_id)
         if lobby_runtime is None:
             game_state = GameState(lobby_id=lobby_id, current_event=LocationEvent.SCHOOL, lockdown_meter=0)
-            lobby_runtime = LobbyRuntime(game_state=game_state, engine=GameEngine(game_state))
+            lobby_runtime = LobbyRuntime(
+                game_state=game_state,
+                engine=GameEngine(game_state, ruleset=self._ruleset),
+            )
             self._lobbies[lobby_id] = lobby_runtime
 
         player_state = self._find_player(lobby_runtime.game_state, player_id)
@@ -69,13 +80,20 @@ class LobbySocketHub:
                 },
                 health_status=HealthStatus.HEALTHY,
             )
-            lobby_runtime.game_state.players.append(player_state)
+            lobby_runtime.engine.add_player(player_state)
 
         if lobby_runtime.timer_task is None or lobby_runtime.timer_task.done():
             lobby_runtime.timer_task = asyncio.create_task(self.start_event_timer(lobby_id))
 
         return player_id
 
+    def get_lobby(self, lobby_id: str) -> LobbyRuntime | None:
+        return self._lobbies.get(lobby_id)
+
+    def close_lobby(self, lobby_id: str) -> None:
+        """Drop a lobby and its connections and stop its event timer."""
+        self._cleanup_lobby(lobby_id)
+
     def disconnect_from_lobby(self, lobby_id: str, player_id: str) -> None:
         lobby_connections = self._connections.get(lobby_id)
         if lobby_connections is None:
@@ -144,6 +162,32 @@ class LobbySocketHub:
             },
         )
 
+    async def handle_move(self, lobby_id: str, player_id: str, payload: dict[str, Any]) -> None:
+        runtime = self._get_lobby_runtime_or_raise(lobby_id)
+
+        try:
+            move = MoveRequest.model_validate(payload)
+        except ValidationError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid move payload: {exc.errors()}",
+            ) from exc
+
+        player = self._find_player(runtime.game_state, player_id)
+        if player is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Player '{player_id}' not found in lobby '{lobby_id}'.",
+            )
+
+        runtime.engine.move_player(player, move.location)
+
+        await self._send_to_player(
+            lobby_id=lobby_id,
+            player_id=player_id,
+            message={"event": "move_result", "data": {"you": self._private_player_payload(player)}},
+        )
+
     async def broadcast_game_state(self, lobby_id: str, game_over: bool = False, scores: list[dict] | None = None) -> None:
         runtime = self._get_lobby_runtime_or_raise(lobby_id)
         lobby_connections = self._connections.get(lobby_id, {})
@@ -151,6 +195,7 @@ class LobbySocketHub:
             return
 
         players_public = [self._public_player_payload(player) for player in runtime.game_state.players]
+        leaderboard = runtime.engine.live_leaderboard(self.LEADERBOARD_SIZE)
 
         for recipient_id, recipient_socket in list(lobby_connections.items()):
             recipient = self._find_player(runtime.game_state, recipient_id)
@@ -165,6 +210,9 @@ class LobbySocketHub:
                 "max_rounds": runtime.game_state.max_rounds,
                 "public_players": players_public,
                 "you": self._private_player_payload(recipient),
+                "leaderboard": leaderboard,
+                "your_rank": runtime.engine.rank_of(recipient_id),
+                "your_score": runtime.engine.score_of(recipient_id),
             }
 
             if game_over:
@@ -187,6 +235,7 @@ class LobbySocketHub:
             current_round = runtime.game_state.current_round
             max_rounds = runtime.game_state.max_rounds
 
+            occupancy = runtime.engine.apply_location_exposure()
             announcement = runtime.engine.rotate_event()
             hints = self._build_event_hints(runtime.game_state.current_event)
 
@@ -198,6 +247,7 @@ class LobbySocketHub:
                         "current_event": runtime.game_state.current_event.value,
                         "announcement": announcement,
                         "hints": hints,
+                        "occupancy": occupancy,
                         "round": current_round,
                         "max_rounds": max_rounds,
                     },
@@ -301,6 +351,7 @@ class LobbySocketHub:
             "visible_role": player.visible_role.value,
             "inventory": {item.value: count for item, count in player.inventory.items()},
             "mission_completed": player.mission_completed,
+            "location": player.location.value if player.location is not None else None,
         }
 
     def _private_player_payload(self, player: PlayerState) -> dict[str, Any]:
@@ -311,32 +362,11 @@ class LobbySocketHub:
             "health_status": player.health_status.value,
             "inventory": {item.value: count for item, count in player.inventory.items()},
             "mission_completed": player.mission_completed,
+            "location": player.location.value if player.location is not None else None,
         }
 
     def _build_event_hints(self, current_event: LocationEvent) -> list[str]:
-        hints_map: dict[LocationEvent, list[str]] = {
-            LocationEvent.SCHOOL: [
-                "School protocol active: verify item counts before trading.",
-                "Crowd movement is moderate this round.",
-            ],
-            LocationEvent.PARK: [
-                "Open-air advantage: exposure pressure is lower.",
-                "Spacing trades out can reduce cumulative risk.",
-            ],
-            LocationEvent.CANTEEN: [
-                "Canteen crowding alert: infection checks are stricter.",
-                "Masks have higher tactical value in this event.",
-            ],
-            LocationEvent.CLINIC: [
-                "Clinic event: coordinate medicine exchanges efficiently.",
-                "Observe behavior cues before voting phases.",
-            ],
-            LocationEvent.MARKET: [
-                "Market surge: expect more frequent trade opportunities.",
-                "Track your mission items to avoid unnecessary risk.",
-            ],
-        }
-        return hints_map[current_event]
+        return list(self._ruleset.rule_for(current_event).hints)
 
 
 router = APIRouter(prefix="/ws", tags=["game-sockets"])
@@ -345,7 +375,7 @@ socket_hub = LobbySocketHub()
 
 @router.post("/lobby/{lobby_id}/start_event_timer")
 async def start_event_timer(lobby_id: str) -> dict[str, str]:
-    runtime = socket_hub._lobbies.get(lobby_id)
+    runtime = socket_hub.get_lobby(lobby_id)
     if runtime is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -370,13 +400,15 @@ async def connect_to_lobby(websocket: WebSocket, lobby_id: str, player_token: st
 
             if envelope.event == "request_trade":
                 await socket_hub.handle_trade(lobby_id, player_id, envelope.data)
+            elif envelope.event == "move_to_location":
+                await socket_hub.handle_move(lobby_id, player_id, envelope.data)
             else:
                 await websocket.send_json(
                     {
                         "event": "error",
                         "data": {
                             "detail": f"Unsupported event '{envelope.event}'.",
-                            "supported_events": ["request_trade"],
+                            "supported_events": ["request_trade", "move_to_location"],
                         },
                     }
                 )
@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify, request
 from sqlalchemy import func
 from app.auth.auth_bearer import token_required
+from app.auth.current_user import get_current_user
 from app.server.database import db
 from app.server.models.user import User, Message, QuizResult, Quiz, MissionProgress, PlaytimeLog
 
@@ -9,13 +10,54 @@ parent_bp = Blueprint('parent', __name__)
 
 def _parent_guard():
     """Check if current user is a Parent"""
-    user_id = int(request.current_user_id)
-    user = User.query.get(user_id)
+    user = get_current_user()
     if not user or user.role != 'Parent':
         return jsonify({'error': 'Unauthorized: must be a Parent'}), 403
     return None
 
 
+def _display_name(user):
+    return f"{user.first_name} {user.last_name}".strip() or user.username
+
+
+def _quiz_info_by_result(quiz_result_ids):
+    """quiz_info for each quiz result id, with one query per table."""
+    if not quiz_result_ids:
+        return {}
+    quiz_results = QuizResult.query.filter(QuizResult.id.in_(set(quiz_result_ids))).all()
+    quiz_ids = {quiz_result.quiz_id for quiz_result in quiz_results}
+    student_ids = {quiz_result.student_id for quiz_result in quiz_results}
+    quizzes = {quiz.id: quiz for quiz in Quiz.query.filter(Quiz.id.in_(quiz_ids)).all()} if quiz_ids else {}
+    students = {user.id: user for user in User.query.filter(User.id.in_(student_ids)).all()} if student_ids else {}
+
+    quiz_info = {}
+    for quiz_result in quiz_results:
+        quiz = quizzes.get(quiz_result.quiz_id)
+        student = students.get(quiz_result.student_id)
+        quiz_info[quiz_result.id] = {
+            'quiz_result_id': quiz_result.id,
+            'quiz_title': quiz.title if quiz else None,
+            'student_name': _display_name(student) if student else None,
+            'score': quiz_result.score,
+            'submitted_at': quiz_result.created_at.isoformat() if quiz_result.created_at else None
+        }
+    return quiz_info
+
+
+def _message_dict(msg, quiz_info):
+    return {
+        'id': msg.id,
+        'public_id': msg.public_id,
+        'sender_id': msg.sender_id,
+        'sender_name': _display_name(msg.sender),
+        'receiver_id': msg.receiver_id,
+        'receiver_name': _display_name(msg.receiver),
+        'content': msg.content,
+        'created_at': msg.created_at.isoformat() if msg.created_at else None,
+        'quiz_info': quiz_info.get(msg.quiz_result_id) if msg.quiz_result_id else None
+    }
+
+
 @parent_bp.route('/parent/feedback', methods=['GET'])
 @token_required
 def get_parent_feedback():
@@ -35,7 +77,10 @@ def get_parent_feedback():
     child_ids = [child.id for child in children]
     
     # Get all messages sent to parent or to parent's children
-    messages_query = Message.query.filter(
+    messages_query = Message.query.options(
+        db.joinedload(Message.sender),
+        db.joinedload(Message.receiver),
+    ).filter(
         db.or_(
             Message.receiver_id == parent_id,
             Message.receiver_id.in_(child_ids) if child_ids else False
@@ -44,35 +89,9 @@ def get_parent_feedback():
     
     messages = messages_query.all()
     
-    feedback_data = []
-    for msg in messages:
-        message_dict = {
-            'id': msg.id,
-            'public_id': msg.public_id,
-            'sender_id': msg.sender_id,
-            'sender_name': f"{msg.sender.first_name} {msg.sender.last_name}".strip() or msg.sender.username,
-            'receiver_id': msg.receiver_id,
-            'receiver_name': f"{msg.receiver.first_name} {msg.receiver.last_name}".strip() or msg.receiver.username,
-            'content': msg.content,
-            'created_at': msg.created_at.isoformat() if msg.created_at else None,
-            'quiz_info': None
-        }
-        
-        # If message is linked to a quiz result, include quiz details
-        if msg.quiz_result_id:
-            quiz_result = QuizResult.query.get(msg.quiz_result_id)
-            if quiz_result:
-                quiz = Quiz.query.get(quiz_result.quiz_id)
-                student = User.query.get(quiz_result.student_id)
-                message_dict['quiz_info'] = {
-                    'quiz_result_id': quiz_result.id,
-                    'quiz_title': quiz.title if quiz else None,
-                    'student_name': f"{student.first_name} {student.last_name}".strip() or student.username if student else None,
-                    'score': quiz_result.score,
-                    'submitted_at': quiz_result.created_at.isoformat() if quiz_result.created_at else None
-                }
-        
-        feedback_data.append(message_dict)
+    # Quiz details for every linked message, loaded up front
+    quiz_info = _quiz_info_by_result([msg.quiz_result_id for msg in messages if msg.quiz_result_id])
+    feedback_data = [_message_dict(msg, quiz_info) for msg in messages]
     
     return jsonify({
         'feedback': feedback_data,
@@ -90,46 +109,24 @@ def get_feedback_detail(message_id):
         return guard
 
     parent_id = int(request.current_user_id)
-    message = Message.query.get(message_id)
+    message = Message.query.options(
+        db.joinedload(Message.sender),
+        db.joinedload(Message.receiver),
+    ).filter_by(id=message_id).first()
     
     if not message:
         return jsonify({'error': 'Message not found'}), 404
     
     # Check if parent has access to this message
     # Parent can view if they're the receiver or if their child is the receiver
-    children = User.query.filter_by(parent_id=parent_id, role='Student').all()
-    child_ids = [child.id for child in children]
-    
-    if message.receiver_id != parent_id and message.receiver_id not in child_ids:
+    receiver = message.receiver
+    is_child = receiver.parent_id == parent_id and receiver.role == 'Student'
+    if message.receiver_id != parent_id and not is_child:
         return jsonify({'error': 'Unauthorized: message not for you or your children'}), 403
     
-    message_dict = {
-        'id': message.id,
-        'public_id': message.public_id,
-        'sender_id': message.sender_id,
-        'sender_name': f"{message.sender.first_name} {message.sender.last_name}".strip() or message.sender.username,
-        'receiver_id': message.receiver_id,
-        'receiver_name': f"{message.receiver.first_name} {message.receiver.last_name}".strip() or message.receiver.username,
-        'content': message.content,
-        'created_at': message.created_at.isoformat() if message.created_at else None,
-        'quiz_info': None
-    }
-    
     # Include quiz details if available
-    if message.quiz_result_id:
-        quiz_result = QuizResult.query.get(message.quiz_result_id)
-        if quiz_result:
-            quiz = Quiz.query.get(quiz_result.quiz_id)
-            student = User.query.get(quiz_result.student_id)
-            message_dict['quiz_info'] = {
-                'quiz_result_id': quiz_result.id,
-                'quiz_title': quiz.title if quiz else None,
-                'student_name': f"{student.first_name} {student.last_name}".strip() or student.username if student else None,
-                'score': quiz_result.score,
-                'submitted_at': quiz_result.created_at.isoformat() if quiz_result.created_at else None
-            }
-    
-    return jsonify(message_dict), 200
+    quiz_info = _quiz_info_by_result([message.quiz_result_id] if message.quiz_result_id else [])
+    return jsonify(_message_dict(message, quiz_info)), 200
 
 
 @parent_bp.route('/parent/stats', methods=['GET'])
@@ -147,11 +144,24 @@ def get_parent_stats():
     
     # Get all children (students linked to this parent)
     children = User.query.filter_by(parent_id=parent_id, role='Student').all()
+    child_ids = [child.id for child in children]
+
+    # One query per table for every child, grouped in Python
+    logs_by_child = {child_id: [] for child_id in child_ids}
+    progress_by_child = {child_id: [] for child_id in child_ids}
+    results_by_child = {child_id: [] for child_id in child_ids}
+    if child_ids:
+        for log in PlaytimeLog.query.filter(PlaytimeLog.user_id.in_(child_ids)).order_by(PlaytimeLog.date.desc()).all():
+            logs_by_child[log.user_id].append(log)
+        for mp in MissionProgress.query.filter(MissionProgress.user_id.in_(child_ids)).all():
+            progress_by_child[mp.user_id].append(mp)
+        for qr in QuizResult.query.filter(QuizResult.student_id.in_(child_ids)).all():
+            results_by_child[qr.student_id].append(qr)
     
     stats_list = []
     for child in children:
         # Get playtime logs
-        playtime_logs = PlaytimeLog.query.filter_by(user_id=child.id).order_by(PlaytimeLog.date.desc()).all()
+        playtime_logs = logs_by_child[child.id]
         playtime_data = [
             {
                 'date': str(log.date),
@@ -163,7 +173,7 @@ def get_parent_stats():
         ]
         
         # Get mission progress
-        mission_progress = MissionProgress.query.filter_by(user_id=child.id).all()
+        mission_progress = progress_by_child[child.id]
         mission_data = [
             {
                 'mission_id': mp.mission_id,
@@ -176,7 +186,7 @@ def get_parent_stats():
         ]
         
         # Get quiz results
-        quiz_results = QuizResult.query.filter_by(student_id=child.id).all()
+        quiz_results = results_by_child[child.id]
         quiz_data = [
             {
                 'quiz_id': qr.quiz_id,
@@ -5,6 +5,7 @@ from flask import Blueprint, jsonify, request
 from sqlalchemy import case, func
 
 from app.auth.auth_bearer import token_required
+from app.auth.current_user import get_current_user
 from app.server.database import db
 from app.server.models.user import (
     Class,
@@ -18,6 +19,7 @@ from app.server.models.user import (
     User,
 )
 from app.server.models.announcement import Announcement
+from app.server.services.server_registry import server_registry
 
 teacher_bp = Blueprint('teacher', __name__)
 
@@ -64,7 +66,7 @@ def class_overview():
         return guard
 
     teacher_id = int(request.current_user_id)
-    teacher = User.query.get(teacher_id)
+    teacher = get_current_user()
     teacher_profile = {
         'id': teacher.id,
         'public_id': teacher.public_id,
@@ -833,6 +835,7 @@ def create_lobby():
         existing.owner_teacher_id = teacher_id
         existing.class_id = classroom.id
         db.session.commit()
+        server_registry.sync_row(existing)
         return jsonify(
             {
                 'message': 'Lobby updated successfully',
@@ -867,6 +870,7 @@ def create_lobby():
     )
     db.session.add(lobby)
     db.session.commit()
+    server_registry.sync_row(lobby)
 
     return jsonify(
         {
@@ -938,6 +942,7 @@ def delete_teacher_lobby(lobby_public_id: str):
 
     db.session.delete(lobby)
     db.session.commit()
+    server_registry.forget(lobby.ip, lobby.port)
     return jsonify({'message': 'Lobby removed successfully', 'public_id': lobby_public_id}), 200
 
 
@@ -1,9 +1,16 @@
+import time
+
 from flask import Blueprint, request, jsonify
+from sqlalchemy.exc import IntegrityError
 from werkzeug.security import generate_password_hash, check_password_hash
 from app.server.database import db
 from app.server.models.user import Class, Message, Quiz, QuizResult, User
-from app.auth.auth_handler import signJWT
+from app.auth.auth_handler import ACCESS_TOKEN_TTL_SECONDS, decodeJWT, public_jwks, signJWT, signRefreshJWT
+from app.auth.revocation import revocation_list, revoke_token
+from app.auth.password_hashing import VerifierOverloaded, login_verifier
+from app.auth.token_state import revoke_user_tokens
 from app.auth.auth_bearer import token_required
+from app.auth.current_user import get_current_user
 
 user_bp = Blueprint('user', __name__)
 
@@ -38,8 +45,30 @@ def register():
 
     return jsonify({'message': 'User registered successfully'}), 201
 
+def _issue_tokens(user):
+    """Access + refresh token pair for ``user``."""
+    tokens = signJWT(
+        str(user.id),
+        user.role,
+        must_change_password=bool(getattr(user, 'must_change_password', False)),
+        token_version=user.token_version or 0,
+    )
+    tokens.update(signRefreshJWT(str(user.id), user.role, token_version=user.token_version or 0))
+    tokens['token_type'] = 'Bearer'
+    tokens['expires_in'] = ACCESS_TOKEN_TTL_SECONDS
+    return tokens
+
+
 @user_bp.route('/auth/login', methods=['POST'])
 def login():
+    started = time.perf_counter()
+    try:
+        return _login()
+    finally:
+        login_verifier.login_latency.record((time.perf_counter() - started) * 1000)
+
+
+def _login():
     data = request.json
     username = (data.get('username') or '').strip()
     password = data.get('password') or ''
@@ -50,17 +79,19 @@ def login():
     password_matches = False
     if user:
         try:
-            password_matches = check_password_hash(user.password_hash, password)
-        except ValueError:
-            password_matches = False
+            password_matches = login_verifier.verify(user.password_hash, password)
+        except VerifierOverloaded as exc:
+            print('[auth/login] overloaded:', exc.reason)
+            response = jsonify({'error': 'Too many sign-ins right now. Please try again in a moment.'})
+            response.headers['Retry-After'] = str(exc.retry_after)
+            return response, 503
 
     if user and password_matches:
         # Check if student is connected to a parent
         if user.role == 'Student' and user.parent_id is None:
             return jsonify({'error': 'Student account must be linked to a parent to play. Please ask your parent to link your account first.'}), 403
         
-        token = signJWT(str(user.id), user.role)
-        payload = dict(token)
+        payload = _issue_tokens(user)
         payload['must_change_password'] = bool(getattr(user, 'must_change_password', False))
         payload['mustChangePassword'] = payload['must_change_password']
         payload['user'] = user.to_dict()
@@ -72,8 +103,7 @@ def login():
 @token_required
 def change_password():
     data = request.json or {}
-    current_user_id = int(request.current_user_id)
-    user = User.query.get(current_user_id)
+    user = get_current_user()
 
     if not user:
         return jsonify({'error': 'User not found'}), 404
@@ -88,15 +118,69 @@ def change_password():
         return jsonify({'error': 'Incorrect current password'}), 403
 
     user.password_hash = generate_password_hash(new_password)
+    user.must_change_password = False
+    revoke_user_tokens(user)
     db.session.commit()
 
-    return jsonify({'message': 'Password changed successfully'}), 200
+    # Earlier tokens are now revoked, so hand back a fresh pair.
+    return jsonify({'message': 'Password changed successfully', **_issue_tokens(user)}), 200
+
+
+@user_bp.route('/auth/refresh', methods=['POST'])
+def refresh_tokens():
+    """
+    Exchange a refresh token for a new access + refresh pair. The presented
+    refresh token is revoked (rotation); presenting it again revokes every
+    token of that user.
+    """
+    data = request.json or {}
+    claims = decodeJWT(data.get('refresh_token') or '', token_type='refresh', check_revoked=False)
+    if not claims:
+        return jsonify({'error': 'Invalid or expired refresh token'}), 401
+
+    user = db.session.get(User, int(claims['user_id']))
+    if not user or claims.get('tv') != (user.token_version or 0):
+        return jsonify({'error': 'Invalid or expired refresh token'}), 401
+
+    if revocation_list.is_revoked(claims.get('jti')):
+        # A rotated-out refresh token came back: assume it leaked.
+        print('[auth/refresh] refresh token reuse for user', user.id)
+        revoke_user_tokens(user)
+        db.session.commit()
+        return jsonify({'error': 'Invalid or expired refresh token'}), 401
+
+    revoke_token(claims)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Lost a race with a concurrent refresh of the same token.
+        db.session.rollback()
+        return jsonify({'error': 'Invalid or expired refresh token'}), 401
+
+    return jsonify(_issue_tokens(user)), 200
+
+
+@user_bp.route('/auth/logout', methods=['POST'])
+@token_required
+def logout():
+    """Revoke the presented access token and, if supplied, its refresh token."""
+    revoke_token(request.token_claims)
+
+    data = request.get_json(silent=True) or {}
+    refresh_claims = decodeJWT(data.get('refresh_token') or '', token_type='refresh')
+    if refresh_claims and refresh_claims['user_id'] == request.token_claims['user_id']:
+        revoke_token(refresh_claims)
+
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+    return jsonify({'message': 'Logged out'}), 200
 
 @user_bp.route('/user/profile', methods=['GET'])
 @token_required
 def get_own_profile():
-    current_user_id = int(request.current_user_id)
-    user = User.query.get(current_user_id)
+    user = get_current_user()
     if not user:
         return jsonify({'error': 'User not found'}), 404
     return jsonify(user.to_dict()), 200
@@ -106,9 +190,7 @@ def get_own_profile():
 @token_required
 def update_own_profile():
     data = request.json or {}
-    current_user_id = int(request.current_user_id)
-
-    user = User.query.get(current_user_id)
+    user = get_current_user()
     if not user:
         return jsonify({'error': 'User not found'}), 404
 
@@ -134,6 +216,13 @@ def update_own_profile():
     db.session.commit()
     return jsonify({'message': 'Profile updated successfully', 'user': user.to_dict()}), 200
 
+@user_bp.route('/.well-known/jwks.json', methods=['GET'])
+def jwks():
+    """Public keys for verifying access tokens offline (game servers, socket service)."""
+    response = jsonify(public_jwks())
+    response.headers['Cache-Control'] = 'public, max-age=300'
+    return response
+
 @user_bp.route('/ping', methods=['GET'])
 def ping():
     return jsonify({"status": "ok"}), 200
@@ -142,10 +231,10 @@ def ping():
 @user_bp.route('/student/quiz/<quiz_id>', methods=['GET'])
 @token_required
 def student_get_quiz(quiz_id):
-    student_id = int(request.current_user_id)
-    student = User.query.get(student_id)
+    student = get_current_user()
     if not student or student.role != 'Student':
         return jsonify({'error': 'Student not found'}), 404
+    student_id = student.id
 
     try:
         quiz_id_int = int(float(quiz_id))
@@ -185,10 +274,10 @@ def student_get_quiz(quiz_id):
 @user_bp.route('/student/quiz/<quiz_id>/submit', methods=['POST'])
 @token_required
 def student_submit_quiz(quiz_id):
-    student_id = int(request.current_user_id)
-    student = User.query.get(student_id)
+    student = get_current_user()
     if not student or student.role != 'Student':
         return jsonify({'error': 'Student not found'}), 404
+    student_id = student.id
 
     try:
         quiz_id_int = int(float(quiz_id))
@@ -259,7 +348,12 @@ def student_submit_quiz(quiz_id):
 
     result = QuizResult(quiz_id=quiz_id_int, student_id=student_id, score=percentage)
     db.session.add(result)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Double submit raced past the check above (unique student_id, quiz_id).
+        db.session.rollback()
+        return jsonify({'error': 'Already submitted'}), 409
 
     return jsonify({
         'score': f"{percentage}%",
@@ -273,10 +367,10 @@ def student_submit_quiz(quiz_id):
 @user_bp.route('/student/class', methods=['GET'])
 @token_required
 def student_class_info():
-    student_id = int(request.current_user_id)
-    student = User.query.get(student_id)
+    student = get_current_user()
     if not student or student.role != 'Student':
         return jsonify({'error': 'Student not found'}), 404
+    student_id = student.id
 
     if not student.class_id:
         return jsonify({'error': 'You are not assigned to a class yet'}), 404
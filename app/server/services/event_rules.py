@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Mapping
+
+from app.server.models.game_models import LocationEvent
+
+
+DEFAULT_RULESET_PATH = Path(__file__).with_name("location_events.json")
+
+
+@dataclass(frozen=True, slots=True)
+class EventRule:
+    event: LocationEvent
+    announcement: str
+    hints: tuple[str, ...]
+    # risk_table[target_masks][source_masks]; mask counts past the last index saturate.
+    risk_table: tuple[tuple[float, ...], ...]
+    # Same layout, for one round spent at the location next to a contagious player.
+    contact_table: tuple[tuple[float, ...], ...]
+
+    def infection_risk(self, target_masks: int, source_masks: int) -> float:
+        row = self.risk_table[self.target_index(target_masks)]
+        return row[self.source_index(source_masks)]
+
+    def target_index(self, mask_count: int) -> int:
+        return min(max(mask_count, 0), len(self.risk_table) - 1)
+
+    def source_index(self, mask_count: int) -> int:
+        return min(max(mask_count, 0), len(self.risk_table[0]) - 1)
+
+
+class EventRuleset:
+    def __init__(self, rules: Mapping[LocationEvent, EventRule]) -> None:
+        missing = [event.value for event in LocationEvent if event not in rules]
+        if missing:
+            raise ValueError(f"Location event ruleset is missing rules for: {', '.join(missing)}")
+        self._rules: dict[LocationEvent, EventRule] = dict(rules)
+        self._events: tuple[LocationEvent, ...] = tuple(self._rules)
+
+    @property
+    def events(self) -> tuple[LocationEvent, ...]:
+        return self._events
+
+    def rule_for(self, event: LocationEvent) -> EventRule:
+        return self._rules[event]
+
+
+def _saturation_count(step: float, cap: float) -> int:
+    if step <= 0 or cap <= 0:
+        return 0
+    return math.ceil(round(cap / step, 9))
+
+
+def _compile_risk_table(infection: Mapping[str, Any]) -> tuple[tuple[float, ...], ...]:
+    base_risk = float(infection["base_risk"])
+    target_step = float(infection["target_mask_step"])
+    target_cap = float(infection["target_mask_cap"])
+    source_step = float(infection["source_mask_step"])
+    source_cap = float(infection["source_mask_cap"])
+
+    rows: list[tuple[float, ...]] = []
+    for target_masks in range(_saturation_count(target_step, target_cap) + 1):
+        row: list[float] = []
+        for source_masks in range(_saturation_count(source_step, source_cap) + 1):
+            risk = base_risk
+            if target_masks > 0:
+                risk -= min(target_cap, target_step * target_masks)
+            if source_masks > 0:
+                risk -= min(source_cap, source_step * source_masks)
+            row.append(max(0.0, min(1.0, risk)))
+        rows.append(tuple(row))
+    return tuple(rows)
+
+
+def compile_event_ruleset(document: Mapping[str, Any]) -> EventRuleset:
+    defaults = document.get("infection", {})
+    rules: dict[LocationEvent, EventRule] = {}
+
+    for event_name, spec in document.get("events", {}).items():
+        try:
+            event = LocationEvent(event_name)
+        except ValueError as exc:
+            raise ValueError(f"Unknown location event '{event_name}' in ruleset.") from exc
+
+        try:
+            infection = {**defaults, **spec.get("infection", {})}
+            infection["base_risk"] = float(infection["base_risk"]) + float(spec.get("risk_modifier", 0.0))
+            risk_table = _compile_risk_table(infection)
+            contact_scale = float(infection.get("contact_scale", 0.0))
+            rules[event] = EventRule(
+                event=event,
+                announcement=str(spec["announcement"]),
+                hints=tuple(str(hint) for hint in spec.get("hints", [])),
+                risk_table=risk_table,
+                contact_table=tuple(tuple(risk * contact_scale for risk in row) for row in risk_table),
+            )
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ValueError(f"Invalid ruleset entry for location event '{event_name}': {exc}") from exc
+
+    return EventRuleset(rules)
+
+
+def load_event_ruleset(path: str | os.PathLike[str] | None = None) -> EventRuleset:
+    ruleset_path = Path(path or os.getenv("LOCATION_EVENTS_PATH") or DEFAULT_RULESET_PATH)
+    with ruleset_path.open(encoding="utf-8") as handle:
+        return compile_event_ruleset(json.load(handle))
+
+
+@lru_cache(maxsize=1)
+def get_event_ruleset() -> EventRuleset:
+    return load_event_ruleset()
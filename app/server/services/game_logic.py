@@ -6,12 +6,46 @@ from typing import Mapping
 from fastapi import HTTPException, status
 
 from app.server.models.game_models import GameState, HealthStatus, ItemType, LocationEvent, PlayerState
+from app.server.services.event_rules import EventRuleset, get_event_ruleset
+from app.server.services.leaderboard import LiveLeaderboard
 
 
 class GameEngine:
-    def __init__(self, game_state: GameState, seed: int | None = None) -> None:
+    def __init__(self, game_state: GameState, seed: int | None = None, ruleset: EventRuleset | None = None) -> None:
         self.game_state = game_state
         self._rng = Random(seed)
+        self._ruleset = ruleset if ruleset is not None else get_event_ruleset()
+        self._leaderboard = LiveLeaderboard()
+        for player in game_state.players:
+            self.refresh_score(player)
+
+    @property
+    def ruleset(self) -> EventRuleset:
+        return self._ruleset
+
+    def reseed(self, seed: int | None) -> None:
+        """Restart the engine's random stream (infection rolls, event picks)."""
+        self._rng.seed(seed)
+
+    def add_player(self, player: PlayerState) -> None:
+        self.game_state.players.append(player)
+        self.refresh_score(player)
+
+    def refresh_score(self, player: PlayerState) -> None:
+        """Re-rank a player after their inventory, health or mission state changed."""
+        self._leaderboard.update(player.player_id, self.score_player(player))
+
+    def rank_of(self, player_id: str) -> int | None:
+        return self._leaderboard.rank_of(player_id)
+
+    def score_of(self, player_id: str) -> int | None:
+        return self._leaderboard.score_of(player_id)
+
+    def live_leaderboard(self, limit: int) -> list[dict[str, object]]:
+        return [
+            {"rank": rank, "player_id": player_id, "score": score}
+            for rank, (player_id, score) in enumerate(self._leaderboard.top(limit), start=1)
+        ]
 
     def process_trade(
         self,
@@ -46,6 +80,9 @@ class GameEngine:
 
         self._calculate_infection_risk(player_a, player_b, self.game_state.current_event)
 
+        self.refresh_score(player_a)
+        self.refresh_score(player_b)
+
         return {
             "from_player_id": player_a.player_id,
             "to_player_id": player_b.player_id,
@@ -75,20 +112,10 @@ class GameEngine:
         if target.health_status == HealthStatus.INFECTED:
             return
 
-        infection_risk = 0.25
-
-        if current_event == LocationEvent.CANTEEN:
-            infection_risk += 0.20
-
-        mask_count_target = int(target.inventory.get(ItemType.MASKS, 0))
-        if mask_count_target > 0:
-            infection_risk -= min(0.20, 0.10 * mask_count_target)
-
-        mask_count_source = int(source.inventory.get(ItemType.MASKS, 0))
-        if mask_count_source > 0:
-            infection_risk -= min(0.10, 0.05 * mask_count_source)
-
-        infection_risk = max(0.0, min(1.0, infection_risk))
+        infection_risk = self._ruleset.rule_for(current_event).infection_risk(
+            int(target.inventory.get(ItemType.MASKS, 0)),
+            int(source.inventory.get(ItemType.MASKS, 0)),
+        )
 
         if self._rng.random() > infection_risk:
             return
@@ -98,22 +125,31 @@ class GameEngine:
         elif target.health_status == HealthStatus.EXPOSED:
             target.health_status = HealthStatus.INFECTED
 
-    def compute_scores(self) -> list[dict[str, object]]:
-        """Return players ranked by score, highest first.
+    @staticmethod
+    def score_player(player: PlayerState) -> int:
+        """Return a player's current score.
 
         Scoring rules:
           +500  mission completed
           +10   per item in inventory (rewards active traders)
           -200  if infected (health penalty)
         """
+        score = 0
+        if player.mission_completed:
+            score += 500
+        score += sum(player.inventory.values()) * 10
+        if player.health_status == HealthStatus.INFECTED:
+            score -= 200
+        return score
+
+    def compute_scores(self) -> list[dict[str, object]]:
+        """Return players ranked by score, highest first, from the live leaderboard."""
+        players_by_id = {player.player_id: player for player in self.game_state.players}
         results: list[dict[str, object]] = []
-        for player in self.game_state.players:
-            score = 0
-            if player.mission_completed:
-                score += 500
-            score += sum(player.inventory.values()) * 10
-            if player.health_status == HealthStatus.INFECTED:
-                score -= 200
+        for player_id, score in self._leaderboard:
+            player = players_by_id.get(player_id)
+            if player is None:
+                continue
             results.append({
                 "player_id": player.player_id,
                 "display_name": player.player_id,
@@ -121,11 +157,58 @@ class GameEngine:
                 "mission_completed": player.mission_completed,
                 "health_status": player.health_status.value,
             })
-        results.sort(key=lambda p: p["score"], reverse=True)
         return results
 
+    def move_player(self, player: PlayerState, location: LocationEvent | None) -> None:
+        player.location = location
+
+    def apply_location_exposure(self) -> dict[str, int]:
+        """Expose everyone sharing a location to its contagious players for one round.
+
+        Players are bucketed by location in one pass, counting contagious players
+        per (location, source mask tier). A susceptible player's chance of escaping
+        every contact is then a product over those few tiers, so the pass is O(n)
+        instead of one check per co-located pair.
+
+        Returns the number of players at each location.
+        """
+        occupancy: dict[LocationEvent, list[PlayerState]] = {}
+        contagious_tiers: dict[LocationEvent, list[int]] = {}
+
+        for player in self.game_state.players:
+            location = player.location or self.game_state.current_event
+            occupancy.setdefault(location, []).append(player)
+            if player.is_carrier or player.health_status == HealthStatus.INFECTED:
+                rule = self._ruleset.rule_for(location)
+                tiers = contagious_tiers.setdefault(location, [0] * len(rule.contact_table[0]))
+                tiers[rule.source_index(int(player.inventory.get(ItemType.MASKS, 0)))] += 1
+
+        for location, tiers in contagious_tiers.items():
+            rule = self._ruleset.rule_for(location)
+            escape_by_target_tier = [1.0] * len(rule.contact_table)
+            for target_tier, row in enumerate(rule.contact_table):
+                for source_tier, contagious_count in enumerate(tiers):
+                    if contagious_count:
+                        escape_by_target_tier[target_tier] *= (1.0 - row[source_tier]) ** contagious_count
+
+            for player in occupancy[location]:
+                if player.is_carrier or player.health_status == HealthStatus.INFECTED:
+                    continue
+                target_tier = rule.target_index(int(player.inventory.get(ItemType.MASKS, 0)))
+                infection_risk = 1.0 - escape_by_target_tier[target_tier]
+                if self._rng.random() > infection_risk:
+                    continue
+
+                if player.health_status == HealthStatus.HEALTHY:
+                    player.health_status = HealthStatus.EXPOSED
+                else:
+                    player.health_status = HealthStatus.INFECTED
+                self.refresh_score(player)
+
+        return {location.value: len(players) for location, players in occupancy.items()}
+
     def rotate_event(self) -> str:
-        available_events = list(LocationEvent)
+        available_events = self._ruleset.events
         if len(available_events) <= 1:
             selected_event = self.game_state.current_event
         else:
@@ -134,17 +217,9 @@ class GameEngine:
 
         self.game_state.current_event = selected_event
 
-        event_rules: dict[LocationEvent, str] = {
-            LocationEvent.SCHOOL: "Structured exchanges only: each trade can include up to 2 item stacks.",
-            LocationEvent.PARK: "Open-air safety bonus: infection risk is slightly reduced this round.",
-            LocationEvent.CANTEEN: "Crowded hotspot: infection risk is higher for all close-contact trades.",
-            LocationEvent.CLINIC: "Medical oversight: medicine trades grant better recovery opportunities.",
-            LocationEvent.MARKET: "High-volume trading: players may trade with more flexibility this round.",
-        }
-
         return (
             f"Round event: {selected_event.value}. "
-            f"Rule update: {event_rules[selected_event]}"
+            f"Rule update: {self._ruleset.rule_for(selected_event).announcement}"
         )
 
     def _validate_offer_counts(self, offered_items: Mapping[ItemType, int], field_name: str) -> None:
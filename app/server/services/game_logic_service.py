@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
 from random import Random
 from typing import Literal
 
@@ -15,10 +17,20 @@ class PlayerState:
     player_id: str
     role: PlayerRole
     vulnerability_score: float
-    inventory: list[str]
+    inventory: Counter[str]
     coins: int
-    checklist: list[str]
+    checklist: tuple[str, ...]
     is_infected: bool = False
+    checklist_items: frozenset[str] = field(init=False, repr=False)
+    checklist_satisfied: int = field(init=False, default=0)
+
+    def __post_init__(self) -> None:
+        self.checklist_items = frozenset(self.checklist)
+        self.checklist_satisfied = sum(1 for item in self.checklist_items if self.inventory[item] > 0)
+
+    @property
+    def mission_completed(self) -> bool:
+        return self.checklist_satisfied >= len(self.checklist_items)
 
 
 @dataclass(slots=True)
@@ -28,6 +40,7 @@ class TradeResult:
     sent_item_id: str
     received_item_id: str
     transmission_occurred: bool
+    missions_completed: tuple[str, ...] = ()
 
 
 class GameManager:
@@ -62,6 +75,9 @@ class GameManager:
         "Clinic-Stub",
     )
 
+    # Canonical interned ids; inventories and checklists are keyed by these objects.
+    ITEM_IDS: dict[str, str] = {item: sys.intern(item) for item in ITEM_POOL}
+
     REAL_SYMPTOMS: tuple[str, ...] = (
         "fever",
         "dry cough",
@@ -122,8 +138,8 @@ class GameManager:
         for player_id in normalized_players:
             role = self._rng.choice(list(self.ROLE_VULNERABILITY.keys()))
             vulnerability = self.ROLE_VULNERABILITY[role]
-            checklist = self._rng.sample(list(self.ITEM_POOL), self.CHECKLIST_SIZE)
-            inventory = self._rng.sample(list(self.ITEM_POOL), self.STARTING_INVENTORY_SIZE)
+            checklist = tuple(self._rng.sample(list(self.ITEM_POOL), self.CHECKLIST_SIZE))
+            inventory = Counter(self._rng.sample(list(self.ITEM_POOL), self.STARTING_INVENTORY_SIZE))
             self._players[player_id] = PlayerState(
                 player_id=player_id,
                 role=role,
@@ -145,9 +161,11 @@ class GameManager:
                     "player_id": player.player_id,
                     "role": player.role,
                     "vulnerability_score": player.vulnerability_score,
-                    "inventory": list(player.inventory),
+                    "inventory": list(player.inventory.elements()),
                     "coins": player.coins,
                     "checklist": list(player.checklist),
+                    "checklist_satisfied": player.checklist_satisfied,
+                    "mission_completed": player.mission_completed,
                 }
             )
 
@@ -170,7 +188,8 @@ class GameManager:
                 detail="A player cannot trade with themselves.",
             )
 
-        if item_id not in player_a.inventory:
+        sent_item = self.ITEM_IDS.get(item_id)
+        if sent_item is None or player_a.inventory[sent_item] <= 0:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Item '{item_id}' was not found in player '{player_a_id}' inventory.",
@@ -182,12 +201,24 @@ class GameManager:
                 detail=f"Player '{player_b_id}' has no item to swap.",
             )
 
-        received_item = self._rng.choice(player_b.inventory)
+        # Weighted by stack size: same odds as drawing one physical item from B.
+        received_item = self._rng.choices(
+            list(player_b.inventory.keys()),
+            weights=list(player_b.inventory.values()),
+        )[0]
 
-        player_a.inventory.remove(item_id)
-        player_b.inventory.remove(received_item)
-        player_a.inventory.append(received_item)
-        player_b.inventory.append(item_id)
+        completed_before = (player_a.mission_completed, player_b.mission_completed)
+
+        self._take_item(player_a, sent_item)
+        self._take_item(player_b, received_item)
+        self._give_item(player_a, received_item)
+        self._give_item(player_b, sent_item)
+
+        missions_completed = tuple(
+            player.player_id
+            for player, was_completed in zip((player_a, player_b), completed_before)
+            if player.mission_completed and not was_completed
+        )
 
         transmission_occurred = False
         if player_a.is_infected and not player_b.is_infected:
@@ -201,8 +232,25 @@ class GameManager:
             sent_item_id=item_id,
             received_item_id=received_item,
             transmission_occurred=transmission_occurred,
+            missions_completed=missions_completed,
         )
 
+    def _take_item(self, player: PlayerState, item_id: str) -> None:
+        remaining = player.inventory[item_id] - 1
+        if remaining > 0:
+            player.inventory[item_id] = remaining
+            return
+
+        del player.inventory[item_id]
+        if item_id in player.checklist_items:
+            player.checklist_satisfied -= 1
+
+    def _give_item(self, player: PlayerState, item_id: str) -> None:
+        previous = player.inventory[item_id]
+        player.inventory[item_id] = previous + 1
+        if previous == 0 and item_id in player.checklist_items:
+            player.checklist_satisfied += 1
+
     def _calculate_transmission(self, healthy_player: PlayerState, infected_player: PlayerState) -> bool:
         if healthy_player.is_infected:
             raise HTTPException(
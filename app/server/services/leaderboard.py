@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from typing import Iterator
+
+
+class LiveLeaderboard:
+    """Players ordered by score (highest first), kept sorted as scores change.
+
+    Entries are ``(-score, join_seq, player_id)`` tuples in a sorted list, so
+    ties keep join order and rank lookups are a binary search. Moving an entry
+    shifts the list with a single memmove, which stays far below a full sort
+    at lobby sizes.
+    """
+
+    def __init__(self) -> None:
+        self._entries: list[tuple[int, int, str]] = []
+        self._by_player: dict[str, tuple[int, int, str]] = {}
+        self._next_seq = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[tuple[str, int]]:
+        for negative_score, _, player_id in self._entries:
+            yield player_id, -negative_score
+
+    def update(self, player_id: str, score: int) -> None:
+        current = self._by_player.get(player_id)
+        if current is not None:
+            if current[0] == -score:
+                return
+            del self._entries[bisect_left(self._entries, current)]
+            seq = current[1]
+        else:
+            seq = self._next_seq
+            self._next_seq += 1
+
+        entry = (-score, seq, player_id)
+        self._by_player[player_id] = entry
+        insort(self._entries, entry)
+
+    def remove(self, player_id: str) -> None:
+        current = self._by_player.pop(player_id, None)
+        if current is not None:
+            del self._entries[bisect_left(self._entries, current)]
+
+    def score_of(self, player_id: str) -> int | None:
+        current = self._by_player.get(player_id)
+        return -current[0] if current is not None else None
+
+    def rank_of(self, player_id: str) -> int | None:
+        current = self._by_player.get(player_id)
+        if current is None:
+            return None
+        return bisect_left(self._entries, current) + 1
+
+    def top(self, limit: int) -> list[tuple[str, int]]:
+        return [(player_id, -negative_score) for negative_score, _, player_id in self._entries[:limit]]
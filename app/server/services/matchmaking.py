@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import heapq
+from typing import Callable, Hashable
+
+Priority = tuple[int, int]
+RankFn = Callable[[Hashable], "Priority | None"]
+
+
+class MatchmakingIndex:
+    """Per-pool min-heaps of servers keyed by how good a match they are.
+
+    Updates push a new heap entry and bump the server's version instead of
+    searching the heap; superseded entries are skipped when they reach the top
+    (lazy deletion). Priorities can also drift without an update (a heartbeat
+    times out), so :meth:`best` re-ranks the top entry before trusting it.
+    """
+
+    def __init__(self) -> None:
+        self._heaps: dict[Hashable, list[tuple[Priority, int, Hashable]]] = {}
+        # key -> (priority, version, pool) of the live heap entry
+        self._current: dict[Hashable, tuple[Priority, int, Hashable]] = {}
+        self._pool_sizes: dict[Hashable, int] = {}
+        self._version = 0
+
+    def __len__(self) -> int:
+        return len(self._current)
+
+    def update(self, key: Hashable, pool: Hashable, priority: Priority | None) -> None:
+        if priority is None:
+            self.discard(key)
+            return
+
+        current = self._current.get(key)
+        if current is not None:
+            if current[0] == priority and current[2] == pool:
+                return
+            self._pool_sizes[current[2]] -= 1
+
+        self._version += 1
+        self._current[key] = (priority, self._version, pool)
+        self._pool_sizes[pool] = self._pool_sizes.get(pool, 0) + 1
+        heap = self._heaps.setdefault(pool, [])
+        heapq.heappush(heap, (priority, self._version, key))
+        self._maybe_compact(pool)
+
+    def discard(self, key: Hashable) -> None:
+        current = self._current.pop(key, None)
+        if current is not None:
+            self._pool_sizes[current[2]] -= 1
+
+    def best(self, pool: Hashable, rank: RankFn) -> tuple[Priority, Hashable] | None:
+        heap = self._heaps.get(pool)
+        while heap:
+            priority, version, key = heap[0]
+            current = self._current.get(key)
+            if current is None or current[1] != version:
+                heapq.heappop(heap)
+                continue
+
+            fresh = rank(key)
+            if fresh is None:
+                heapq.heappop(heap)
+                self.discard(key)
+                continue
+            if fresh != priority:
+                self._current[key] = (fresh, version, pool)
+                heapq.heapreplace(heap, (fresh, version, key))
+                continue
+            return priority, key
+        return None
+
+    def _maybe_compact(self, pool: Hashable) -> None:
+        heap = self._heaps[pool]
+        if len(heap) <= 2 * self._pool_sizes.get(pool, 0) + 64:
+            return
+        heap[:] = [
+            (priority, version, key)
+            for key, (priority, version, entry_pool) in self._current.items()
+            if entry_pool == pool
+        ]
+        heapq.heapify(heap)
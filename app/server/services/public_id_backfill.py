@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app.server.database import db
+
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_ENABLED = os.getenv("PUBLIC_ID_BACKFILL_ENABLED", "1") not in ("0", "false", "False")
+BACKFILL_BATCH_SIZE = int(os.getenv("PUBLIC_ID_BACKFILL_BATCH_SIZE", "1000"))
+# Pause between batches so the backfill never saturates the database.
+BACKFILL_PAUSE_SECONDS = float(os.getenv("PUBLIC_ID_BACKFILL_PAUSE_SECONDS", "0.05"))
+BACKFILL_LOG_EVERY = int(os.getenv("PUBLIC_ID_BACKFILL_LOG_EVERY", "50"))
+# Row in maintenance_tasks written once every table is filled.
+BACKFILL_TASK_NAME = "public_id_backfill"
+
+PUBLIC_ID_TABLES = (
+    "users",
+    "classes",
+    "missions",
+    "mission_progress",
+    "quizzes",
+    "quiz_results",
+    "messages",
+    "game_servers",
+    "playtime_logs",
+)
+
+
+@dataclass(slots=True)
+class TableProgress:
+    table: str
+    pending_at_start: int = 0
+    filled: int = 0
+    batches: int = 0
+    last_id: int = 0
+    done: bool = False
+    error: str | None = None
+    started_at: float | None = None
+    finished_at: float | None = None
+
+
+class PublicIdBackfill:
+    """Fills NULL ``public_id`` columns in the background, one keyset batch at a time.
+
+    Each batch selects the next ``batch_size`` ids above the cursor that still
+    lack a public id and writes fresh UUIDs with a single ``UPDATE ... FROM
+    (VALUES ...)``. Only NULL rows are touched, so an interrupted run simply
+    resumes on the next boot. Once a table has no NULLs left, its column is
+    made ``NOT NULL``. When every table is done the run is recorded in
+    ``maintenance_tasks`` and later boots skip the backfill entirely.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = BACKFILL_BATCH_SIZE,
+        pause_seconds: float = BACKFILL_PAUSE_SECONDS,
+        tables: tuple[str, ...] = PUBLIC_ID_TABLES,
+    ) -> None:
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+        self.tables = tables
+        self.progress: dict[str, TableProgress] = {}
+        self.complete = False
+        self._app = None
+        self._worker: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def init_app(self, app) -> None:
+        self._app = app
+        if not BACKFILL_ENABLED or (self._worker is not None and self._worker.is_alive()):
+            return
+        with app.app_context():
+            self.complete = self.is_complete()
+        if self.complete:
+            return
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._run, name="public-id-backfill", daemon=True)
+        self._worker.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def is_complete(self) -> bool:
+        """Whether a previous run already filled every table (needs an app context)."""
+        try:
+            completed = db.session.execute(
+                text("SELECT 1 FROM maintenance_tasks WHERE name = :name"), {"name": BACKFILL_TASK_NAME}
+            ).scalar()
+        except SQLAlchemyError:
+            # maintenance_tasks does not exist before migration 3.
+            db.session.rollback()
+            return False
+        db.session.commit()
+        return completed is not None
+
+    def run(self) -> dict[str, TableProgress]:
+        """Backfill every table to completion in the calling thread (needs an app context)."""
+        for table in self.tables:
+            if self._stop.is_set():
+                break
+            progress = self.progress.setdefault(table, TableProgress(table))
+            try:
+                self._backfill_table(progress)
+            except SQLAlchemyError as exc:
+                db.session.rollback()
+                progress.error = str(exc)
+                logger.exception("public_id backfill of %s failed after %d rows", table, progress.filled)
+        if all(table in self.progress and self.progress[table].done for table in self.tables):
+            self._mark_complete()
+        return self.progress
+
+    def stats(self) -> dict:
+        return {
+            "complete": self.complete,
+            "running": self._worker is not None and self._worker.is_alive(),
+            "batch_size": self.batch_size,
+            "pause_seconds": self.pause_seconds,
+            "tables": [asdict(progress) for progress in self.progress.values()],
+        }
+
+    def _run(self) -> None:
+        with self._app.app_context():
+            try:
+                self.run()
+            finally:
+                db.session.remove()
+
+    def _mark_complete(self) -> None:
+        try:
+            db.session.execute(
+                text("INSERT INTO maintenance_tasks (name, completed_at) VALUES (:name, :completed_at)"),
+                {"name": BACKFILL_TASK_NAME, "completed_at": time.time()},
+            )
+            db.session.commit()
+        except IntegrityError:
+            # Another worker finished at the same time.
+            db.session.rollback()
+        except SQLAlchemyError:
+            db.session.rollback()
+            logger.exception("Could not record the finished public_id backfill; the next boot checks again")
+            return
+        self.complete = True
+        logger.info("public_id backfill complete; later boots will skip it")
+
+    def _backfill_table(self, progress: TableProgress) -> None:
+        table = progress.table
+        # Table names come from PUBLIC_ID_TABLES, never from input.
+        pending = db.session.execute(
+            text(f"SELECT COUNT(*) FROM {table} WHERE public_id IS NULL")
+        ).scalar() or 0
+        db.session.commit()
+        progress.pending_at_start = pending
+        postgres = db.engine.dialect.name == "postgresql"
+        if not pending:
+            # A run interrupted after its last batch still owes the NOT NULL.
+            if postgres:
+                self._set_not_null(table)
+            progress.done = True
+            return
+
+        progress.started_at = time.time()
+        logger.info("public_id backfill of %s: %d rows pending", table, pending)
+        select_batch = text(
+            f"SELECT id FROM {table} WHERE id > :after AND public_id IS NULL ORDER BY id LIMIT :limit"
+            + (" FOR UPDATE SKIP LOCKED" if postgres else "")
+        )
+
+        while not self._stop.is_set():
+            ids = db.session.execute(
+                select_batch, {"after": progress.last_id, "limit": self.batch_size}
+            ).scalars().all()
+            if not ids:
+                break
+            pairs = [(row_id, str(uuid.uuid4())) for row_id in ids]
+            if postgres:
+                db.session.execute(_values_update(table, len(pairs)), _values_params(pairs))
+            else:
+                db.session.execute(
+                    text(f"UPDATE {table} SET public_id = :public_id WHERE id = :id AND public_id IS NULL"),
+                    [{"id": row_id, "public_id": public_id} for row_id, public_id in pairs],
+                )
+            db.session.commit()
+
+            progress.filled += len(ids)
+            progress.batches += 1
+            progress.last_id = ids[-1]
+            if progress.batches % BACKFILL_LOG_EVERY == 0:
+                logger.info("public_id backfill of %s: %d/%d rows", table, progress.filled, pending)
+            if self.pause_seconds > 0 and self._stop.wait(self.pause_seconds):
+                return
+
+        if self._stop.is_set():
+            return
+        if postgres and not self._set_not_null(table):
+            # Rows locked by another worker were skipped; they finish that table.
+            return
+        progress.done = True
+        progress.finished_at = time.time()
+        logger.info(
+            "public_id backfill of %s finished: %d rows in %.1fs",
+            table,
+            progress.filled,
+            progress.finished_at - progress.started_at,
+        )
+
+    def _set_not_null(self, table: str) -> bool:
+        remaining = db.session.execute(
+            text(f"SELECT 1 FROM {table} WHERE public_id IS NULL LIMIT 1")
+        ).scalar()
+        if remaining is None:
+            db.session.execute(text(f"ALTER TABLE {table} ALTER COLUMN public_id SET NOT NULL"))
+        db.session.commit()
+        return remaining is None
+
+
+def _values_update(table: str, count: int):
+    rows = ", ".join(f"(:id_{i}, :public_id_{i})" for i in range(count))
+    return text(
+        f"UPDATE {table} AS t SET public_id = v.public_id "
+        f"FROM (VALUES {rows}) AS v(id, public_id) "
+        "WHERE t.id = v.id AND t.public_id IS NULL"
+    ).bindparams(*(bindparam(f"id_{i}", type_=db.Integer) for i in range(count)))
+
+
+def _values_params(pairs: list[tuple[int, str]]) -> dict:
+    params = {}
+    for i, (row_id, public_id) in enumerate(pairs):
+        params[f"id_{i}"] = row_id
+        params[f"public_id_{i}"] = public_id
+    return params
+
+
+public_id_backfill = PublicIdBackfill()
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.server.database import db
+
+
+logger = logging.getLogger(__name__)
+
+REAP_AFTER_SECONDS = float(os.getenv("SERVER_REAP_AFTER_SECONDS", str(24 * 60 * 60)))
+REAP_INTERVAL_SECONDS = float(os.getenv("SERVER_REAP_INTERVAL_SECONDS", "300"))
+REAP_BATCH_SIZE = int(os.getenv("SERVER_REAP_BATCH_SIZE", "500"))
+REAP_MAX_BATCHES = int(os.getenv("SERVER_REAP_MAX_BATCHES", "20"))
+
+# Arbitrary constant shared by every worker so only one of them reaps at a time.
+REAPER_LOCK_KEY = 0x6753_5250
+
+# One statement per batch: lock a slice of expired ephemeral rows (skipping rows
+# another transaction holds), delete them, and fold them into the uptime summary.
+_REAP_BATCH_SQL = text(
+    """
+    WITH doomed AS (
+        SELECT id
+        FROM game_servers
+        WHERE persistent = FALSE
+          AND (last_heartbeat IS NULL OR last_heartbeat < :cutoff)
+        ORDER BY id
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    ),
+    removed AS (
+        DELETE FROM game_servers AS g
+        USING doomed
+        WHERE g.id = doomed.id
+        RETURNING g.ip, g.port, g.name, g.first_heartbeat, g.last_heartbeat, g.heartbeat_count
+    ),
+    archived AS (
+        INSERT INTO game_server_uptime AS u
+            (ip, port, name, first_seen, last_seen, sessions, heartbeat_count, total_uptime_seconds)
+        SELECT
+            ip,
+            port,
+            name,
+            COALESCE(first_heartbeat, last_heartbeat),
+            last_heartbeat,
+            1,
+            COALESCE(heartbeat_count, 0),
+            GREATEST(COALESCE(last_heartbeat - first_heartbeat, 0), 0)
+        FROM removed
+        ON CONFLICT (ip, port) DO UPDATE SET
+            name = EXCLUDED.name,
+            first_seen = LEAST(u.first_seen, EXCLUDED.first_seen),
+            last_seen = GREATEST(u.last_seen, EXCLUDED.last_seen),
+            sessions = u.sessions + 1,
+            heartbeat_count = u.heartbeat_count + EXCLUDED.heartbeat_count,
+            total_uptime_seconds = u.total_uptime_seconds + EXCLUDED.total_uptime_seconds
+        RETURNING 1
+    )
+    SELECT COUNT(*) FROM removed
+    """
+)
+
+
+@dataclass(slots=True)
+class ReaperStats:
+    runs: int = 0
+    skipped_locked: int = 0
+    rows_reaped: int = 0
+    last_run_at: float | None = None
+    last_run_rows: int = 0
+    last_run_ms: float = 0.0
+    batch_ms: list[float] = field(default_factory=list)
+
+
+class GameServerReaper:
+    """Deletes ephemeral ``game_servers`` rows whose heartbeat expired long ago.
+
+    Rows are archived into ``game_server_uptime`` as they go. Work happens in
+    batches of ``batch_size`` rows, each in its own short transaction, and at
+    most ``max_batches`` per run, so a large backlog drains over several runs
+    instead of holding locks. A transaction-scoped advisory lock keeps
+    concurrent workers from reaping the same rows.
+    """
+
+    def __init__(
+        self,
+        reap_after: float = REAP_AFTER_SECONDS,
+        interval: float = REAP_INTERVAL_SECONDS,
+        batch_size: int = REAP_BATCH_SIZE,
+        max_batches: int = REAP_MAX_BATCHES,
+    ) -> None:
+        self.reap_after = reap_after
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.stats = ReaperStats()
+        self._next_run = time.monotonic() + interval
+
+    def maybe_run(self) -> int:
+        """Run if the interval has elapsed. Must run inside an app context."""
+        if self.interval <= 0 or time.monotonic() < self._next_run:
+            return 0
+        self._next_run = time.monotonic() + self.interval
+        return self.run()
+
+    def run(self, now: float | None = None) -> int:
+        if db.engine.dialect.name != "postgresql":
+            return 0
+
+        cutoff = (time.time() if now is None else now) - self.reap_after
+        started = time.perf_counter()
+        total = 0
+        batch_ms: list[float] = []
+
+        for _ in range(self.max_batches):
+            batch_started = time.perf_counter()
+            try:
+                locked = db.session.execute(
+                    text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": REAPER_LOCK_KEY}
+                ).scalar()
+                if not locked:
+                    db.session.rollback()
+                    self.stats.skipped_locked += 1
+                    break
+                reaped = int(
+                    db.session.execute(
+                        _REAP_BATCH_SQL, {"cutoff": cutoff, "batch_size": self.batch_size}
+                    ).scalar() or 0
+                )
+                db.session.commit()
+            except SQLAlchemyError:
+                db.session.rollback()
+                logger.exception("Game server reaper batch failed")
+                break
+
+            batch_ms.append(round((time.perf_counter() - batch_started) * 1000, 3))
+            total += reaped
+            if reaped < self.batch_size:
+                break
+
+        self.stats.runs += 1
+        self.stats.rows_reaped += total
+        self.stats.last_run_at = time.time()
+        self.stats.last_run_rows = total
+        self.stats.last_run_ms = round((time.perf_counter() - started) * 1000, 3)
+        self.stats.batch_ms = batch_ms
+        if total:
+            logger.info("Reaped %d expired game server row(s) in %.1f ms", total, self.stats.last_run_ms)
+        return total
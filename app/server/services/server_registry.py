@@ -0,0 +1,674 @@
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import case, func, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.server.database import db
+from app.server.models.user import GameServer
+from app.server.services.matchmaking import MatchmakingIndex
+from app.server.services.server_maintenance import GameServerReaper
+from app.server.services.server_telemetry import TelemetryRing
+
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_TIMEOUT_SECONDS = float(os.getenv("SERVER_HEARTBEAT_TIMEOUT_SECONDS", "15"))
+FLUSH_INTERVAL_SECONDS = float(os.getenv("SERVER_REGISTRY_FLUSH_SECONDS", "2"))
+FLUSH_BATCH_SIZE = int(os.getenv("SERVER_REGISTRY_FLUSH_BATCH", "500"))
+FLUSH_STATS_WINDOW = 256
+SNAPSHOT_MAX_AGE_SECONDS = float(os.getenv("SERVER_LIST_SNAPSHOT_SECONDS", "1"))
+FEED_INTERVAL_SECONDS = float(os.getenv("SERVER_FEED_INTERVAL_SECONDS", "1"))
+FEED_BACKLOG = int(os.getenv("SERVER_FEED_BACKLOG", "1024"))
+
+ServerKey = tuple[str, int]
+
+
+@dataclass(slots=True)
+class ServerEntry:
+    ip: str
+    port: int
+    name: str
+    player_count: int
+    required_players: int
+    last_heartbeat: float
+    persistent: bool = False
+    owner_teacher_id: int | None = None
+    class_id: int | None = None
+    public_id: str | None = None
+    # Heartbeats absorbed since the last flush, added to game_servers.heartbeat_count.
+    unflushed_beats: int = 0
+    # Time of the first of those heartbeats; becomes first_heartbeat for a new row.
+    unflushed_since: float | None = None
+    # Recent heartbeat health metrics; only kept in memory, per worker.
+    telemetry: TelemetryRing | None = None
+
+    def is_active(self, cutoff: float) -> bool:
+        return self.last_heartbeat > cutoff
+
+    def is_listed(self, cutoff: float) -> bool:
+        return self.persistent or self.is_active(cutoff)
+
+
+@dataclass(frozen=True, slots=True)
+class ServerListSnapshot:
+    body: bytes
+    etag: str
+    built_at: float
+
+
+def _heartbeat_upsert(rows: list[dict[str, Any]]):
+    table = GameServer.__table__
+    # SQLite (local development) speaks the same ON CONFLICT dialect.
+    insert = sqlite.insert if db.engine.dialect.name == "sqlite" else postgresql.insert
+    stmt = insert(table).values([
+        {**row, "public_id": str(uuid.uuid4()), "persistent": False}
+        for row in rows
+    ])
+    # Only a newer heartbeat may replace the state columns, but every flush adds
+    # its beats to heartbeat_count, even one that lands after a newer flush.
+    is_newer = or_(table.c.last_heartbeat.is_(None), table.c.last_heartbeat <= stmt.excluded.last_heartbeat)
+    is_older_start = or_(
+        table.c.first_heartbeat.is_(None), stmt.excluded.first_heartbeat < table.c.first_heartbeat
+    )
+
+    def newest(column: str):
+        return case((is_newer, stmt.excluded[column]), else_=table.c[column])
+
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.ip, table.c.port],
+        set_={
+            "name": newest("name"),
+            "player_count": newest("player_count"),
+            "required_players": newest("required_players"),
+            "last_heartbeat": newest("last_heartbeat"),
+            "first_heartbeat": case((is_older_start, stmt.excluded.first_heartbeat), else_=table.c.first_heartbeat),
+            "heartbeat_count": func.coalesce(table.c.heartbeat_count, 0) + stmt.excluded.heartbeat_count,
+        },
+    )
+
+
+def _sse_frame(epoch: str, seq: int, event: str, payload: Any) -> str:
+    return f"id: {epoch}:{seq}\nevent: {event}\ndata: {json.dumps(payload, sort_keys=True, separators=(',', ':'))}\n\n"
+
+
+def serialize_server(entry: ServerEntry, cutoff: float) -> dict[str, Any]:
+    is_teacher_lobby = bool(entry.persistent and entry.owner_teacher_id is not None)
+    is_recently_active = entry.is_active(cutoff)
+    is_online = is_recently_active or is_teacher_lobby
+
+    # Teacher lobbies are always listed online; if no active heartbeat yet,
+    # treat current players as 0 and keep room in "Not yet started" state.
+    current_players = int(entry.player_count or 0) if is_recently_active else 0
+    required_players = max(1, int(entry.required_players or 2))
+    if is_teacher_lobby and required_players < 2:
+        required_players = 2
+
+    # Started means the room is actively running and has reached a playable threshold.
+    is_started = is_recently_active and current_players >= required_players
+
+    if is_started:
+        status = 'Started'
+    elif is_online:
+        status = 'Not yet started'
+    else:
+        status = 'Offline'
+
+    return {
+        "ip": entry.ip,
+        "port": entry.port,
+        "name": entry.name,
+        "count": current_players,
+        "persistent": bool(entry.persistent),
+        "online": is_online,
+        "joinable": is_online,
+        "current_players": current_players,
+        "required_players": required_players,
+        "started": is_started,
+        "status": status,
+    }
+
+
+def match_priority(entry: ServerEntry, cutoff: float) -> tuple[int, int] | None:
+    """Matchmaking rank (lower is better), or ``None`` when the server cannot be joined.
+
+    Rooms that have not started come first, closest to ``required_players``
+    first, so players fill a room instead of spreading out. Started rooms
+    follow, least crowded first.
+    """
+    is_teacher_lobby = bool(entry.persistent and entry.owner_teacher_id is not None)
+    is_recently_active = entry.is_active(cutoff)
+    if not (is_recently_active or is_teacher_lobby):
+        return None
+
+    current_players = int(entry.player_count or 0) if is_recently_active else 0
+    required_players = max(1, int(entry.required_players or 2))
+    if is_teacher_lobby and required_players < 2:
+        required_players = 2
+
+    if is_recently_active and current_players >= required_players:
+        return (1, current_players)
+    return (0, required_players - current_players)
+
+
+def match_pool(entry: ServerEntry) -> int | None:
+    """Teacher lobbies are matched within their class; everything else is public."""
+    if entry.persistent and entry.owner_teacher_id is not None:
+        return entry.class_id
+    return None
+
+
+class ServerRegistry:
+    """In-process view of the game server registry.
+
+    Heartbeats only touch memory; a background thread writes the changed
+    servers to ``game_servers`` in batches and pulls rows written by other
+    worker processes, so every worker converges within one flush interval.
+    """
+
+    def __init__(
+        self,
+        heartbeat_timeout: float = HEARTBEAT_TIMEOUT_SECONDS,
+        flush_interval: float = FLUSH_INTERVAL_SECONDS,
+        snapshot_max_age: float = SNAPSHOT_MAX_AGE_SECONDS,
+    ) -> None:
+        self.heartbeat_timeout = heartbeat_timeout
+        self.flush_interval = flush_interval
+        self.snapshot_max_age = snapshot_max_age
+        self._snapshot: ServerListSnapshot | None = None
+        self._snapshot_lock = threading.Lock()
+        # Change feed shared by every stream subscriber: frames are encoded once
+        # and each subscriber only keeps a cursor into the list.
+        self.feed_interval = FEED_INTERVAL_SECONDS
+        self._feed_cond = threading.Condition()
+        self._feed_frames: list[tuple[int, str]] = []
+        self._feed_seq = 0
+        # Sequence numbers are per process; the epoch in every event id tells a
+        # reconnect that landed on another worker to start over from a snapshot.
+        self._feed_epoch = uuid.uuid4().hex[:12]
+        self._feed_pid = os.getpid()
+        self._feed_state: dict[ServerKey, dict[str, Any]] | None = None
+        self._feed_snapshot_frame: tuple[int, str] | None = None
+        self._lock = threading.Lock()
+        self._servers: dict[ServerKey, ServerEntry] = {}
+        self._dirty: set[ServerKey] = set()
+        self._matchmaking = MatchmakingIndex()
+        self._flush_batches: deque[tuple[float, int, float]] = deque(maxlen=FLUSH_STATS_WINDOW)
+        self._flushed_rows = 0
+        self._flush_failures = 0
+        self.reaper = GameServerReaper()
+        self._app = None
+        self._worker: threading.Thread | None = None
+        self._worker_pid: int | None = None
+        self._stop = threading.Event()
+
+    def init_app(self, app) -> None:
+        self._app = app
+        with app.app_context():
+            self.refresh_from_database()
+        atexit.register(self.shutdown)
+
+    def record_heartbeat(
+        self,
+        ip: str,
+        port: int,
+        name: str,
+        player_count: int,
+        required_players: int,
+        now: float | None = None,
+        metrics: dict[str, float] | None = None,
+    ) -> None:
+        now = time.time() if now is None else now
+        key = (ip, port)
+        with self._lock:
+            entry = self._servers.get(key)
+            if entry is None:
+                entry = ServerEntry(
+                    ip=ip,
+                    port=port,
+                    name=name,
+                    player_count=player_count,
+                    required_players=required_players,
+                    last_heartbeat=now,
+                )
+                self._servers[key] = entry
+            else:
+                entry.name = name
+                entry.player_count = player_count
+                entry.required_players = required_players
+                entry.last_heartbeat = now
+            if not entry.unflushed_beats:
+                entry.unflushed_since = now
+            entry.unflushed_beats += 1
+            if metrics:
+                if entry.telemetry is None:
+                    entry.telemetry = TelemetryRing()
+                entry.telemetry.record(now, metrics)
+            self._dirty.add(key)
+            self._reindex(entry, now)
+        self._ensure_worker()
+
+    def touch(
+        self,
+        ip: str,
+        port: int,
+        player_count: int,
+        required_players: int,
+        now: float | None = None,
+    ) -> ServerKey | None:
+        """Refresh a server that already registered over HTTP.
+
+        Returns the registry key, or ``None`` when the server is unknown here.
+        """
+        now = time.time() if now is None else now
+        key = (ip, port)
+        with self._lock:
+            entry = self._servers.get(key)
+            if entry is None:
+                return None
+            entry.player_count = player_count
+            entry.required_players = required_players
+            entry.last_heartbeat = now
+            if not entry.unflushed_beats:
+                entry.unflushed_since = now
+            entry.unflushed_beats += 1
+            self._dirty.add(key)
+            self._reindex(entry, now)
+        self._ensure_worker()
+        return key
+
+    def sync_row(self, server: GameServer) -> None:
+        """Mirror a ``game_servers`` row that was written directly (teacher lobbies)."""
+        with self._lock:
+            self._merge_row(server, prefer_row=True)
+            self._reindex(self._servers[(server.ip, server.port)])
+
+    def forget(self, ip: str, port: int) -> None:
+        with self._lock:
+            self._servers.pop((ip, port), None)
+            self._dirty.discard((ip, port))
+            self._matchmaking.discard((ip, port))
+
+    def listed_servers(self, now: float | None = None) -> list[dict[str, Any]]:
+        now = time.time() if now is None else now
+        cutoff = now - self.heartbeat_timeout
+        with self._lock:
+            entries = [entry for entry in self._servers.values() if entry.is_listed(cutoff)]
+            entries.sort(key=lambda entry: (entry.ip, entry.port))
+            return [serialize_server(entry, cutoff) for entry in entries]
+
+    def list_snapshot(self, now: float | None = None) -> ServerListSnapshot:
+        """Serialized server list, rebuilt at most once per ``snapshot_max_age`` seconds."""
+        now = time.time() if now is None else now
+        snapshot = self._snapshot
+        if snapshot is not None and now - snapshot.built_at < self.snapshot_max_age:
+            return snapshot
+
+        with self._snapshot_lock:
+            snapshot = self._snapshot
+            if snapshot is not None and now - snapshot.built_at < self.snapshot_max_age:
+                return snapshot
+
+            body = json.dumps(self.listed_servers(now), sort_keys=True, separators=(",", ":")).encode("utf-8")
+            etag = hashlib.sha1(body).hexdigest()
+            if snapshot is not None and snapshot.etag == etag:
+                body = snapshot.body
+            self._snapshot = ServerListSnapshot(body=body, etag=etag, built_at=now)
+            return self._snapshot
+
+    def telemetry(
+        self,
+        ip: str | None = None,
+        port: int | None = None,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """Columnar metric series for servers that reported telemetry to this worker."""
+        with self._lock:
+            result = []
+            for entry in sorted(self._servers.values(), key=lambda entry: (entry.ip, entry.port)):
+                if entry.telemetry is None or not len(entry.telemetry):
+                    continue
+                if (ip is not None and entry.ip != ip) or (port is not None and entry.port != port):
+                    continue
+                result.append({
+                    "ip": entry.ip,
+                    "port": entry.port,
+                    "name": entry.name,
+                    "samples": len(entry.telemetry),
+                    "latest": entry.telemetry.latest(),
+                    **entry.telemetry.series(limit),
+                })
+            return result
+
+    def best_server(self, class_id: int | None = None, now: float | None = None) -> dict[str, Any] | None:
+        """Best joinable server for a player, across their class's teacher lobbies and public servers."""
+        now = time.time() if now is None else now
+        cutoff = now - self.heartbeat_timeout
+
+        def rank(key: ServerKey) -> tuple[int, int] | None:
+            entry = self._servers.get(key)
+            return match_priority(entry, cutoff) if entry is not None else None
+
+        with self._lock:
+            best = self._matchmaking.best(None, rank)
+            if class_id is not None:
+                class_best = self._matchmaking.best(class_id, rank)
+                if class_best is not None and (best is None or class_best[0] <= best[0]):
+                    best = class_best
+            if best is None:
+                return None
+            return serialize_server(self._servers[best[1]], cutoff)
+
+    def publish_changes(self, now: float | None = None) -> int:
+        """Diff the listed servers against the last published state and append feed events."""
+        self._check_feed_pid()
+        servers = self.listed_servers(now)
+        current = {(server["ip"], server["port"]): server for server in servers}
+
+        with self._feed_cond:
+            previous = self._feed_state
+            self._feed_state = current
+            if previous is None:
+                return 0
+
+            events: list[tuple[str, dict[str, Any]]] = []
+            for key, server in current.items():
+                before = previous.get(key)
+                if before is None:
+                    events.append(("server_added", server))
+                elif before != server:
+                    events.append(("server_updated", server))
+            for key in previous.keys() - current.keys():
+                events.append(("server_expired", {"ip": key[0], "port": key[1]}))
+
+            if not events:
+                return 0
+
+            for event, payload in events:
+                self._feed_seq += 1
+                self._feed_frames.append(
+                    (self._feed_seq, _sse_frame(self._feed_epoch, self._feed_seq, event, payload))
+                )
+            if len(self._feed_frames) > 2 * FEED_BACKLOG:
+                del self._feed_frames[:-FEED_BACKLOG]
+            self._feed_snapshot_frame = None
+            self._feed_cond.notify_all()
+            return len(events)
+
+    def feed_snapshot(self) -> tuple[int, str]:
+        """Full list as a ``snapshot`` frame plus the cursor it corresponds to."""
+        self._check_feed_pid()
+        self._ensure_worker()
+        with self._feed_cond:
+            if self._feed_state is None:
+                self._feed_state = {
+                    (server["ip"], server["port"]): server for server in self.listed_servers()
+                }
+            if self._feed_snapshot_frame is None:
+                servers = list(self._feed_state.values())
+                self._feed_snapshot_frame = (
+                    self._feed_seq,
+                    "retry: 3000\n" + _sse_frame(self._feed_epoch, self._feed_seq, "snapshot", servers),
+                )
+            return self._feed_snapshot_frame
+
+    def feed_since(self, cursor: int, timeout: float) -> list[tuple[int, str]] | None:
+        """Frames after ``cursor``, waiting up to ``timeout`` for new ones.
+
+        Returns ``None`` when the cursor fell out of the backlog and the
+        subscriber has to resync from a snapshot.
+        """
+        self._check_feed_pid()
+        # A resumed stream may be the first request this worker serves.
+        self._ensure_worker()
+        with self._feed_cond:
+            if cursor == self._feed_seq:
+                self._feed_cond.wait(timeout)
+            if cursor > self._feed_seq:
+                return None
+            if cursor == self._feed_seq:
+                return []
+            first_seq = self._feed_frames[0][0] if self._feed_frames else self._feed_seq + 1
+            if cursor + 1 < first_seq:
+                return None
+            return self._feed_frames[cursor + 1 - first_seq:]
+
+    def parse_feed_cursor(self, event_id: str | None) -> int | None:
+        """Cursor for a client's ``Last-Event-ID``, or ``None`` if it came from another process."""
+        if not event_id:
+            return None
+        self._check_feed_pid()
+        epoch, _, seq = event_id.partition(":")
+        if epoch != self._feed_epoch:
+            return None
+        try:
+            return int(seq)
+        except ValueError:
+            return None
+
+    def _check_feed_pid(self) -> None:
+        # A forked worker inherits the parent's feed; start its own history.
+        if self._feed_pid == os.getpid():
+            return
+        with self._feed_cond:
+            if self._feed_pid == os.getpid():
+                return
+            self._feed_pid = os.getpid()
+            self._feed_epoch = uuid.uuid4().hex[:12]
+            self._feed_seq = 0
+            self._feed_frames = []
+            self._feed_state = None
+            self._feed_snapshot_frame = None
+
+    def flush(self) -> int:
+        """Write pending heartbeats to the database. Must run inside an app context.
+
+        Each batch is a single ``INSERT ... ON CONFLICT (ip, port) DO UPDATE``
+        that only applies when the incoming heartbeat is newer, so concurrent
+        flushes from several workers never race on ``_server_ip_port_uc`` and
+        the latest heartbeat always wins.
+        """
+        with self._lock:
+            pending = []
+            for key in self._dirty:
+                entry = self._servers.get(key)
+                if entry is None:
+                    continue
+                pending.append({
+                    "ip": entry.ip,
+                    "port": entry.port,
+                    "name": entry.name,
+                    "player_count": entry.player_count,
+                    "required_players": entry.required_players,
+                    "last_heartbeat": entry.last_heartbeat,
+                    "heartbeat_count": entry.unflushed_beats,
+                    "first_heartbeat": entry.unflushed_since if entry.unflushed_since is not None else entry.last_heartbeat,
+                })
+                entry.unflushed_beats = 0
+                entry.unflushed_since = None
+            self._dirty.clear()
+
+        if not pending:
+            return 0
+
+        # A stable row order keeps concurrent batches from deadlocking on each other.
+        pending.sort(key=lambda row: (row["ip"], row["port"]))
+        written = 0
+        for start in range(0, len(pending), FLUSH_BATCH_SIZE):
+            batch = pending[start:start + FLUSH_BATCH_SIZE]
+            started = time.perf_counter()
+            try:
+                db.session.execute(_heartbeat_upsert(batch))
+                db.session.commit()
+            except SQLAlchemyError:
+                db.session.rollback()
+                remaining = pending[start:]
+                with self._lock:
+                    for row in remaining:
+                        entry = self._servers.get((row["ip"], row["port"]))
+                        if entry is not None:
+                            entry.unflushed_beats += row["heartbeat_count"]
+                            entry.unflushed_since = min(
+                                row["first_heartbeat"],
+                                entry.unflushed_since if entry.unflushed_since is not None else row["first_heartbeat"],
+                            )
+                            self._dirty.add((entry.ip, entry.port))
+                    self._flush_failures += 1
+                logger.exception("Failed to flush %d game server heartbeat(s); will retry", len(remaining))
+                return written
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            written += len(batch)
+            with self._lock:
+                self._flush_batches.append((time.time(), len(batch), elapsed_ms))
+                self._flushed_rows += len(batch)
+
+        return written
+
+    def stats(self) -> dict[str, Any]:
+        """Counters and recent flush batch timings for this worker."""
+        with self._lock:
+            batches = list(self._flush_batches)
+            stats: dict[str, Any] = {
+                "pid": os.getpid(),
+                "servers_in_memory": len(self._servers),
+                "pending_writes": len(self._dirty),
+                "matchmaking_entries": len(self._matchmaking),
+                "flushed_rows": self._flushed_rows,
+                "flush_failures": self._flush_failures,
+                "feed_epoch": self._feed_epoch,
+                "feed_sequence": self._feed_seq,
+            }
+        reaper = self.reaper.stats
+        stats["reaper"] = {
+            "runs": reaper.runs,
+            "skipped_locked": reaper.skipped_locked,
+            "rows_reaped": reaper.rows_reaped,
+            "last_run_at": reaper.last_run_at,
+            "last_run_rows": reaper.last_run_rows,
+            "last_run_ms": reaper.last_run_ms,
+            "last_batches_ms": list(reaper.batch_ms),
+        }
+
+        durations = sorted(elapsed_ms for _, _, elapsed_ms in batches)
+        stats["recent_batches"] = {
+            "count": len(batches),
+            "rows": sum(rows for _, rows, _ in batches),
+            "p50_ms": round(durations[len(durations) // 2], 3) if durations else None,
+            "p95_ms": round(durations[min(len(durations) - 1, int(len(durations) * 0.95))], 3) if durations else None,
+            "max_ms": round(durations[-1], 3) if durations else None,
+            "last": [
+                {"at": at, "rows": rows, "duration_ms": round(elapsed_ms, 3)}
+                for at, rows, elapsed_ms in batches[-10:]
+            ],
+        }
+        return stats
+
+    def refresh_from_database(self) -> None:
+        """Pull listed rows so heartbeats absorbed by other workers and lobby edits show up here."""
+        cutoff = time.time() - self.heartbeat_timeout
+        rows = GameServer.query.filter(
+            or_(GameServer.last_heartbeat > cutoff, GameServer.persistent.is_(True))
+        ).all()
+
+        with self._lock:
+            seen: set[ServerKey] = set()
+            for row in rows:
+                seen.add((row.ip, row.port))
+                self._merge_row(row, prefer_row=False)
+                # Also catches lobbies whose heartbeat lapsed, which rank better once idle.
+                self._reindex(self._servers[(row.ip, row.port)])
+
+            for key, entry in list(self._servers.items()):
+                if key in seen or key in self._dirty:
+                    continue
+                # Persistent entries missing from the database were deleted elsewhere;
+                # expired ephemeral ones no longer need to be held in memory.
+                if entry.persistent or not entry.is_active(cutoff):
+                    del self._servers[key]
+                    self._matchmaking.discard(key)
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        if self._app is None or not self._dirty:
+            return
+        try:
+            with self._app.app_context():
+                self.flush()
+        except Exception:
+            logger.exception("Final game server registry flush failed")
+
+    def _merge_row(self, row: GameServer, prefer_row: bool) -> None:
+        key = (row.ip, row.port)
+        row_heartbeat = float(row.last_heartbeat or 0.0)
+        entry = self._servers.get(key)
+        if entry is None:
+            entry = ServerEntry(
+                ip=row.ip,
+                port=row.port,
+                name=row.name,
+                player_count=int(row.player_count or 0),
+                required_players=int(row.required_players or 2),
+                last_heartbeat=row_heartbeat,
+            )
+            self._servers[key] = entry
+        elif prefer_row or (key not in self._dirty and row_heartbeat > entry.last_heartbeat):
+            entry.name = row.name
+            entry.player_count = int(row.player_count or 0)
+            entry.required_players = int(row.required_players or 2)
+            entry.last_heartbeat = max(entry.last_heartbeat, row_heartbeat)
+
+        entry.persistent = bool(row.persistent)
+        entry.owner_teacher_id = row.owner_teacher_id
+        entry.class_id = row.class_id
+        entry.public_id = row.public_id
+
+    def _reindex(self, entry: ServerEntry, now: float | None = None) -> None:
+        now = time.time() if now is None else now
+        self._matchmaking.update(
+            (entry.ip, entry.port),
+            match_pool(entry),
+            match_priority(entry, now - self.heartbeat_timeout),
+        )
+
+    def _ensure_worker(self) -> None:
+        # Threads do not survive fork, so a preforked worker starts its own.
+        pid = os.getpid()
+        if self._app is None or (self._worker_pid == pid and self._worker is not None and self._worker.is_alive()):
+            return
+        with self._lock:
+            if self._worker_pid == pid and self._worker is not None and self._worker.is_alive():
+                return
+            self._stop.clear()
+            self._worker_pid = pid
+            self._worker = threading.Thread(target=self._run, name="server-registry", daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        next_sync = time.monotonic() + self.flush_interval
+        while not self._stop.wait(min(self.feed_interval, self.flush_interval)):
+            try:
+                if time.monotonic() >= next_sync:
+                    next_sync = time.monotonic() + self.flush_interval
+                    with self._app.app_context():
+                        self.flush()
+                        self.refresh_from_database()
+                        self.reaper.maybe_run()
+                self.publish_changes()
+            except Exception:
+                logger.exception("Game server registry sync failed")
+
+
+server_registry = ServerRegistry()
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import math
+import os
+from array import array
+from typing import Any, Mapping
+
+
+TELEMETRY_SAMPLES = int(os.getenv("SERVER_TELEMETRY_SAMPLES", "120"))
+TELEMETRY_METRICS = ("tick_rate", "frame_time_ms", "memory_mb", "peers")
+
+
+def parse_metrics(raw: Any) -> dict[str, float] | None:
+    """Keep the known, finite, non-negative metrics from a heartbeat payload."""
+    if not isinstance(raw, Mapping):
+        return None
+    metrics: dict[str, float] = {}
+    for name in TELEMETRY_METRICS:
+        value = raw.get(name)
+        if value is None or isinstance(value, bool):
+            continue
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            continue
+        if math.isfinite(value) and value >= 0:
+            metrics[name] = value
+    return metrics or None
+
+
+class TelemetryRing:
+    """Fixed-size columnar ring buffer of heartbeat metrics for one server.
+
+    Every column is a preallocated ``array('d')`` so recording a sample is a
+    handful of slot writes with no allocation; metrics missing from a
+    heartbeat are stored as NaN and reported as ``None``.
+    """
+
+    __slots__ = ("capacity", "_timestamps", "_columns", "_next", "_size")
+
+    def __init__(self, capacity: int = TELEMETRY_SAMPLES) -> None:
+        self.capacity = max(1, capacity)
+        self._timestamps = array("d", [0.0]) * self.capacity
+        self._columns = {name: array("d", [math.nan]) * self.capacity for name in TELEMETRY_METRICS}
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def record(self, timestamp: float, metrics: Mapping[str, float]) -> None:
+        slot = self._next
+        self._timestamps[slot] = timestamp
+        for name, column in self._columns.items():
+            column[slot] = metrics.get(name, math.nan)
+        self._next = (slot + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def series(self, limit: int | None = None) -> dict[str, list[float | None]]:
+        """Oldest-first columns, optionally only the newest ``limit`` samples."""
+        count = self._size if limit is None else max(0, min(limit, self._size))
+        start = (self._next - count) % self.capacity
+        if start + count <= self.capacity:
+            window = slice(start, start + count)
+            pick = lambda column: column[window].tolist()
+        else:
+            head = slice(start, self.capacity)
+            tail = slice(0, start + count - self.capacity)
+            pick = lambda column: column[head].tolist() + column[tail].tolist()
+
+        series: dict[str, list[float | None]] = {"timestamps": pick(self._timestamps)}
+        for name, column in self._columns.items():
+            series[name] = [None if math.isnan(value) else value for value in pick(column)]
+        return series
+
+    def latest(self) -> dict[str, float | None] | None:
+        if not self._size:
+            return None
+        slot = (self._next - 1) % self.capacity
+        return {
+            name: (None if math.isnan(column[slot]) else column[slot])
+            for name, column in self._columns.items()
+        }
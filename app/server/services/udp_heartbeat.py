@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import hmac
+import ipaddress
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from dataclasses import dataclass
+
+from app.server.services.server_registry import ServerKey, ServerRegistry, server_registry
+
+
+logger = logging.getLogger(__name__)
+
+UDP_HEARTBEAT_HOST = os.getenv("UDP_HEARTBEAT_HOST", "0.0.0.0")
+UDP_HEARTBEAT_PORT = int(os.getenv("UDP_HEARTBEAT_PORT", "0") or 0)
+UDP_HEARTBEAT_SECRET = os.getenv("UDP_HEARTBEAT_SECRET", "")
+MAX_CLOCK_SKEW_SECONDS = float(os.getenv("UDP_HEARTBEAT_MAX_SKEW_SECONDS", "30"))
+
+# magic, advertised ip (IPv6, or IPv4-mapped), game port, player count,
+# required players, unix timestamp (big endian)
+PACKET_MAGIC = b"GHB2"
+PACKET_HEADER = struct.Struct("!4s16sHHHd")
+TAG_SIZE = 16
+PACKET_SIZE = PACKET_HEADER.size + TAG_SIZE
+
+
+def _sign(secret: bytes, header: bytes) -> bytes:
+    return hmac.digest(secret, header, "sha256")[:TAG_SIZE]
+
+
+def _pack_ip(ip: str) -> bytes:
+    address = ipaddress.ip_address(ip)
+    if address.version == 4:
+        address = ipaddress.IPv6Address(f"::ffff:{address}")
+    return address.packed
+
+
+def _unpack_ip(packed: bytes) -> str:
+    address = ipaddress.IPv6Address(packed)
+    return str(address.ipv4_mapped or address)
+
+
+def build_heartbeat_packet(
+    secret: str | bytes,
+    ip: str,
+    port: int,
+    player_count: int,
+    required_players: int = 2,
+    timestamp: float | None = None,
+) -> bytes:
+    """Encode a heartbeat the way game servers are expected to send it.
+
+    ``ip`` is the address the server registered with (its advertised ip), so
+    any worker can match the packet whatever address it arrives from.
+    """
+    key = secret.encode("utf-8") if isinstance(secret, str) else secret
+    header = PACKET_HEADER.pack(
+        PACKET_MAGIC,
+        _pack_ip(ip),
+        port,
+        max(0, min(player_count, 0xFFFF)),
+        max(1, min(required_players, 0xFFFF)),
+        time.time() if timestamp is None else timestamp,
+    )
+    return header + _sign(key, header)
+
+
+@dataclass(slots=True)
+class HeartbeatStats:
+    accepted: int = 0
+    malformed: int = 0
+    bad_signature: int = 0
+    stale: int = 0
+    unknown_server: int = 0
+
+
+class UdpHeartbeatListener:
+    """Receives compact signed heartbeats and feeds them into the server registry.
+
+    Servers still register over HTTP first (that is where their name is set);
+    UDP packets only refresh player counts and liveness for servers the
+    registry already knows. Packets name the server by its signed advertised
+    ``ip:port``, so a server behind NAT is matched by every worker that loaded
+    its row, not only by the one that handled its registration. Timestamps must be within ``max_skew`` of the
+    local clock and strictly increase per server, so captured packets cannot
+    be replayed.
+
+    Every process serves its own registry, so the listener follows forks: a
+    child (a Gunicorn worker under ``--preload``) binds its own socket and
+    thread, and the parent stops receiving so no sender is hashed to it.
+    """
+
+    def __init__(
+        self,
+        secret: str,
+        host: str = UDP_HEARTBEAT_HOST,
+        port: int = UDP_HEARTBEAT_PORT,
+        registry: ServerRegistry = server_registry,
+        max_skew: float = MAX_CLOCK_SKEW_SECONDS,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self.max_skew = max_skew
+        self.stats = HeartbeatStats()
+        self._secret = secret.encode("utf-8")
+        self._last_seen: dict[ServerKey, float] = {}
+        self._socket: socket.socket | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._pid: int | None = None
+        self._enabled = False
+        self._fork_hooks = False
+
+    def start(self) -> None:
+        self._bind()
+        self._enabled = True
+        if not self._fork_hooks and hasattr(os, "register_at_fork"):
+            os.register_at_fork(
+                after_in_parent=self._after_fork_in_parent,
+                after_in_child=self._after_fork_in_child,
+            )
+            self._fork_hooks = True
+
+    def stop(self) -> None:
+        self._enabled = False
+        self._release(join=True)
+
+    def _bind(self) -> None:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            # Lets every Gunicorn worker bind the same port; the kernel spreads
+            # senders across them by address hash.
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        sock.bind((self.host, self.port))
+        sock.settimeout(1.0)
+        self.port = sock.getsockname()[1]
+        self._socket = sock
+        self._pid = os.getpid()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="udp-heartbeat", daemon=True)
+        self._thread.start()
+        logger.info("UDP heartbeat listener on %s:%d (pid %d)", self.host, self.port, self._pid)
+
+    def _release(self, join: bool) -> None:
+        self._stop.set()
+        if join and self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=2)
+        if self._socket is not None:
+            try:
+                # Wakes a receive blocked on this socket so it leaves the port now.
+                self._socket.shutdown(socket.SHUT_RD)
+            except OSError:
+                pass
+            self._socket.close()
+            self._socket = None
+        self._pid = None
+
+    def _after_fork_in_parent(self) -> None:
+        # The child now listens for this process tree. With SO_REUSEPORT the
+        # kernel would otherwise keep routing some senders to the parent.
+        if self._enabled and self._pid == os.getpid():
+            self._release(join=False)
+
+    def _after_fork_in_child(self) -> None:
+        if not self._enabled:
+            return
+        # Only the forking thread survives; drop the inherited socket and start over.
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+        self._thread = None
+        self._last_seen = {}
+        self.stats = HeartbeatStats()
+        try:
+            self._bind()
+        except OSError:
+            logger.exception("Could not bind UDP heartbeat listener on port %d after fork", self.port)
+
+    def handle_packet(self, packet: bytes | memoryview, now: float | None = None) -> bool:
+        if len(packet) != PACKET_SIZE:
+            self.stats.malformed += 1
+            return False
+
+        header = bytes(packet[:PACKET_HEADER.size])
+        magic, packed_ip, port, player_count, required_players, timestamp = PACKET_HEADER.unpack(header)
+        if magic != PACKET_MAGIC:
+            self.stats.malformed += 1
+            return False
+        if not hmac.compare_digest(_sign(self._secret, header), packet[PACKET_HEADER.size:]):
+            self.stats.bad_signature += 1
+            return False
+
+        now = time.time() if now is None else now
+        if abs(now - timestamp) > self.max_skew:
+            self.stats.stale += 1
+            return False
+        sender = (_unpack_ip(packed_ip), port)
+        if timestamp <= self._last_seen.get(sender, 0.0):
+            self.stats.stale += 1
+            return False
+
+        key = self.registry.touch(sender[0], port, player_count, max(1, required_players), now=now)
+        if key is None:
+            self.stats.unknown_server += 1
+            return False
+
+        self._last_seen[sender] = timestamp
+        self.stats.accepted += 1
+        return True
+
+    def _run(self) -> None:
+        buffer = bytearray(PACKET_SIZE + 1)
+        view = memoryview(buffer)
+        sock = self._socket
+        stop = self._stop
+        prune_at = time.monotonic() + self.max_skew
+        while not stop.is_set():
+            try:
+                size, address = sock.recvfrom_into(buffer)
+            except socket.timeout:
+                continue
+            except OSError:
+                if stop.is_set():
+                    return
+                logger.exception("UDP heartbeat receive failed")
+                continue
+            if stop.is_set():
+                return
+
+            try:
+                self.handle_packet(view[:size])
+            except Exception:
+                logger.exception("Failed to process UDP heartbeat from %s", address[0])
+
+            if time.monotonic() >= prune_at:
+                # Anything older than the skew window is rejected anyway.
+                cutoff = time.time() - self.max_skew
+                self._last_seen = {key: seen for key, seen in self._last_seen.items() if seen >= cutoff}
+                prune_at = time.monotonic() + self.max_skew
+
+
+def start_udp_heartbeat_listener(registry: ServerRegistry = server_registry) -> UdpHeartbeatListener | None:
+    """Start the listener when ``UDP_HEARTBEAT_PORT`` and ``UDP_HEARTBEAT_SECRET`` are set."""
+    if not UDP_HEARTBEAT_PORT:
+        return None
+    if not UDP_HEARTBEAT_SECRET:
+        logger.warning("UDP_HEARTBEAT_PORT is set without UDP_HEARTBEAT_SECRET; UDP heartbeats stay disabled")
+        return None
+
+    listener = UdpHeartbeatListener(UDP_HEARTBEAT_SECRET, registry=registry)
+    try:
+        listener.start()
+    except OSError:
+        logger.exception("Could not bind UDP heartbeat listener on port %d", UDP_HEARTBEAT_PORT)
+        return None
+    return listener
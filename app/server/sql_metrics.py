@@ -0,0 +1,130 @@
+"""Per-request SQL statement counts, timing and N+1 detection.
+
+Enabled with ``SQL_METRICS_ENABLED=1`` (or in Flask debug mode). Every
+response then carries a ``Server-Timing`` header with the statement count and
+database time, and one structured log line is written per request. Statement
+shapes (the SQL with literals and ``IN`` lists collapsed) that repeat at least
+``SQL_N_PLUS_ONE_THRESHOLD`` times in one request are reported as probable N+1
+queries.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from app.server.database import db
+
+
+logger = logging.getLogger(__name__)
+
+SQL_METRICS_ENABLED = os.getenv("SQL_METRICS_ENABLED", "").lower() in ("1", "true", "yes")
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+# Log every request, not only those with a probable N+1.
+SQL_METRICS_LOG_ALL = os.getenv("SQL_METRICS_LOG_ALL", "1").lower() in ("1", "true", "yes")
+
+_IN_LIST = re.compile(r"IN \((?:[^()]*)\)", re.IGNORECASE)
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+_SELECT_LIST = re.compile(r"^SELECT .+? FROM ", re.IGNORECASE)
+
+
+def statement_shape(statement: str) -> str:
+    """``statement`` with literals and ``IN`` lists collapsed, so repeats compare equal."""
+    shape = _IN_LIST.sub("IN (?)", statement)
+    shape = _LITERAL.sub("?", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+@dataclass(slots=True)
+class RequestSqlStats:
+    statements: int = 0
+    db_ms: float = 0.0
+    started: float = field(default_factory=time.perf_counter)
+    shapes: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.statements += 1
+        self.db_ms += elapsed_ms
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("sql_metrics_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("sql_metrics_started")
+    if not started:
+        return
+    elapsed_ms = (time.perf_counter() - started.pop()) * 1000.0
+    # Background threads (registry flush, revocation sync) have no request.
+    if has_request_context():
+        stats = g.get("sql_stats")
+        if stats is not None:
+            stats.record(statement, elapsed_ms)
+
+
+def _handle_error(exception_context):
+    started = exception_context.connection.info.get("sql_metrics_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+def init_sql_metrics(app):
+    """Hook the app's engine and report per-request SQL in Server-Timing and logs."""
+    if not (SQL_METRICS_ENABLED or app.debug):
+        return
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+    @app.before_request
+    def start_sql_stats():
+        g.sql_stats = RequestSqlStats()
+
+    @app.after_request
+    def report_sql_stats(response):
+        stats = g.pop("sql_stats", None)
+        if stats is None:
+            return response
+
+        total_ms = (time.perf_counter() - stats.started) * 1000.0
+        repeated = stats.repeated(SQL_N_PLUS_ONE_THRESHOLD)
+        response.headers.add(
+            "Server-Timing", f'db;dur={stats.db_ms:.1f};desc="{stats.statements} statements"'
+        )
+        response.headers.add("Server-Timing", f"app;dur={total_ms:.1f}")
+
+        if not (repeated or SQL_METRICS_LOG_ALL):
+            return response
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "endpoint": request.endpoint,
+            "status": response.status_code,
+            "statements": stats.statements,
+            "db_ms": round(stats.db_ms, 2),
+            "total_ms": round(total_ms, 2),
+            "n_plus_one": [
+                # The column list is noise; keep the table and predicates.
+                {"count": count, "statement": _SELECT_LIST.sub("SELECT ... FROM ", shape)[:300]}
+                for shape, count in repeated
+            ],
+        }
+        log = logger.warning if repeated else logger.info
+        log("sql_metrics %s", json.dumps(record), extra={"sql_metrics": record})
+        return response
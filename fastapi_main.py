@@ -1,13 +1,32 @@
 from __future__ import annotations
 
-from fastapi import FastAPI
+import logging
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.auth.revocation import revocation_list
+from app.server.engine import get_engine, pool_stats
 from app.server.routes.admin_users import router as admin_users_router
 from app.server.routes.game_sockets import router as game_sockets_router
 
 
-app = FastAPI(title="BatangAware Realtime Backend", version="0.1.0")
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    if os.getenv("DATABASE_URL"):
+        # Revoked tokens are rejected here too, checked against the shared pool.
+        revocation_list.init_engine(get_engine())
+    else:
+        logger.warning("DATABASE_URL is not set; token revocations are not checked")
+    yield
+
+
+app = FastAPI(title="BatangAware Realtime Backend", version="0.1.0", lifespan=lifespan)
 
 lan_origin_regex = r"https?://(localhost|127\.0\.0\.1|10\.\d+\.\d+\.\d+|192\.168\.\d+\.\d+|172\.(1[6-9]|2\d|3[0-1])\.\d+\.\d+)(:\d+)?"
 
@@ -39,3 +58,10 @@ def root() -> dict[str, str]:
 @app.get("/health")
 def health() -> dict[str, str]:
     return {"status": "healthy"}
+
+
+@app.get("/health/db-pool")
+def db_pool_health() -> dict:
+    if not os.getenv("DATABASE_URL"):
+        raise HTTPException(status_code=404, detail="No database configured.")
+    return pool_stats(get_engine())
@@ -0,0 +1,24 @@
+# Production server settings: gunicorn -c gunicorn.conf.py main:app
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("GUNICORN_WORKERS", "4"))
+
+# /server/stream keeps a connection open for every lobby browser. gevent serves
+# each one as a greenlet, so a worker holds thousands of streams instead of one
+# OS thread per subscriber. Do not switch back to sync/gthread workers.
+worker_class = "gevent"
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "2000"))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+
+def post_fork(server, worker):
+    # psycopg2 is a C extension that monkey-patching cannot reach; without a
+    # wait callback each query would stall every greenlet in the worker.
+    from app.server.engine import make_psycopg2_green
+
+    if not make_psycopg2_green():
+        server.log.warning("psycopg2 is not installed; database calls will block the gevent hub")
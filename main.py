@@ -1,6 +1,9 @@
 from app.server.app import create_app
 
-app = create_app()
+# Password hashing pool workers are spawned and re-import this file as
+# __mp_main__; they only need the hash function, not a second app.
+if __name__ != '__mp_main__':
+    app = create_app()
 
 if __name__ == '__main__':
     # In production, use Gunicorn or similar. 
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from pathlib import Path
+from typing import Any
+
+# Add project root to path so we can import app
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.auth.auth_handler import signJWT
+from app.server.routes.game_sockets import LobbyRuntime, LobbySocketHub
+
+
+DEFAULT_SIZES = (2, 10, 50, 100, 200)
+CASES = ("process_trade", "compute_scores", "rotate_event", "broadcast_game_state")
+
+
+class FakeWebSocket:
+    """In-memory stand-in for a FastAPI WebSocket that still pays the JSON encoding cost."""
+
+    def __init__(self) -> None:
+        self.messages_sent = 0
+        self.bytes_sent = 0
+
+    async def accept(self) -> None:
+        return None
+
+    async def send_json(self, message: dict[str, Any]) -> None:
+        self.messages_sent += 1
+        self.bytes_sent += len(json.dumps(message, separators=(",", ":")))
+
+
+async def build_lobby(hub: LobbySocketHub, lobby_id: str, size: int, seed: int) -> LobbyRuntime:
+    for index in range(size):
+        token = signJWT(user_id=f"bench-{index}", role="Student")["access_token"]
+        await hub.connect_to_lobby(lobby_id, f"Bearer {token}", FakeWebSocket())
+
+    runtime = hub.get_lobby(lobby_id)
+    # The event timer sleeps for a full round; it would only add noise here.
+    if runtime.timer_task is not None:
+        runtime.timer_task.cancel()
+    runtime.engine.reseed(seed)
+    runtime.game_state.players[0].is_carrier = True
+    return runtime
+
+
+def _trade_step(runtime: LobbyRuntime, rng: random.Random) -> Callable[[], Awaitable[None]]:
+    players = runtime.game_state.players
+
+    async def step() -> None:
+        player_a, player_b = rng.sample(players, 2)
+        item_a = rng.choice([item for item, count in player_a.inventory.items() if count > 0])
+        item_b = rng.choice([item for item, count in player_b.inventory.items() if count > 0])
+        runtime.engine.process_trade(player_a, player_b, {item_a: 1}, {item_b: 1})
+
+    return step
+
+
+async def _time_case(step: Callable[[], Awaitable[None]], iterations: int, warmup: int) -> dict[str, float]:
+    for _ in range(warmup):
+        await step()
+
+    samples: list[int] = []
+    for _ in range(iterations):
+        started = time.perf_counter_ns()
+        await step()
+        samples.append(time.perf_counter_ns() - started)
+
+    samples.sort()
+    median_ns = statistics.median(samples)
+    return {
+        "iterations": iterations,
+        "median_us": round(median_ns / 1000, 3),
+        "p95_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] / 1000, 3),
+        "min_us": round(samples[0] / 1000, 3),
+        "ops_per_sec": round(1e9 / median_ns, 1) if median_ns else 0.0,
+    }
+
+
+async def run_size(size: int, iterations: int, warmup: int, seed: int) -> dict[str, dict[str, float]]:
+    hub = LobbySocketHub()
+    lobby_id = f"bench-{size}"
+    runtime = await build_lobby(hub, lobby_id, size, seed)
+    rng = random.Random(seed)
+
+    async def compute_scores() -> None:
+        runtime.engine.compute_scores()
+
+    async def rotate_event() -> None:
+        runtime.engine.rotate_event()
+
+    async def broadcast() -> None:
+        await hub.broadcast_game_state(lobby_id)
+
+    steps: dict[str, Callable[[], Awaitable[None]]] = {
+        "process_trade": _trade_step(runtime, rng),
+        "compute_scores": compute_scores,
+        "rotate_event": rotate_event,
+        "broadcast_game_state": broadcast,
+    }
+
+    results: dict[str, dict[str, float]] = {}
+    for case in CASES:
+        # Broadcasting fans out to every player, so scale its iteration count down.
+        case_iterations = max(20, iterations // size) if case == "broadcast_game_state" else iterations
+        results[case] = await _time_case(steps[case], case_iterations, warmup)
+
+    hub.close_lobby(lobby_id)
+    return results
+
+
+async def run_benchmarks(sizes: Sequence[int], iterations: int, warmup: int, seed: int) -> dict[str, Any]:
+    report: dict[str, Any] = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "iterations": iterations,
+            "seed": seed,
+        },
+        "results": {},
+    }
+    for size in sizes:
+        if size < 2:
+            raise SystemExit("Lobby sizes must be at least 2 players.")
+        report["results"][str(size)] = await run_size(size, iterations, warmup, seed)
+        print(f"[bench] lobby size {size}:")
+        for case, stats in report["results"][str(size)].items():
+            print(f"    {case:<22} median {stats['median_us']:>10.1f} us   p95 {stats['p95_us']:>10.1f} us")
+    return report
+
+
+def compare_reports(baseline: dict[str, Any], current: dict[str, Any], threshold: float) -> list[str]:
+    regressions: list[str] = []
+    for size, cases in current.get("results", {}).items():
+        baseline_cases = baseline.get("results", {}).get(size, {})
+        for case, stats in cases.items():
+            base_stats = baseline_cases.get(case)
+            if not base_stats or not base_stats.get("median_us"):
+                continue
+            ratio = stats["median_us"] / base_stats["median_us"]
+            marker = "REGRESSION" if ratio > 1 + threshold else "ok"
+            print(
+                f"[compare] size={size:<4} {case:<22} "
+                f"{base_stats['median_us']:>10.1f} -> {stats['median_us']:>10.1f} us  ({ratio:5.2f}x) {marker}"
+            )
+            if marker == "REGRESSION":
+                regressions.append(f"{case} @ {size} players: {ratio:.2f}x slower")
+    return regressions
+
+
+def _load_report(path: str) -> dict[str, Any]:
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark GameEngine and LobbySocketHub without a database or network.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks and write a JSON report.")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    run_parser.add_argument("--iterations", type=int, default=2000)
+    run_parser.add_argument("--warmup", type=int, default=50)
+    run_parser.add_argument("--seed", type=int, default=7)
+    run_parser.add_argument("--output", default="bench_realtime.json")
+    run_parser.add_argument("--baseline", help="Compare against this report after running.")
+    run_parser.add_argument("--threshold", type=float, default=0.15, help="Allowed slowdown ratio (0.15 = 15%%).")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two JSON reports.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.15, help="Allowed slowdown ratio (0.15 = 15%%).")
+
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+
+    if args.command == "run":
+        report = asyncio.run(run_benchmarks(args.sizes, args.iterations, args.warmup, args.seed))
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"[bench] wrote {args.output}")
+        if not args.baseline:
+            return 0
+        baseline = _load_report(args.baseline)
+        current = report
+    else:
+        baseline = _load_report(args.baseline)
+        current = _load_report(args.current)
+
+    regressions = compare_reports(baseline, current, args.threshold)
+    if regressions:
+        print(f"[compare] {len(regressions)} regression(s) past {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"    {line}")
+        return 1
+    print("[compare] no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
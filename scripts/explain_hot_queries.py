@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add project root to path so we can import app
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+from flask import Flask
+from sqlalchemy import func, select
+
+from app.server.database import db
+from app.server.engine import normalize_database_url
+from app.server.migrations import LATEST_VERSION, current_version
+from app.server.models.user import Message, MissionProgress, PlaytimeLog, Quiz, QuizResult, User
+
+
+def _sample_ids() -> dict[str, int]:
+    """Pick ids that actually have rows, so the plans reflect real selectivity."""
+
+    def busiest(column) -> int:
+        row = db.session.execute(
+            select(column, func.count()).where(column.is_not(None)).group_by(column).order_by(func.count().desc()).limit(1)
+        ).first()
+        return row[0] if row else 1
+
+    return {
+        "student_id": busiest(QuizResult.student_id),
+        "user_id": busiest(MissionProgress.user_id),
+        "mission_id": busiest(MissionProgress.mission_id),
+        "quiz_id": busiest(QuizResult.quiz_id),
+        "parent_id": busiest(User.parent_id),
+        "class_id": busiest(User.class_id),
+        "receiver_id": busiest(Message.receiver_id),
+        "playtime_user_id": busiest(PlaytimeLog.user_id),
+    }
+
+
+def hot_queries(ids: dict[str, int]) -> list[tuple[str, object]]:
+    """The filters the routes run, written the way the routes write them."""
+    return [
+        (
+            "POST /mission/update: progress for (user, mission)",
+            select(MissionProgress).filter_by(user_id=ids["user_id"], mission_id=ids["mission_id"]).limit(1),
+        ),
+        (
+            "POST /student/quiz/<id>/submit: existing result for (quiz, student)",
+            select(QuizResult).filter_by(quiz_id=ids["quiz_id"], student_id=ids["student_id"]).limit(1),
+        ),
+        (
+            "GET /student/class: class quizzes by start date",
+            select(Quiz).filter_by(class_id=ids["class_id"]).order_by(Quiz.start_date.asc()),
+        ),
+        (
+            "GET /student/class: feedback on the student's results",
+            select(Message)
+            .where(Message.receiver_id == ids["student_id"], Message.quiz_result_id.in_([1, 2, 3]))
+            .order_by(Message.created_at.desc()),
+        ),
+        (
+            "GET /parent/feedback: messages to a parent and children",
+            select(Message)
+            .where(Message.receiver_id.in_([ids["receiver_id"], ids["parent_id"]]))
+            .order_by(Message.created_at.desc()),
+        ),
+        (
+            "parent routes: children of a parent",
+            select(User).filter_by(parent_id=ids["parent_id"], role="Student"),
+        ),
+        (
+            "teacher/admin routes: students in a class",
+            select(User).filter_by(class_id=ids["class_id"], role="Student").order_by(User.id.asc()),
+        ),
+        (
+            "GET /parent/stats: playtime by date",
+            select(PlaytimeLog).filter_by(user_id=ids["playtime_user_id"]).order_by(PlaytimeLog.date.desc()),
+        ),
+        (
+            "GET /api/admin/dashboard/analytics: recent playtime",
+            select(PlaytimeLog).where(
+                PlaytimeLog.user_id.in_([ids["playtime_user_id"]]),
+                PlaytimeLog.date >= date.today() - timedelta(days=7),
+            ),
+        ),
+    ]
+
+
+def explain(statement, analyze: bool) -> list[str]:
+    dialect = db.engine.dialect
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+    if dialect.name == "postgresql":
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN "
+        rows = db.session.connection().exec_driver_sql(prefix + sql).all()
+        return [row[0] for row in rows]
+    rows = db.session.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + sql).all()
+    return [row[-1] for row in rows]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Print EXPLAIN plans for the route queries that rely on composite indexes.")
+    parser.add_argument("--analyze", action="store_true", help="Run EXPLAIN ANALYZE (executes the queries; Postgres only).")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    load_dotenv(override=True)
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        print("[explain] DATABASE_URL is not set", file=sys.stderr)
+        return 1
+
+    # Bind only: init_db would migrate and seed the database being inspected.
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = normalize_database_url(database_url)
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    with app.app_context():
+        version = current_version()
+        if version < LATEST_VERSION:
+            print(
+                f"[explain] schema is at version {version}, expected {LATEST_VERSION}; "
+                "start the app once to apply migrations, then re-run",
+                file=sys.stderr,
+            )
+            return 1
+        ids = _sample_ids()
+        print(f"[explain] dialect={db.engine.dialect.name} sample ids={ids}")
+        for label, statement in hot_queries(ids):
+            print(f"\n== {label}")
+            for line in explain(statement, args.analyze):
+                print(f"   {line}")
+            db.session.rollback()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path so we can import app
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.auth.keyring import (
+    ASYMMETRIC_ALGORITHMS,
+    CURRENT_KEY_FILE,
+    JWT_KEYS_DIR,
+    Keyring,
+    generate_private_key,
+    set_current_kid,
+    write_private_key,
+)
+
+
+def cmd_list(args: argparse.Namespace) -> int:
+    ring = Keyring(args.dir)
+    ring.reload()
+    current = ring._current.kid if ring._current else None
+    paths = sorted(Path(args.dir).glob("*.pem"), key=lambda path: path.stat().st_mtime)
+    if not paths:
+        print(f"[keys] no keys in {args.dir}")
+    for path in paths:
+        key = ring._keys[path.stem]
+        marker = "*" if key.kid == current else " "
+        print(f"{marker} {key.kid:<24} {key.algorithm}")
+    return 0
+
+
+def cmd_generate(args: argparse.Namespace) -> int:
+    kid = write_private_key(args.dir, generate_private_key(args.algorithm))
+    print(f"[keys] generated {args.algorithm} key {kid}")
+    if args.activate:
+        set_current_kid(args.dir, kid)
+        print(f"[keys] {kid} now signs new tokens")
+    else:
+        print(f"[keys] published in JWKS only; activate with: {Path(__file__).name} activate {kid}")
+    return 0
+
+
+def cmd_activate(args: argparse.Namespace) -> int:
+    set_current_kid(args.dir, args.kid)
+    print(f"[keys] {args.kid} now signs new tokens")
+    return 0
+
+
+def cmd_prune(args: argparse.Namespace) -> int:
+    directory = Path(args.dir)
+    current_file = directory / CURRENT_KEY_FILE
+    current = current_file.read_text(encoding="utf-8").strip() if current_file.exists() else None
+    retired = sorted(
+        (path for path in directory.glob("*.pem") if path.stem != current),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True,
+    )
+    for path in retired[args.keep:]:
+        path.unlink()
+        print(f"[keys] removed {path.stem}")
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Manage the asymmetric JWT signing keyring.")
+    parser.add_argument("--dir", default=JWT_KEYS_DIR, help="Key directory (default: JWT_KEYS_DIR).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("list", help="List keys; * marks the signing key.")
+
+    generate_parser = subparsers.add_parser("generate", help="Create a key that is published but not yet signing.")
+    generate_parser.add_argument("--algorithm", choices=ASYMMETRIC_ALGORITHMS, default="EdDSA")
+    generate_parser.add_argument("--activate", action="store_true", help="Start signing with it immediately.")
+
+    rotate_parser = subparsers.add_parser("rotate", help="Create a key and start signing with it.")
+    rotate_parser.add_argument("--algorithm", choices=ASYMMETRIC_ALGORITHMS, default="EdDSA")
+
+    activate_parser = subparsers.add_parser("activate", help="Make an existing key the signing key.")
+    activate_parser.add_argument("kid")
+
+    prune_parser = subparsers.add_parser("prune", help="Delete old retired keys.")
+    prune_parser.add_argument("--keep", type=int, default=1, help="Retired keys to keep for verification.")
+
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.command == "rotate":
+        args.activate = True
+        return cmd_generate(args)
+    return {
+        "list": cmd_list,
+        "generate": cmd_generate,
+        "activate": cmd_activate,
+        "prune": cmd_prune,
+    }[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
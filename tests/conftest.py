@@ -0,0 +1,19 @@
+import pytest
+from flask import Flask
+
+from app.server.database import db
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Flask app bound to a throwaway SQLite database with every model's table."""
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'test.db'}"
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    with app.app_context():
+        from app.server.models import user  # noqa: F401  (registers the models)
+
+        db.create_all()
+        yield app
+        db.session.remove()
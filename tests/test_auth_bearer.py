@@ -0,0 +1,67 @@
+import pytest
+from flask import jsonify
+
+from app.auth.auth_bearer import token_required
+from app.auth.auth_handler import signJWT
+from app.auth.token_state import token_state_cache
+from app.server.database import db
+from app.server.models.user import User
+
+
+@pytest.fixture
+def client(app):
+    @app.route("/protected")
+    @token_required
+    def protected():
+        return jsonify({"ok": True})
+
+    @app.route("/auth/change-password")
+    @token_required
+    def change_password():
+        return jsonify({"ok": True})
+
+    token_state_cache.clear()
+    yield app.test_client()
+    token_state_cache.clear()
+
+
+def _user(must_change_password=False):
+    user = User(
+        username="student1",
+        email="student1@example.com",
+        password_hash="x",
+        role="Student",
+        must_change_password=must_change_password,
+    )
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def _get(client, path, token):
+    return client.get(path, headers={"Authorization": f"Bearer {token}"})
+
+
+def test_gate_follows_the_database_not_the_claim(client):
+    user = _user(must_change_password=True)
+    # Issued before the admin reset: the claim still says no change is needed.
+    token = signJWT(str(user.id), user.role, must_change_password=False)["access_token"]
+
+    assert _get(client, "/protected", token).status_code == 403
+    assert _get(client, "/auth/change-password", token).status_code == 200
+
+
+def test_stale_claim_does_not_lock_out_after_change(client):
+    user = _user(must_change_password=False)
+    token = signJWT(str(user.id), user.role, must_change_password=True)["access_token"]
+
+    assert _get(client, "/protected", token).status_code == 200
+
+
+def test_token_for_deleted_user_is_rejected(client):
+    user = _user()
+    token = signJWT(str(user.id), user.role)["access_token"]
+    db.session.delete(user)
+    db.session.commit()
+
+    assert _get(client, "/protected", token).status_code == 401
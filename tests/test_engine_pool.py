@@ -0,0 +1,109 @@
+import json
+import os
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.server.engine import InstrumentedQueuePool, pool_stats, track_engine
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """A one-connection instrumented pool, so a second checkout has to wait."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.2,
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_checkout_times_out_when_the_pool_is_exhausted(engine):
+    held = engine.connect()
+    try:
+        stats = pool_stats(engine)
+        assert stats["checked_out"] == 1 and stats["idle"] == 0
+        assert stats["saturation"] == 1.0
+
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+    finally:
+        held.close()
+
+    stats = pool_stats(engine)
+    assert stats["timeouts"] == 1
+    assert stats["checkouts"] == 1
+    assert stats["saturation"] == 0.0
+
+
+def test_checkout_wait_is_recorded_when_a_connection_is_released(engine):
+    held = engine.connect()
+    release = threading.Timer(0.05, held.close)
+    release.start()
+    try:
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT 1")).scalar() == 1
+    finally:
+        release.join()
+
+    stats = pool_stats(engine)
+    # The first checkout of an empty pool also counts as having found no idle connection.
+    assert stats["checkouts"] == 2
+    assert stats["waited"] == 2
+    assert stats["peak_checked_out"] == 1
+    assert stats["max_wait_ms"] >= 40
+    assert stats["timeouts"] == 0
+
+
+def test_recreate_keeps_counting(engine):
+    engine.connect().close()
+    before = engine.pool.stats
+
+    engine.dispose()
+    engine.connect().close()
+
+    assert engine.pool.stats is before
+    assert pool_stats(engine)["checkouts"] == 2
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_forked_child_gets_a_fresh_pool(engine):
+    track_engine(engine)
+    held = engine.connect()
+    parent_pool = engine.pool
+    read_fd, write_fd = os.pipe()
+
+    pid = os.fork()
+    if pid == 0:  # child
+        try:
+            os.close(read_fd)
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                report = {
+                    "fresh": engine.pool is not parent_pool,
+                    "checked_out": engine.pool.checkedout(),
+                    "checkouts": engine.pool.stats.checkouts,
+                }
+            os.write(write_fd, json.dumps(report).encode())
+        finally:
+            os._exit(0)
+
+    os.close(write_fd)
+    try:
+        with os.fdopen(read_fd, "rb") as pipe:
+            report = json.loads(pipe.read())
+        os.waitpid(pid, 0)
+    finally:
+        held.close()
+
+    # The child's only checked-out connection is its own, and the checkout
+    # succeeded instead of timing out on the exhausted parent pool. Counters
+    # carry over from the parent.
+    assert report == {"fresh": True, "checked_out": 1, "checkouts": 2}
+    assert engine.pool is parent_pool
+    assert parent_pool.checkedout() == 0
@@ -0,0 +1,103 @@
+import os
+
+import jwt
+import pytest
+
+from app.auth import auth_handler
+from app.auth.keyring import Keyring, generate_private_key, set_current_kid, write_private_key
+
+
+def _add_key(directory, algorithm="EdDSA", activate=True):
+    kid = write_private_key(directory, generate_private_key(algorithm))
+    if activate:
+        set_current_kid(directory, kid)
+    return kid
+
+
+@pytest.fixture
+def ring(tmp_path, monkeypatch):
+    ring = Keyring(tmp_path, reload_interval=3600)
+    monkeypatch.setattr(auth_handler, "JWT_ALGORITHM", "EdDSA")
+    monkeypatch.setattr(auth_handler, "keyring", ring)
+    return ring
+
+
+def test_tokens_carry_the_current_kid(tmp_path, ring):
+    kid = _add_key(tmp_path)
+
+    token = auth_handler.signJWT("7", "Student")["access_token"]
+
+    assert jwt.get_unverified_header(token)["kid"] == kid
+    assert auth_handler._decode(token)["user_id"] == "7"
+
+
+def test_rotation_keeps_old_tokens_valid(tmp_path, ring):
+    old_kid = _add_key(tmp_path)
+    old_token = auth_handler.signJWT("7", "Student")["access_token"]
+
+    new_kid = _add_key(tmp_path)
+    ring.reload()
+    new_token = auth_handler.signJWT("7", "Student")["access_token"]
+
+    assert jwt.get_unverified_header(new_token)["kid"] == new_kid != old_kid
+    assert auth_handler._decode(old_token)["user_id"] == "7"
+    assert auth_handler._decode(new_token)["user_id"] == "7"
+
+
+def test_unknown_kid_triggers_a_reload(tmp_path, ring):
+    _add_key(tmp_path)
+    ring.reload()
+    # Another process rotated; this worker has not reloaded yet.
+    other = Keyring(tmp_path)
+    _add_key(tmp_path)
+    other.reload()
+    token = jwt.encode({"user_id": "7"}, other.signing_key().private_key, algorithm="EdDSA",
+                       headers={"kid": other.signing_key().kid})
+    ring._loaded_at -= 2  # past the once-a-second retry guard
+
+    assert ring.verification_key(other.signing_key().kid) is not None
+    assert auth_handler._decode(token)["user_id"] == "7"
+
+
+def test_pruned_key_stops_verifying(tmp_path, ring):
+    old_kid = _add_key(tmp_path)
+    old_token = auth_handler.signJWT("7", "Student")["access_token"]
+    _add_key(tmp_path)
+    (tmp_path / f"{old_kid}.pem").unlink()
+    ring.reload()
+
+    with pytest.raises(jwt.InvalidTokenError):
+        auth_handler._decode(old_token)
+
+
+def test_jwks_verifies_tokens_offline(tmp_path, ring):
+    ed_kid = _add_key(tmp_path, "EdDSA")
+    ed_token = auth_handler.signJWT("7", "Student")["access_token"]
+    rsa_kid = _add_key(tmp_path, "RS256")
+    ring.reload()
+    rsa_token = jwt.encode({"user_id": "8"}, ring.signing_key().private_key, algorithm="RS256",
+                           headers={"kid": rsa_kid})
+
+    jwks = auth_handler.public_jwks()
+    published = {jwk["kid"]: jwk for jwk in jwks["keys"]}
+
+    assert set(published) == {ed_kid, rsa_kid}
+    assert all("d" not in jwk for jwk in jwks["keys"])  # no private material
+    for token, kid, algorithm in ((ed_token, ed_kid, "EdDSA"), (rsa_token, rsa_kid, "RS256")):
+        assert published[kid]["alg"] == algorithm
+        public_key = jwt.PyJWK(published[kid]).key
+        assert jwt.decode(token, public_key, algorithms=[algorithm])["user_id"] in ("7", "8")
+
+
+def test_without_a_current_file_the_newest_key_signs(tmp_path, ring):
+    _add_key(tmp_path, activate=False)
+    newest = _add_key(tmp_path, activate=False)
+    os.utime(tmp_path / f"{newest}.pem", (2_000_000_000, 2_000_000_000))
+
+    assert ring.signing_key().kid == newest
+
+
+def test_hmac_tokens_publish_no_keys(monkeypatch):
+    monkeypatch.setattr(auth_handler, "JWT_ALGORITHM", "HS256")
+
+    assert auth_handler.public_jwks() == {"keys": []}
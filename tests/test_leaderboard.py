@@ -0,0 +1,55 @@
+from app.server.services.leaderboard import LiveLeaderboard
+
+
+def test_orders_by_score_then_join_order():
+    board = LiveLeaderboard()
+    board.update("a", 10)
+    board.update("b", 30)
+    board.update("c", 10)
+    board.update("d", 20)
+
+    assert board.top(10) == [("b", 30), ("d", 20), ("a", 10), ("c", 10)]
+    assert [board.rank_of(p) for p in "abcd"] == [3, 1, 4, 2]
+
+
+def test_score_change_moves_player_and_keeps_tie_position():
+    board = LiveLeaderboard()
+    for player_id in ("a", "b", "c"):
+        board.update(player_id, 5)
+
+    board.update("c", 50)
+    assert board.rank_of("c") == 1
+    board.update("c", 5)
+    # Back to a tie: c still joined last, so it ranks behind a and b.
+    assert list(board) == [("a", 5), ("b", 5), ("c", 5)]
+
+
+def test_remove_and_unknown_players():
+    board = LiveLeaderboard()
+    board.update("a", 1)
+    board.update("b", 2)
+    board.remove("b")
+    board.remove("missing")
+
+    assert len(board) == 1
+    assert board.rank_of("a") == 1
+    assert board.rank_of("b") is None
+    assert board.score_of("b") is None
+
+
+def test_matches_full_sort_after_random_updates():
+    import random
+
+    rng = random.Random(7)
+    board = LiveLeaderboard()
+    scores = {}
+    join_order = []
+    for _ in range(2000):
+        player_id = f"p{rng.randrange(50)}"
+        if player_id not in scores:
+            join_order.append(player_id)
+        scores[player_id] = rng.randrange(100)
+        board.update(player_id, scores[player_id])
+
+    expected = sorted(scores.items(), key=lambda item: (-item[1], join_order.index(item[0])))
+    assert board.top(len(expected)) == expected
@@ -0,0 +1,108 @@
+from random import Random
+
+from app.server.models.game_models import GameState, HealthStatus, ItemType, LocationEvent, PlayerState, VisibleRole
+from app.server.services.event_rules import EventRule, EventRuleset
+from app.server.services.game_logic import GameEngine
+
+
+# contact_table[target_masks][source_masks]
+CONTACT_TABLE = ((0.5, 0.2), (0.1, 0.0))
+
+
+class FixedRandom(Random):
+    """Every roll returns ``value``, so exposure follows the risk deterministically."""
+
+    def __init__(self, value: float) -> None:
+        super().__init__()
+        self.value = value
+
+    def random(self) -> float:
+        return self.value
+
+
+def _ruleset():
+    return EventRuleset({
+        event: EventRule(event, f"{event.value} rules", (), CONTACT_TABLE, CONTACT_TABLE)
+        for event in LocationEvent
+    })
+
+
+def _player(player_id, location=None, masks=0, carrier=False, health=HealthStatus.HEALTHY):
+    return PlayerState(
+        player_id=player_id,
+        visible_role=VisibleRole.STUDENT,
+        is_carrier=carrier,
+        inventory={ItemType.MASKS: masks} if masks else {},
+        health_status=health,
+        location=location,
+    )
+
+
+def _engine(players, roll, current_event=LocationEvent.SCHOOL):
+    state = GameState(lobby_id="lobby", current_event=current_event, players=players, lockdown_meter=0)
+    engine = GameEngine(state, ruleset=_ruleset())
+    engine._rng = FixedRandom(roll)
+    return engine
+
+
+def _health(engine):
+    return {player.player_id: player.health_status for player in engine.game_state.players}
+
+
+def test_exposure_only_reaches_players_sharing_a_location():
+    players = [
+        _player("carrier", LocationEvent.SCHOOL, carrier=True),
+        _player("healthy", LocationEvent.SCHOOL),
+        _player("exposed", LocationEvent.SCHOOL, health=HealthStatus.EXPOSED),
+        # No location: at the round's event, which is the school.
+        _player("roaming"),
+        _player("alone", LocationEvent.PARK),
+    ]
+    engine = _engine(players, roll=0.01)
+
+    counts = engine.apply_location_exposure()
+
+    assert counts == {"School": 4, "Park": 1}
+    assert _health(engine) == {
+        "carrier": HealthStatus.HEALTHY,
+        "healthy": HealthStatus.EXPOSED,
+        "exposed": HealthStatus.INFECTED,
+        "roaming": HealthStatus.EXPOSED,
+        "alone": HealthStatus.HEALTHY,
+    }
+    # Scores are re-ranked for players whose health changed.
+    assert engine.score_of("exposed") == -200
+
+
+def test_risk_compounds_over_every_contagious_player_by_mask_tier():
+    def canteen():
+        return [
+            _player("source-a", LocationEvent.CANTEEN, health=HealthStatus.INFECTED),
+            _player("source-b", LocationEvent.CANTEEN, carrier=True),
+            _player("masked-source", LocationEvent.CANTEEN, masks=3, carrier=True),
+            _player("bare", LocationEvent.CANTEEN),
+            _player("masked", LocationEvent.CANTEEN, masks=1),
+        ]
+
+    # Unmasked target: 1 - 0.5 * 0.5 * 0.8 = 0.8. Masked: 1 - 0.9 * 0.9 * 1.0 = 0.19.
+    engine = _engine(canteen(), roll=0.5)
+    assert engine.apply_location_exposure() == {"Canteen": 5}
+    health = _health(engine)
+    assert (health["bare"], health["masked"]) == (HealthStatus.EXPOSED, HealthStatus.HEALTHY)
+
+    engine = _engine(canteen(), roll=0.18)
+    engine.apply_location_exposure()
+    health = _health(engine)
+    assert (health["bare"], health["masked"]) == (HealthStatus.EXPOSED, HealthStatus.EXPOSED)
+
+    engine = _engine(canteen(), roll=0.81)
+    engine.apply_location_exposure()
+    assert _health(engine)["bare"] == HealthStatus.HEALTHY
+
+
+def test_no_contagious_players_changes_nothing():
+    players = [_player("a", LocationEvent.MARKET), _player("b", LocationEvent.MARKET), _player("c")]
+    engine = _engine(players, roll=0.0, current_event=LocationEvent.CLINIC)
+
+    assert engine.apply_location_exposure() == {"Market": 2, "Clinic": 1}
+    assert set(_health(engine).values()) == {HealthStatus.HEALTHY}
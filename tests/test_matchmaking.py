@@ -0,0 +1,151 @@
+import pytest
+from sqlalchemy import event
+
+from app.auth.auth_handler import signJWT
+from app.auth.token_state import token_state_cache
+from app.server.database import db
+from app.server.models.user import Class, GameServer, User
+from app.server.routes import appRoutes
+from app.server.routes.admin_users_flask import admin_users_bp
+from app.server.services.matchmaking import MatchmakingIndex
+from app.server.services.server_registry import ServerRegistry
+
+
+def _ranked(priorities):
+    """A rank function that reports the priorities the registry currently sees."""
+    return lambda key: priorities.get(key)
+
+
+def test_best_returns_lowest_priority_in_pool():
+    index = MatchmakingIndex()
+    priorities = {"a": (1, 3), "b": (0, 5), "c": (0, 1)}
+    for key, priority in priorities.items():
+        index.update(key, "pool", priority)
+    index.update("other", "elsewhere", (0, 0))
+
+    assert index.best("pool", _ranked(priorities)) == ((0, 1), "c")
+    assert index.best("missing", _ranked(priorities)) is None
+
+
+def test_superseded_entries_are_skipped():
+    index = MatchmakingIndex()
+    priorities = {"a": (0, 1), "b": (1, 0)}
+    index.update("a", "pool", (0, 1))
+    index.update("b", "pool", (1, 0))
+
+    # "a" got worse: its old heap entry stays behind but must be ignored.
+    priorities["a"] = (2, 0)
+    index.update("a", "pool", (2, 0))
+
+    assert index.best("pool", _ranked(priorities)) == ((1, 0), "b")
+
+
+def test_discarded_and_moved_keys_leave_the_pool():
+    index = MatchmakingIndex()
+    priorities = {"a": (0, 0), "b": (1, 0)}
+    index.update("a", "pool", (0, 0))
+    index.update("b", "pool", (1, 0))
+
+    index.discard("a")
+    assert index.best("pool", _ranked(priorities)) == ((1, 0), "b")
+
+    index.update("b", "other", (1, 0))
+    assert index.best("pool", _ranked(priorities)) is None
+    assert index.best("other", _ranked(priorities)) == ((1, 0), "b")
+    assert len(index) == 1
+
+
+def test_best_reranks_drifted_entries():
+    index = MatchmakingIndex()
+    index.update("a", "pool", (0, 0))
+    index.update("b", "pool", (1, 0))
+    index.update("c", "pool", (2, 0))
+
+    # "a" got worse without an update and "b" timed out entirely.
+    priorities = {"a": (3, 0), "c": (2, 0)}
+
+    assert index.best("pool", _ranked(priorities)) == ((2, 0), "c")
+    assert len(index) == 2
+
+
+def test_heap_is_compacted_after_many_updates():
+    index = MatchmakingIndex()
+    for step in range(1000):
+        index.update("a", "pool", (step % 7, step))
+        index.update("b", "pool", (step % 5, step))
+
+    heap = index._heaps["pool"]
+    assert len(heap) <= 2 * 2 + 64
+    assert index.best("pool", _ranked({"a": (999 % 7, 999), "b": (999 % 5, 999)})) == ((4, 999), "b")
+
+
+def _user(username, role, **fields):
+    user = User(username=username, email=f"{username}@example.com", password_hash="x", role=role, **fields)
+    db.session.add(user)
+    db.session.flush()
+    return user
+
+
+def _lobby(registry, teacher, classroom, port):
+    row = GameServer(
+        name=f"{classroom.name} lobby", ip="10.0.0.9", port=port, player_count=0, required_players=2,
+        persistent=True, owner_teacher_id=teacher.id, class_id=classroom.id,
+    )
+    db.session.add(row)
+    db.session.flush()
+    registry.sync_row(row)
+
+
+@pytest.fixture
+def school(app, monkeypatch):
+    app.register_blueprint(appRoutes.app_bp)
+    app.register_blueprint(admin_users_bp)
+    token_state_cache.clear()
+    registry = ServerRegistry()
+    monkeypatch.setattr(appRoutes, "server_registry", registry)
+
+    teacher = _user("teacher", "Teacher")
+    admin = _user("admin", "Admin")
+    math, art = Class(name="Math", teacher_id=teacher.id), Class(name="Art", teacher_id=teacher.id)
+    db.session.add_all([math, art])
+    db.session.flush()
+    student = _user("student", "Student", class_id=math.id)
+    _lobby(registry, teacher, math, 7001)
+    _lobby(registry, teacher, art, 7002)
+    db.session.commit()
+
+    headers = lambda user: {"Authorization": f"Bearer {signJWT(str(user.id), user.role)['access_token']}"}
+    yield app.test_client(), headers(student), headers(admin), {"student": student.id, "teacher": teacher.id, "art": art.id}
+    token_state_cache.clear()
+
+
+def test_match_reads_class_from_token_state_without_queries(school):
+    client, student_headers, _, _ = school
+    # Warm the token state, as any earlier authenticated request would.
+    assert client.get("/server/match", headers=student_headers).get_json()["port"] == 7001
+
+    statements = []
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/server/match", headers=student_headers)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    assert response.get_json()["port"] == 7001
+    assert statements == []
+
+
+def test_class_reassignment_refreshes_the_cached_class(school):
+    client, student_headers, admin_headers, ids = school
+    assert client.get("/server/match", headers=student_headers).get_json()["port"] == 7001
+
+    response = client.post(
+        "/api/admin/class-assignment",
+        json={"student_id": ids["student"], "class_id": ids["art"], "teacher_id": ids["teacher"]},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+
+    assert client.get("/server/match", headers=student_headers).get_json()["port"] == 7002
@@ -0,0 +1,185 @@
+import pytest
+from flask import Flask
+from sqlalchemy import event, inspect, text
+
+from app.server import migrations
+from app.server.database import db
+from app.server.migrations import LATEST_VERSION, Migration, current_version, run_migrations
+
+
+@pytest.fixture
+def empty_app(tmp_path):
+    """App on a SQLite database with no tables at all."""
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'empty.db'}"
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    with app.app_context():
+        from app.server.models import announcement, user  # noqa: F401  (registers the models)
+
+        yield app
+        db.session.remove()
+
+
+def _applied():
+    return [row[0] for row in db.session.execute(text("SELECT version FROM schema_version ORDER BY version"))]
+
+
+def _recording(calls, *versions):
+    return [Migration(version, f"step {version}", lambda version=version: calls.append(version)) for version in versions]
+
+
+def test_fresh_database_gets_every_migration_once(empty_app):
+    assert current_version() == 0
+
+    assert run_migrations() == list(range(1, LATEST_VERSION + 1))
+    assert current_version() == LATEST_VERSION
+    assert run_migrations() == []
+    assert _applied() == list(range(1, LATEST_VERSION + 1))
+
+
+def test_migrated_schema_matches_the_models(empty_app):
+    run_migrations()
+    inspector = inspect(db.engine)
+
+    for table in db.metadata.tables.values():
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        assert columns == set(table.columns.keys()), table.name
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        assert {index.name for index in table.indexes} <= indexes, table.name
+
+
+def test_baseline_upgrades_a_pre_migration_database(empty_app):
+    with db.engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE users (id INTEGER PRIMARY KEY, username VARCHAR(80) NOT NULL, "
+            "email VARCHAR(120) NOT NULL, password_hash VARCHAR(255) NOT NULL, role VARCHAR(20) NOT NULL, "
+            "parent_id INTEGER, class_id INTEGER, created_at DATETIME, updated_at DATETIME)"
+        ))
+        conn.execute(text("INSERT INTO users (id, username, email, password_hash, role) VALUES (1, 'old', 'o@x', 'h', 'Student')"))
+
+    run_migrations()
+
+    row = db.session.execute(text(
+        "SELECT first_name, last_name, must_change_password, token_version, public_id FROM users WHERE id = 1"
+    )).one()
+    # public_id is left for the background backfill.
+    assert tuple(row) == ("", "", 0, 0, None)
+    assert "uq_users_public_id" in {index["name"] for index in inspect(db.engine).get_indexes("users")}
+
+
+def test_only_pending_migrations_run_in_order(empty_app, monkeypatch):
+    calls = []
+    monkeypatch.setattr(migrations, "MIGRATIONS", _recording(calls, 1, 2))
+    monkeypatch.setattr(migrations, "LATEST_VERSION", 2)
+    assert run_migrations() == [1, 2]
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", _recording(calls, 1, 2, 3, 4))
+    monkeypatch.setattr(migrations, "LATEST_VERSION", 4)
+    assert run_migrations() == [3, 4]
+
+    assert calls == [1, 2, 3, 4]
+    assert _applied() == [1, 2, 3, 4]
+
+
+def test_failed_migration_is_not_recorded(empty_app, monkeypatch):
+    def broken():
+        raise RuntimeError("boom")
+
+    calls = []
+    steps = _recording(calls, 1) + [Migration(2, "broken", broken)] + _recording(calls, 3)
+    monkeypatch.setattr(migrations, "MIGRATIONS", steps)
+    monkeypatch.setattr(migrations, "LATEST_VERSION", 3)
+
+    with pytest.raises(RuntimeError):
+        run_migrations()
+
+    assert calls == [1]
+    assert current_version() == 1
+
+
+def test_waits_for_the_advisory_lock_and_skips_what_the_holder_applied(empty_app, monkeypatch):
+    """Postgres path: poll pg_try_advisory_lock, then re-read the version under the lock."""
+    lock_attempts = []
+    unlocks = []
+
+    def register_lock_functions(dbapi_connection, connection_record):
+        dbapi_connection.create_function("pg_try_advisory_lock", 1, lambda key: lock_attempts.append(key) or len(lock_attempts) >= 3)
+        dbapi_connection.create_function("pg_advisory_unlock", 1, lambda key: unlocks.append(key) or True)
+
+    event.listen(db.engine, "connect", register_lock_functions)
+    db.engine.dispose()
+    monkeypatch.setattr(db.engine.dialect, "name", "postgresql")
+
+    def other_worker_migrates(seconds):
+        # While we poll, the lock holder applies version 1.
+        with db.engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS schema_version (version INTEGER PRIMARY KEY, "
+                "description VARCHAR(200) NOT NULL, applied_at DOUBLE PRECISION NOT NULL, "
+                "duration_ms DOUBLE PRECISION NOT NULL)"
+            ))
+            conn.execute(text("INSERT OR IGNORE INTO schema_version VALUES (1, 'step 1', 0, 0)"))
+
+    calls = []
+    monkeypatch.setattr(migrations.time, "sleep", other_worker_migrates)
+    monkeypatch.setattr(migrations, "MIGRATIONS", _recording(calls, 1, 2))
+    monkeypatch.setattr(migrations, "LATEST_VERSION", 2)
+
+    try:
+        assert run_migrations() == [2]
+    finally:
+        event.remove(db.engine, "connect", register_lock_functions)
+
+    assert calls == [2]
+    assert lock_attempts == [migrations.MIGRATION_LOCK_KEY] * 3
+    assert unlocks == [migrations.MIGRATION_LOCK_KEY]
+
+
+def test_lock_is_released_when_a_migration_fails(empty_app, monkeypatch):
+    unlocks = []
+
+    def register_lock_functions(dbapi_connection, connection_record):
+        dbapi_connection.create_function("pg_try_advisory_lock", 1, lambda key: True)
+        dbapi_connection.create_function("pg_advisory_unlock", 1, lambda key: unlocks.append(key) or True)
+
+    def broken():
+        raise RuntimeError("boom")
+
+    event.listen(db.engine, "connect", register_lock_functions)
+    db.engine.dispose()
+    monkeypatch.setattr(db.engine.dialect, "name", "postgresql")
+    monkeypatch.setattr(migrations, "MIGRATIONS", [Migration(1, "broken", broken)])
+    monkeypatch.setattr(migrations, "LATEST_VERSION", 1)
+
+    try:
+        with pytest.raises(RuntimeError):
+            run_migrations()
+    finally:
+        event.remove(db.engine, "connect", register_lock_functions)
+
+    assert unlocks == [migrations.MIGRATION_LOCK_KEY]
+
+
+def test_duplicates_fail_the_unique_index_and_are_listed(empty_app, monkeypatch):
+    # An older database: baseline only, with duplicates the unique index would reject.
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS[:1])
+    monkeypatch.setattr(migrations, "LATEST_VERSION", 1)
+    run_migrations()
+    with db.engine.begin() as conn:
+        for i in range(3):
+            conn.execute(text(
+                f"INSERT INTO mission_progress (public_id, user_id, mission_id) VALUES ('dup-{i}', 7, 2)"
+            ))
+    monkeypatch.undo()
+
+    with pytest.raises(RuntimeError) as excinfo:
+        run_migrations()
+
+    message = str(excinfo.value)
+    assert "ix_mission_progress_user_mission" in message
+    assert "user_id=7, mission_id=2 (3 rows)" in message
+    assert current_version() == 1
+    # Never silently downgraded to a plain index.
+    indexes = {index["name"] for index in inspect(db.engine).get_indexes("mission_progress")}
+    assert "ix_mission_progress_user_mission" not in indexes
@@ -0,0 +1,95 @@
+import pytest
+from sqlalchemy import event
+
+from app.auth.auth_handler import signJWT
+from app.auth.token_state import token_state_cache
+from app.server.database import db
+from app.server.models.user import Message, Quiz, QuizResult, User
+from app.server.routes.parent import parent_bp
+
+
+def _user(username, role, **fields):
+    user = User(username=username, email=f"{username}@example.com", password_hash="x", role=role, **fields)
+    db.session.add(user)
+    db.session.flush()
+    return user
+
+
+@pytest.fixture
+def family(app):
+    app.register_blueprint(parent_bp)
+    token_state_cache.clear()
+    teacher = _user("teacher", "Teacher", first_name="Ada", last_name="Lovelace")
+    parent = _user("parent", "Parent")
+    children = [_user(f"kid{i}", "Student", parent_id=parent.id, first_name=f"Kid{i}") for i in range(4)]
+    other = _user("stranger", "Student")
+    for i, child in enumerate(children):
+        quiz = Quiz(teacher_id=teacher.id, title=f"Quiz {i}")
+        db.session.add(quiz)
+        db.session.flush()
+        result = QuizResult(quiz_id=quiz.id, student_id=child.id, score=70 + i)
+        db.session.add(result)
+        db.session.flush()
+        db.session.add(Message(sender_id=teacher.id, receiver_id=child.id, content=f"Well done {i}", quiz_result_id=result.id))
+    db.session.add(Message(sender_id=teacher.id, receiver_id=parent.id, content="Hello"))
+    db.session.add(Message(sender_id=teacher.id, receiver_id=other.id, content="Not yours"))
+    db.session.commit()
+    token = signJWT(str(parent.id), "Parent")["access_token"]
+    yield app.test_client(), {"Authorization": f"Bearer {token}"}
+    token_state_cache.clear()
+
+
+def _count_statements(fn):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        response = fn()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+    return response, statements
+
+
+def test_feedback_loads_quiz_details_in_bulk(family):
+    client, headers = family
+    db.session.expire_all()
+
+    response, statements = _count_statements(lambda: client.get("/parent/feedback", headers=headers))
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body["total"] == 5 and body["children_count"] == 4
+    linked = sorted((m["quiz_info"]["quiz_title"], m["quiz_info"]["student_name"], m["quiz_info"]["score"])
+                    for m in body["feedback"] if m["quiz_info"])
+    assert linked == [(f"Quiz {i}", f"Kid{i}", 70 + i) for i in range(4)]
+    assert {m["sender_name"] for m in body["feedback"]} == {"Ada Lovelace"}
+    # Independent of the number of messages: no per-message lookups.
+    assert len(statements) <= 8
+
+
+def test_feedback_detail_checks_access_without_listing_children(family):
+    client, headers = family
+    child_message = Message.query.filter(Message.quiz_result_id.isnot(None)).first()
+    stranger_message = Message.query.filter_by(content="Not yours").one()
+    db.session.expire_all()
+
+    response = client.get(f"/parent/feedback/{child_message.id}", headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()["quiz_info"]["quiz_result_id"] == child_message.quiz_result_id
+
+    assert client.get(f"/parent/feedback/{stranger_message.id}", headers=headers).status_code == 403
+    assert client.get("/parent/feedback/99999", headers=headers).status_code == 404
+
+
+def test_stats_groups_rows_per_child(family):
+    client, headers = family
+    db.session.expire_all()
+
+    response, statements = _count_statements(lambda: client.get("/parent/stats", headers=headers))
+
+    stats = {entry["child"]: entry for entry in response.get_json()}
+    assert [stats[f"kid{i}"]["quiz_avg_score"] for i in range(4)] == [70.0, 71.0, 72.0, 73.0]
+    assert len(statements) <= 8
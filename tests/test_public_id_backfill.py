@@ -0,0 +1,88 @@
+import threading
+
+import pytest
+from sqlalchemy import text
+
+from app.server import migrations
+from app.server.database import db
+from app.server.services.public_id_backfill import PublicIdBackfill
+
+
+@pytest.fixture
+def widgets(app):
+    """A legacy table: public_id added later, so old rows are NULL."""
+    migrations._maintenance_tasks()
+    db.session.execute(text("CREATE TABLE widgets (id INTEGER PRIMARY KEY, public_id VARCHAR(36))"))
+    db.session.execute(
+        text("INSERT INTO widgets (id, public_id) VALUES (:id, :public_id)"),
+        # Every tenth row already has an id; the ids have gaps.
+        [{"id": i * 2, "public_id": f"kept-{i}" if i % 10 == 0 else None} for i in range(1, 2801)],
+    )
+    db.session.commit()
+    return app
+
+
+def _backfill(**kwargs):
+    kwargs.setdefault("pause_seconds", 0)
+    return PublicIdBackfill(batch_size=1000, tables=("widgets",), **kwargs)
+
+
+def _nulls():
+    return db.session.execute(text("SELECT COUNT(*) FROM widgets WHERE public_id IS NULL")).scalar()
+
+
+class _StopAfterFirstPause(threading.Event):
+    def wait(self, timeout=None):
+        self.set()
+        return True
+
+
+def test_fills_nulls_in_keyset_batches(widgets):
+    backfill = _backfill()
+
+    progress = backfill.run()["widgets"]
+
+    assert (progress.pending_at_start, progress.filled, progress.batches) == (2520, 2520, 3)
+    assert progress.last_id == 5598 and progress.done
+    assert _nulls() == 0
+    public_ids = db.session.execute(text("SELECT public_id FROM widgets")).scalars().all()
+    assert len(set(public_ids)) == 2800
+    assert db.session.execute(text("SELECT public_id FROM widgets WHERE id = 20")).scalar() == "kept-10"
+
+
+def test_interrupted_run_resumes_and_then_records_completion(widgets):
+    first = _backfill(pause_seconds=1)
+    first._stop = _StopAfterFirstPause()
+
+    assert first.run()["widgets"].filled == 1000
+    assert _nulls() == 1520
+    assert not first.complete and not first.is_complete()
+
+    second = _backfill()
+    second.run()
+
+    assert _nulls() == 0
+    assert second.complete and second.is_complete()
+
+
+def test_completed_backfill_is_skipped_at_boot(widgets):
+    _backfill().run()
+    db.session.execute(text("INSERT INTO widgets (id, public_id) VALUES (99999, NULL)"))
+    db.session.commit()
+
+    booted = _backfill()
+    booted.init_app(widgets)
+
+    assert booted.complete
+    assert booted._worker is None
+    assert booted.stats()["tables"] == []
+
+
+def test_failed_table_is_not_recorded_as_complete(widgets):
+    backfill = PublicIdBackfill(batch_size=1000, pause_seconds=0, tables=("widgets", "no_such_table"))
+
+    progress = backfill.run()
+
+    assert progress["widgets"].done
+    assert progress["no_such_table"].error
+    assert not backfill.is_complete()
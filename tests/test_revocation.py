@@ -0,0 +1,87 @@
+import time
+import uuid
+
+from app.auth.revocation import BloomFilter, RevocationList, _database_exact_check
+from app.server.database import db
+from app.server.models.user import RevokedToken
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    values = [uuid.uuid4().hex for _ in range(1000)]
+    for value in values:
+        bloom.add(value)
+
+    assert all(value in bloom for value in values)
+    assert bloom.items == 1000
+
+
+def test_bloom_filter_false_positive_rate_is_near_target():
+    bloom = BloomFilter(1000, 0.01)
+    for _ in range(1000):
+        bloom.add(uuid.uuid4().hex)
+
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(20000))
+    assert false_positives / 20000 < 0.03
+
+
+def _revoke(row_id, jti):
+    db.session.add(RevokedToken(id=row_id, jti=jti, user_id=1, expires_at=time.time() + 3600))
+    db.session.commit()
+
+
+def _revocations(**kwargs):
+    revocations = RevocationList(capacity=1000, error_rate=0.001, **kwargs)
+    revocations._exact_check = _database_exact_check
+    return revocations
+
+
+def test_rebuild_and_sync_pick_up_new_rows(app):
+    _revoke(1, "a")
+    revocations = _revocations()
+    revocations.rebuild()
+    assert revocations.is_revoked("a")
+    assert not revocations.is_revoked("b")
+
+    _revoke(2, "b")
+    assert revocations.sync() == 1
+    assert revocations.is_revoked("b")
+    # Rows already in the filter are not counted again.
+    assert revocations.sync() == 0
+    assert revocations.stats()["filter_items"] == 2
+
+
+def test_sync_catches_rows_committed_out_of_order(app):
+    revocations = _revocations(sync_overlap=100)
+    revocations.rebuild()
+
+    # Two writers took ids 10 and 11; 11 commits first and is synced.
+    _revoke(11, "committed-first")
+    assert revocations.sync() == 1
+
+    _revoke(10, "committed-late")
+    assert revocations.sync() == 1
+    assert revocations.is_revoked("committed-late")
+
+
+def test_overlap_window_is_bounded(app):
+    revocations = _revocations(sync_overlap=5)
+    revocations.rebuild()
+    for row_id in range(1, 21):
+        _revoke(row_id, f"jti-{row_id}")
+    assert revocations.sync() == 20
+
+    assert max(revocations._recent_row_ids) == 20
+    assert min(revocations._recent_row_ids) == 16
+    assert revocations.sync() == 0
+
+
+def test_expired_rows_are_dropped_on_rebuild(app):
+    db.session.add(RevokedToken(id=1, jti="old", user_id=1, expires_at=time.time() - 1))
+    db.session.commit()
+
+    revocations = _revocations()
+    revocations.rebuild()
+
+    assert RevokedToken.query.count() == 0
+    assert not revocations.is_revoked("old")
@@ -0,0 +1,55 @@
+import time
+
+from app.server.services.server_registry import ServerRegistry
+
+
+def _registry_with_server():
+    # feed_snapshot lists servers as of now, so heartbeats must be current.
+    registry = ServerRegistry()
+    registry.record_heartbeat("10.0.0.1", 7777, "alpha", 1, 4, now=time.time())
+    return registry
+
+
+def test_event_ids_carry_the_process_epoch():
+    registry = _registry_with_server()
+    cursor, frame = registry.feed_snapshot()
+
+    assert frame.splitlines()[1] == f"id: {registry.stats()['feed_epoch']}:{cursor}"
+
+
+def test_resume_cursor_requires_matching_epoch():
+    registry = _registry_with_server()
+    epoch = registry.stats()["feed_epoch"]
+
+    assert registry.parse_feed_cursor(f"{epoch}:7") == 7
+    assert registry.parse_feed_cursor("0123456789ab:7") is None
+    assert registry.parse_feed_cursor("7") is None
+    assert registry.parse_feed_cursor(f"{epoch}:x") is None
+    assert registry.parse_feed_cursor(None) is None
+
+
+def test_cursor_from_another_worker_never_replays_its_frames():
+    worker_a = _registry_with_server()
+    worker_b = _registry_with_server()
+    cursor, _ = worker_a.feed_snapshot()
+    worker_b.feed_snapshot()
+    worker_b.record_heartbeat("10.0.0.2", 7777, "beta", 0, 4, now=time.time())
+    worker_b.publish_changes()
+
+    event_id = f"{worker_a.stats()['feed_epoch']}:{cursor}"
+
+    # Same sequence number, different history: worker B must resync the client.
+    assert worker_b.parse_feed_cursor(event_id) is None
+
+
+def test_resume_returns_frames_after_the_cursor():
+    registry = _registry_with_server()
+    cursor, _ = registry.feed_snapshot()
+    registry.record_heartbeat("10.0.0.2", 7777, "beta", 0, 4, now=time.time())
+    registry.publish_changes()
+
+    resumed = registry.parse_feed_cursor(f"{registry.stats()['feed_epoch']}:{cursor}")
+    frames = registry.feed_since(resumed, timeout=0)
+
+    assert [seq for seq, _ in frames] == [cursor + 1]
+    assert "event: server_added" in frames[0][1]
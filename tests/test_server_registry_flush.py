@@ -0,0 +1,85 @@
+from app.server.database import db
+from app.server.models.user import GameServer
+from app.server.services.server_registry import ServerRegistry
+
+
+def _row(ip="10.0.0.5", port=7777):
+    db.session.expire_all()
+    return GameServer.query.filter_by(ip=ip, port=port).one()
+
+
+def test_flush_inserts_then_updates_one_row(app):
+    registry = ServerRegistry()
+    registry.record_heartbeat("10.0.0.5", 7777, "Room", 1, 4, now=100.0)
+    assert registry.flush() == 1
+
+    registry.record_heartbeat("10.0.0.5", 7777, "Room renamed", 3, 4, now=105.0)
+    assert registry.flush() == 1
+
+    row = _row()
+    assert (row.name, row.player_count, row.last_heartbeat) == ("Room renamed", 3, 105.0)
+    assert GameServer.query.count() == 1
+
+
+def test_older_heartbeat_from_another_worker_does_not_overwrite(app):
+    fast_worker = ServerRegistry()
+    slow_worker = ServerRegistry()
+    slow_worker.record_heartbeat("10.0.0.5", 7777, "stale", 1, 4, now=200.0)
+    fast_worker.record_heartbeat("10.0.0.5", 7777, "fresh", 3, 4, now=210.0)
+
+    fast_worker.flush()
+    # The slower worker flushes last, but its heartbeat is older.
+    slow_worker.flush()
+
+    row = _row()
+    assert (row.name, row.player_count, row.last_heartbeat) == ("fresh", 3, 210.0)
+
+
+def test_equal_timestamp_still_applies(app):
+    first = ServerRegistry()
+    second = ServerRegistry()
+    first.record_heartbeat("10.0.0.5", 7777, "first", 1, 4, now=300.0)
+    first.flush()
+    second.record_heartbeat("10.0.0.5", 7777, "second", 2, 4, now=300.0)
+    second.flush()
+
+    assert _row().name == "second"
+
+
+def test_nothing_pending_writes_nothing(app):
+    registry = ServerRegistry()
+    assert registry.flush() == 0
+    assert GameServer.query.count() == 0
+
+
+def test_first_heartbeat_and_count_cover_every_flushed_beat(app):
+    registry = ServerRegistry()
+    registry.record_heartbeat("10.0.0.5", 7777, "Room", 1, 4, now=100.0)
+    registry.record_heartbeat("10.0.0.5", 7777, "Room", 2, 4, now=101.0)
+    registry.flush()
+    registry.record_heartbeat("10.0.0.5", 7777, "Room", 3, 4, now=105.0)
+    registry.flush()
+
+    row = _row()
+    # The row is created from the oldest unflushed beat, not the newest.
+    assert row.first_heartbeat == 100.0
+    assert row.heartbeat_count == 3
+
+
+def test_out_of_order_flush_still_counts_its_heartbeats(app):
+    fast_worker = ServerRegistry()
+    slow_worker = ServerRegistry()
+    slow_worker.record_heartbeat("10.0.0.5", 7777, "stale", 1, 4, now=200.0)
+    slow_worker.record_heartbeat("10.0.0.5", 7777, "stale", 1, 4, now=201.0)
+    fast_worker.record_heartbeat("10.0.0.5", 7777, "fresh", 3, 4, now=205.0)
+    fast_worker.record_heartbeat("10.0.0.5", 7777, "fresh", 3, 4, now=210.0)
+    fast_worker.record_heartbeat("10.0.0.5", 7777, "fresh", 3, 4, now=215.0)
+
+    fast_worker.flush()
+    slow_worker.flush()
+
+    row = _row()
+    # State stays with the newer flush; the late one only adds its beats.
+    assert (row.name, row.player_count, row.last_heartbeat) == ("fresh", 3, 215.0)
+    assert row.heartbeat_count == 5
+    assert row.first_heartbeat == 200.0
@@ -0,0 +1,60 @@
+import os
+
+import pytest
+
+from app.auth.auth_handler import signJWT
+from app.auth.token_state import token_state_cache
+from app.server.database import db
+from app.server.models.user import User
+from app.server.routes import admin_users_flask
+from app.server.services.server_registry import ServerRegistry
+
+
+@pytest.fixture
+def admin_client(app):
+    app.register_blueprint(admin_users_flask.admin_users_bp)
+    token_state_cache.clear()
+    admin = User(username="admin", email="admin@example.com", password_hash="x", role="Admin")
+    db.session.add(admin)
+    db.session.commit()
+    token = signJWT(str(admin.id), "Admin")["access_token"]
+    yield app.test_client(), {"Authorization": f"Bearer {token}"}
+    token_state_cache.clear()
+
+
+def test_telemetry_reports_worker_pid_and_cluster_heartbeat_total(admin_client, monkeypatch):
+    client, headers = admin_client
+    worker_a = ServerRegistry()
+    worker_b = ServerRegistry()
+    # Heartbeats from one server are spread over two workers.
+    for i in range(3):
+        worker_a.record_heartbeat("10.0.0.5", 7777, "Room", 1, 4, now=100.0 + i, metrics={"tick_rate": 60})
+    for i in range(5):
+        worker_b.record_heartbeat("10.0.0.5", 7777, "Room", 1, 4, now=110.0 + i, metrics={"tick_rate": 30})
+    worker_a.flush()
+    worker_b.flush()
+    monkeypatch.setattr(admin_users_flask, "server_registry", worker_a)
+
+    response = client.get("/api/admin/servers/telemetry", headers=headers)
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["pid"] == os.getpid()
+    assert body["scope"] == "worker"
+    [server] = body["servers"]
+    assert server["samples"] == 3
+    assert server["tick_rate"] == [60.0, 60.0, 60.0]
+    assert server["heartbeats_total"] == 8
+
+
+def test_telemetry_total_is_none_before_the_first_flush(admin_client, monkeypatch):
+    client, headers = admin_client
+    worker = ServerRegistry()
+    worker.record_heartbeat("10.0.0.6", 7777, "Room", 1, 4, metrics={"peers": 1})
+    monkeypatch.setattr(admin_users_flask, "server_registry", worker)
+
+    body = client.get("/api/admin/servers/telemetry", headers=headers).get_json()
+
+    [server] = body["servers"]
+    assert server["samples"] == 1
+    assert server["heartbeats_total"] is None
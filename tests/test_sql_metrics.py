@@ -0,0 +1,82 @@
+import json
+import logging
+
+from app.server import sql_metrics
+from app.server.database import db
+from app.server.models.user import User
+from app.server.sql_metrics import init_sql_metrics, statement_shape
+
+
+def test_statement_shape_collapses_literals_and_in_lists():
+    assert statement_shape("SELECT * FROM users WHERE id = 42") == "SELECT * FROM users WHERE id = ?"
+    assert statement_shape("SELECT * FROM users WHERE name = 'O''Brien' AND score > 1.5") == (
+        "SELECT * FROM users WHERE name = ? AND score > ?"
+    )
+    assert statement_shape("SELECT * FROM users WHERE id IN (1, 2, 3)") == statement_shape(
+        "SELECT * FROM users WHERE id in (7)"
+    )
+    assert statement_shape("SELECT *\n  FROM   users\tWHERE id = ?") == "SELECT * FROM users WHERE id = ?"
+
+
+def _users_route(app, count=6):
+    for i in range(count):
+        db.session.add(User(username=f"user{i}", email=f"user{i}@example.com", password_hash="x", role="Student"))
+    db.session.commit()
+    ids = [user.id for user in User.query.all()]
+
+    def per_row():
+        # One lookup per id: the N+1 shape the metrics should flag.
+        db.session.expire_all()
+        names = [db.session.get(User, user_id).username for user_id in ids]
+        return {"names": names}
+
+    app.add_url_rule("/per-row", "per_row", per_row)
+    return ids
+
+
+def test_repeated_statements_are_counted_and_logged_as_n_plus_one(app, monkeypatch, caplog):
+    monkeypatch.setattr(sql_metrics, "SQL_METRICS_ENABLED", True)
+    monkeypatch.setattr(sql_metrics, "SQL_N_PLUS_ONE_THRESHOLD", 5)
+    ids = _users_route(app)
+    init_sql_metrics(app)
+
+    with caplog.at_level(logging.INFO, logger="app.server.sql_metrics"):
+        response = app.test_client().get("/per-row")
+
+    assert response.status_code == 200
+    timing = response.headers.getlist("Server-Timing")
+    assert any(f'desc="{len(ids)} statements"' in value for value in timing)
+    [log] = [record for record in caplog.records if record.levelno == logging.WARNING]
+    record = log.sql_metrics
+    assert record["path"] == "/per-row" and record["statements"] == len(ids)
+    [repeat] = record["n_plus_one"]
+    assert repeat["count"] == len(ids)
+    assert repeat["statement"].startswith("SELECT ... FROM users")
+    assert json.loads(log.getMessage().split(" ", 1)[1]) == record
+
+
+def test_below_threshold_is_logged_at_info_without_n_plus_one(app, monkeypatch, caplog):
+    monkeypatch.setattr(sql_metrics, "SQL_METRICS_ENABLED", True)
+    monkeypatch.setattr(sql_metrics, "SQL_N_PLUS_ONE_THRESHOLD", 10)
+    _users_route(app)
+    init_sql_metrics(app)
+
+    with caplog.at_level(logging.INFO, logger="app.server.sql_metrics"):
+        app.test_client().get("/per-row")
+
+    [log] = caplog.records
+    assert log.levelno == logging.INFO
+    assert log.sql_metrics["n_plus_one"] == []
+
+
+def test_disabled_adds_no_header_and_no_log(app, monkeypatch, caplog):
+    monkeypatch.setattr(sql_metrics, "SQL_METRICS_ENABLED", False)
+    _users_route(app)
+    init_sql_metrics(app)
+
+    with caplog.at_level(logging.INFO, logger="app.server.sql_metrics"):
+        response = app.test_client().get("/per-row")
+
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
+    assert caplog.records == []
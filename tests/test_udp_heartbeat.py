@@ -0,0 +1,155 @@
+import socket
+import time
+
+from app.server.services.server_registry import ServerRegistry
+from app.server.services.udp_heartbeat import PACKET_HEADER, UdpHeartbeatListener, build_heartbeat_packet
+
+SECRET = "test-secret"
+NOW = 1_000_000.0
+
+
+def _listener():
+    registry = ServerRegistry()
+    registry.record_heartbeat("10.0.0.9", 7777, "Room", 0, 4, now=NOW - 5)
+    return UdpHeartbeatListener(SECRET, host="127.0.0.1", port=0, registry=registry), registry
+
+
+def _entry(registry):
+    return registry._servers[("10.0.0.9", 7777)]
+
+
+def test_signed_heartbeat_updates_the_registry():
+    listener, registry = _listener()
+    packet = build_heartbeat_packet(SECRET, "10.0.0.9", 7777, 3, 4, timestamp=NOW)
+
+    assert listener.handle_packet(packet, now=NOW)
+    assert (_entry(registry).player_count, _entry(registry).last_heartbeat) == (3, NOW)
+    assert listener.stats.accepted == 1
+
+
+def test_wrong_secret_is_rejected():
+    listener, registry = _listener()
+    packet = build_heartbeat_packet("other-secret", "10.0.0.9", 7777, 3, 4, timestamp=NOW)
+
+    assert not listener.handle_packet(packet, now=NOW)
+    assert listener.stats.bad_signature == 1
+    assert _entry(registry).player_count == 0
+
+
+def test_tampered_header_is_rejected():
+    listener, _ = _listener()
+    packet = bytearray(build_heartbeat_packet(SECRET, "10.0.0.9", 7777, 3, 4, timestamp=NOW))
+    # Bump the player count without re-signing.
+    packet[23] ^= 0x01
+
+    assert not listener.handle_packet(bytes(packet), now=NOW)
+    assert listener.stats.bad_signature == 1
+
+
+def test_malformed_packets_are_rejected():
+    listener, _ = _listener()
+    packet = build_heartbeat_packet(SECRET, "10.0.0.9", 7777, 3, 4, timestamp=NOW)
+
+    assert not listener.handle_packet(packet[:-1], now=NOW)
+    assert not listener.handle_packet(b"XXXX" + packet[4:], now=NOW)
+    assert listener.stats.malformed == 2
+
+
+def test_replayed_and_skewed_heartbeats_are_rejected():
+    listener, _ = _listener()
+    packet = build_heartbeat_packet(SECRET, "10.0.0.9", 7777, 3, 4, timestamp=NOW)
+    assert listener.handle_packet(packet, now=NOW)
+
+    assert not listener.handle_packet(packet, now=NOW + 1)
+    too_old = build_heartbeat_packet(SECRET, "10.0.0.9", 7777, 3, 4, timestamp=NOW - listener.max_skew - 1)
+    assert not listener.handle_packet(too_old, now=NOW)
+    assert listener.stats.stale == 2
+
+
+def test_unregistered_server_is_ignored():
+    listener, _ = _listener()
+    packet = build_heartbeat_packet(SECRET, "10.0.0.9", 9999, 3, 4, timestamp=NOW)
+
+    assert not listener.handle_packet(packet, now=NOW)
+    assert listener.stats.unknown_server == 1
+    assert len(packet) == PACKET_HEADER.size + 16
+
+
+def test_advertised_ip_is_covered_by_the_signature():
+    listener, registry = _listener()
+    registry.record_heartbeat("10.0.0.10", 7777, "Other", 0, 4, now=NOW - 5)
+    packet = bytearray(build_heartbeat_packet(SECRET, "10.0.0.9", 7777, 3, 4, timestamp=NOW))
+    # Redirect the heartbeat to 10.0.0.10 without re-signing.
+    packet[19] = 10
+
+    assert not listener.handle_packet(bytes(packet), now=NOW)
+    assert listener.stats.bad_signature == 1
+
+
+def test_ipv6_advertised_address_round_trips():
+    listener, registry = _listener()
+    registry.record_heartbeat("2001:db8::7", 7777, "v6", 0, 4, now=NOW - 5)
+
+    assert listener.handle_packet(build_heartbeat_packet(SECRET, "2001:db8::7", 7777, 2, 4, timestamp=NOW), now=NOW)
+    assert registry._servers[("2001:db8::7", 7777)].player_count == 2
+
+
+def test_any_worker_matches_a_server_registered_behind_nat(app):
+    """The server registered with worker A; its UDP packets land on worker B."""
+    worker_a = ServerRegistry()
+    worker_b = ServerRegistry()
+    # Registered through NAT: advertised 203.0.113.5, HTTP source address differs.
+    worker_a.record_heartbeat("203.0.113.5", 7777, "Room", 1, 4)
+    worker_a.flush()
+    worker_b.refresh_from_database()
+
+    listener_b = UdpHeartbeatListener(SECRET, host="127.0.0.1", port=0, registry=worker_b)
+    listener_b.start()
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender:
+            # Arrives from 127.0.0.1, not from the advertised address.
+            sender.sendto(build_heartbeat_packet(SECRET, "203.0.113.5", 7777, 3, 4), ("127.0.0.1", listener_b.port))
+        assert _wait_for(lambda: listener_b.stats.accepted == 1)
+    finally:
+        listener_b.stop()
+
+    assert listener_b.stats.unknown_server == 0
+    assert worker_b._servers[("203.0.113.5", 7777)].player_count == 3
+
+
+def _wait_for(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_forked_child_binds_its_own_socket_and_parent_stops():
+    registry = ServerRegistry()
+    registry.record_heartbeat("127.0.0.1", 7777, "Room", 0, 4)
+    listener = UdpHeartbeatListener(SECRET, host="127.0.0.1", port=0, registry=registry)
+    listener.start()
+    try:
+        inherited = listener._socket
+        # A forked child has no copy of the parent's receive thread.
+        listener._stop.set()
+        listener._thread.join(timeout=3)
+        # What os.fork() runs in the child process.
+        listener._after_fork_in_child()
+        assert listener._socket is not inherited and inherited.fileno() == -1
+        assert listener._thread.is_alive()
+
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender:
+            sender.sendto(build_heartbeat_packet(SECRET, "127.0.0.1", 7777, 2, 4), ("127.0.0.1", listener.port))
+        assert _wait_for(lambda: listener.stats.accepted == 1)
+
+        # What os.fork() runs in the parent once a child has taken over.
+        thread = listener._thread
+        listener._after_fork_in_parent()
+        assert listener._socket is None
+        thread.join(timeout=3)
+        assert not thread.is_alive()
+    finally:
+        listener.stop()